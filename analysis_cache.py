@@ -0,0 +1,250 @@
+# ================================================================
+# analysis_cache.py — SHARED, MEMOISED NOTE ANALYSES
+# MyPsychAdmin
+#
+# Expensive whole-record analyses (the risk analysis from
+# risk_overview_panel, the HCR-20 term index) used to be re-run from
+# scratch by every page that needed them. They now go through one cache:
+#
+#   • the store's notes are keyed by the store's notes version; any
+#     other list by the full tuple of its note IDs, or by the store's
+#     key when those IDs are exactly the store's — so the notes panel's
+#     own copy of the same notes gets the SAME result object
+#   • when the shared store's notes change (non-empty notes_delta,
+#     including notes whose other fields changed under the same ID)
+#     the old result is dropped and the new one is computed once on a
+#     background thread; an empty delta carries the results over
+#   • a caller asking while that job is running waits for it rather
+#     than starting a second run
+#   • GUI code must not wait: when_ready() returns the result only if
+#     it is already there, otherwise it returns None and calls back on
+#     the GUI thread once the background job has finished
+#
+# Results are shared — callers must treat them as read-only.
+# ================================================================
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from PySide6.QtCore import QObject, Qt, Signal
+
+from note_corpus import NoteRow, note_id
+from shared_data_store import get_shared_store
+
+# Results kept per analysis (store notes + a few filtered subsets)
+MAX_ENTRIES = 4
+
+
+def _risk_analysis(notes):
+    from risk_overview_panel import analyze_notes_for_risk
+    return analyze_notes_for_risk(notes)
+
+
+def _hcr20_index(notes):
+    from hcr20_extractor import HCR20NoteIndex
+    return HCR20NoteIndex(notes)
+
+
+# name → function(notes) -> result
+ANALYSES: Dict[str, Callable[[Sequence[Dict]], Any]] = {
+    "risk": _risk_analysis,
+    "hcr20_index": _hcr20_index,
+}
+
+# Analyses computed in the background as soon as new notes arrive
+BACKGROUND_ANALYSES = ("risk", "hcr20_index")
+
+
+class _ReadyRelay(QObject):
+    """Hands a background result to a callback on the GUI thread."""
+
+    ready = Signal(object)
+
+    def __init__(self, callback, parent=None):
+        super().__init__(parent)
+        self._callback = callback
+        # Always queued: the callback never runs inside when_ready()
+        self.ready.connect(self._deliver, Qt.ConnectionType.QueuedConnection)
+
+    def cancel(self):
+        self._callback = None
+        self.deleteLater()
+
+    def _deliver(self, result):
+        callback, self._callback = self._callback, None
+        self.deleteLater()
+        if callback is not None:
+            callback(result)
+
+
+class AnalysisCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, Tuple], Future]" = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+        self._store_key = None
+
+        store = get_shared_store()
+        store.notes_delta.connect(self._on_notes_delta)
+        if store.has_notes():
+            self._on_notes_delta(store.last_delta)
+
+    # --------------------------------------------------------
+    # Lookup
+    # --------------------------------------------------------
+    @staticmethod
+    def _notes_key(notes) -> Tuple:
+        store = get_shared_store()
+        if notes is store.notes:
+            return ("store", store.notes_version)
+        ids = [n.note_id if isinstance(n, NoteRow) else note_id(n) for n in notes]
+        if ids == store.corpus.ids:
+            return ("store", store.notes_version)
+        # The whole ID tuple is the key: lookups compare it, no hash-only matches
+        return ("ids", tuple(ids))
+
+    def _lookup(self, name: str, notes) -> Tuple[Tuple, Future, bool]:
+        """(key, future, True if the caller must compute it)."""
+        key = (name, self._notes_key(notes))
+        with self._lock:
+            fut = self._entries.get(key)
+            owner = fut is None
+            if owner:
+                fut = Future()
+                self._remember(key, fut)
+            else:
+                self._entries.move_to_end(key)
+        return key, fut, owner
+
+    def get(self, name: str, notes: Sequence[Dict]) -> Any:
+        """Result of analysis `name` for `notes`, computed at most once. Blocks."""
+        key, fut, owner = self._lookup(name, notes)
+        if owner:
+            self._run(key, fut, notes)
+        return fut.result()
+
+    def prefetch(self, name: str, notes: Sequence[Dict]) -> Future:
+        """Start computing `name` for `notes` in the background (no-op if known)."""
+        key, fut, owner = self._lookup(name, notes)
+        if owner:
+            print(f"[AnalysisCache] Computing '{name}' in background for {len(notes)} notes")
+            self._executor.submit(self._run, key, fut, notes)
+        return fut
+
+    def peek(self, name: str, notes: Sequence[Dict]) -> Any:
+        """The result if it has already been computed, else None. Never blocks."""
+        with self._lock:
+            fut = self._entries.get((name, self._notes_key(notes)))
+        if fut is not None and fut.done() and fut.exception() is None:
+            return fut.result()
+        return None
+
+    def when_ready(self, name: str, notes: Sequence[Dict], callback: Callable[[Any], None],
+                   context: Optional[QObject] = None, tag: str = "") -> Any:
+        """
+        Non-blocking get() for the GUI thread.
+
+        Returns the result if it is ready. Otherwise makes sure it is being
+        computed in the background, returns None, and later calls
+        callback(result) on the GUI thread. Nothing is delivered if
+        `context` has been deleted by then, or if a newer request with the
+        same `tag` was made on the same context (latest request wins).
+        """
+        if context is not None:
+            for old in context.findChildren(_ReadyRelay, tag or "_ready"):
+                old.cancel()
+
+        fut = self.prefetch(name, notes)
+        if fut.done():
+            return fut.result()
+
+        relay = _ReadyRelay(callback, context)
+        relay.setObjectName(tag or "_ready")
+
+        def _done(f: Future):
+            if f.exception() is not None:
+                return  # already reported by _run
+            try:
+                relay.ready.emit(f.result())
+            except RuntimeError:
+                pass  # context (and relay) deleted meanwhile
+
+        fut.add_done_callback(_done)
+        return None
+
+    def _remember(self, key, fut: Future):
+        self._entries[key] = fut
+        while len(self._entries) > MAX_ENTRIES * len(ANALYSES):
+            self._entries.popitem(last=False)
+
+    def _run(self, key, fut: Future, notes):
+        name = key[0]
+        try:
+            result = ANALYSES[name](notes)
+        except BaseException as e:
+            with self._lock:
+                if self._entries.get(key) is fut:
+                    del self._entries[key]  # let the next caller retry
+            fut.set_exception(e)
+            print(f"[AnalysisCache] '{name}' failed: {e}")
+        else:
+            fut.set_result(result)
+            print(f"[AnalysisCache] '{name}' computed for {len(notes)} notes")
+
+    # --------------------------------------------------------
+    # Invalidation / background refresh
+    # --------------------------------------------------------
+    def _on_notes_delta(self, delta):
+        store = get_shared_store()
+        notes = store.notes
+        new_key = ("store", store.notes_version)
+
+        with self._lock:
+            if self._store_key is not None and self._store_key != new_key:
+                for stale in [k for k in self._entries if k[1] == self._store_key]:
+                    fut = self._entries.pop(stale)
+                    if delta.is_empty:
+                        # Identical notes: the results still hold
+                        self._entries[(stale[0], new_key)] = fut
+            self._store_key = new_key
+
+            jobs = []
+            for name in BACKGROUND_ANALYSES:
+                key = (name, new_key)
+                if notes and key not in self._entries:
+                    fut = Future()
+                    self._remember(key, fut)
+                    jobs.append((key, fut))
+
+        for key, fut in jobs:
+            print(f"[AnalysisCache] Notes v{delta.version}: computing '{key[0]}' in background")
+            self._executor.submit(self._run, key, fut, notes)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: AnalysisCache | None = None
+
+
+def get_analysis_cache() -> AnalysisCache:
+    global _cache
+    if _cache is None:
+        _cache = AnalysisCache()
+    return _cache
+
+
+def get_risk_analysis(notes: Sequence[Dict]) -> Dict[str, Any]:
+    """Shared analyze_notes_for_risk(notes) — see module docstring. Blocks."""
+    return get_analysis_cache().get("risk", notes)
+
+
+def when_risk_ready(notes: Sequence[Dict], callback: Callable[[Dict[str, Any]], None],
+                    context: Optional[QObject] = None, tag: str = "") -> Optional[Dict[str, Any]]:
+    """Non-blocking get_risk_analysis() — see AnalysisCache.when_ready."""
+    return get_analysis_cache().when_ready("risk", notes, callback, context, tag)
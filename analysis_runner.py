@@ -0,0 +1,224 @@
+# ================================================================
+# analysis_runner.py — STAGED PANEL ANALYSIS OFF THE GUI THREAD
+# MyPsychAdmin
+#
+# The risk and progress panels used to analyse every note and render
+# their matplotlib charts inside their constructors, freezing the
+# window for seconds on long records. They now hand that work to an
+# AnalysisRunner:
+#
+#   • a run is a list of named stages (counts → charts → narrative);
+#     the stages run in order on a shared QThreadPool and each result
+#     is delivered to the panel as soon as it is ready, so the panel
+#     fills in progressively
+#   • a stage function receives the results of the stages before it
+#   • starting a new run cancels the old one: it stops before its next
+#     stage and anything it still reports is dropped
+#
+# Stage functions must not touch widgets — they return data, the
+# panel's stage_ready slot (GUI thread) builds the widgets.
+#
+# Rendered chart images are cached (cached_chart) under a key naming
+# the analysis run (new_data_version), zoom, theme and DPI, so going
+# back to a zoom level shows the stored image instead of re-running
+# matplotlib. Panels pre-render their zoom levels as a last stage; a
+# zoom the cache does not have yet (peek_chart) is rendered by a
+# one-stage run while the panel shows a placeholder.
+# ================================================================
+
+from __future__ import annotations
+
+import itertools
+import threading
+import traceback
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+# (stage name, function(results of earlier stages) -> result)
+Stage = Tuple[str, Callable[[Dict[str, Any]], Any]]
+
+# pyplot keeps one "current figure" for the whole process, so chart
+# functions built on it must not run concurrently
+CHART_LOCK = threading.RLock()
+
+
+# Resolution of the timeline charts (part of their cache keys)
+CHART_DPI = 100
+
+# Chart images kept (a timeline PNG is ~50-300 KB)
+MAX_CACHED_CHARTS = 48
+
+_chart_cache: "OrderedDict[tuple, Any]" = OrderedDict()
+_chart_cache_lock = threading.Lock()   # cache hits never wait on a render
+_data_versions = itertools.count(1)
+
+
+def render_chart(fn, *args, **kwargs):
+    """Call a pyplot-based chart function under CHART_LOCK (any thread)."""
+    with CHART_LOCK:
+        return fn(*args, **kwargs)
+
+
+def cached_chart(key: tuple, fn, *args, **kwargs):
+    """render_chart(fn, ...) memoised under `key`, least recently used dropped first."""
+    with _chart_cache_lock:
+        if key in _chart_cache:
+            _chart_cache.move_to_end(key)
+            return _chart_cache[key]
+    # Two threads missing the same key may both render; the first stored wins
+    result = render_chart(fn, *args, **kwargs)
+    with _chart_cache_lock:
+        if key in _chart_cache:
+            _chart_cache.move_to_end(key)
+            return _chart_cache[key]
+        _chart_cache[key] = result
+        while len(_chart_cache) > MAX_CACHED_CHARTS:
+            _chart_cache.popitem(last=False)
+    return result
+
+
+def peek_chart(key: tuple):
+    """The cached chart for `key`, or None. Never renders, never waits on CHART_LOCK."""
+    with _chart_cache_lock:
+        if key in _chart_cache:
+            _chart_cache.move_to_end(key)
+            return _chart_cache[key]
+    return None
+
+
+def new_data_version() -> int:
+    """Fresh token naming one analysis run's data in chart cache keys."""
+    return next(_data_versions)
+
+
+_pool: Optional[QThreadPool] = None
+
+
+def get_analysis_pool() -> QThreadPool:
+    """Thread pool shared by all panel analyses."""
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(2)
+    return _pool
+
+
+class _JobSignals(QObject):
+    stage_done = Signal(int, str, object)   # run id, stage, result
+    failed = Signal(int, str, str)          # run id, stage, error
+    finished = Signal(int)                  # run id
+
+    def __init__(self):
+        super().__init__()
+        self.current: Optional[threading.Event] = None   # the runner's live run
+
+    def cancel_current(self, *_):
+        if self.current is not None:
+            self.current.set()
+
+
+class _AnalysisJob(QRunnable):
+    """One run: executes the stages in order unless cancelled."""
+
+    def __init__(self, run_id: int, stages: List[Stage], signals: _JobSignals,
+                 cancelled: threading.Event):
+        super().__init__()
+        self.run_id = run_id
+        self.stages = stages
+        self.signals = signals
+        self.cancelled = cancelled
+
+    def _emit(self, signal, *args):
+        if self.cancelled.is_set():
+            return
+        try:
+            signal.emit(*args)
+        except RuntimeError:
+            # Receiving panel was deleted mid-run
+            self.cancelled.set()
+
+    def run(self):
+        done: Dict[str, Any] = {}
+        for name, fn in self.stages:
+            if self.cancelled.is_set():
+                return
+            try:
+                done[name] = fn(done)
+            except Exception as e:
+                traceback.print_exc()
+                self._emit(self.signals.failed, self.run_id, name, str(e))
+                return
+            self._emit(self.signals.stage_done, self.run_id, name, done[name])
+        self._emit(self.signals.finished, self.run_id)
+
+
+class AnalysisRunner(QObject):
+    """
+    Runs a panel's staged analysis in the background.
+
+    Only the latest run reports: stage_ready / stage_failed / finished
+    are emitted on the GUI thread, never for a cancelled run.
+    """
+
+    stage_ready = Signal(str, object)   # stage name, result
+    stage_failed = Signal(str, str)     # stage name, error message
+    finished = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Unparented: a job may still hold it after this runner is gone
+        self._signals = _JobSignals()
+        self._signals.stage_done.connect(self._on_stage_done)
+        self._signals.failed.connect(self._on_failed)
+        self._signals.finished.connect(self._on_finished)
+        self._run_id = 0
+        # Stop the current run's work too if the owning panel is deleted
+        # (connected once; _signals outlives this runner)
+        self.destroyed.connect(self._signals.cancel_current)
+
+    @property
+    def _cancelled(self) -> Optional[threading.Event]:
+        """Cancel flag of the live run (None when idle)."""
+        return self._signals.current
+
+    @_cancelled.setter
+    def _cancelled(self, event: Optional[threading.Event]):
+        self._signals.current = event
+
+    def start(self, stages: List[Stage]):
+        """Cancel any current run and start `stages`."""
+        self.cancel()
+        self._run_id += 1
+        cancelled = threading.Event()
+        self._cancelled = cancelled
+        get_analysis_pool().start(
+            _AnalysisJob(self._run_id, list(stages), self._signals, cancelled)
+        )
+
+    def cancel(self):
+        if self._cancelled is not None:
+            self._cancelled.set()
+            self._cancelled = None
+
+    def is_running(self) -> bool:
+        return self._cancelled is not None
+
+    def _current(self, run_id: int) -> bool:
+        return run_id == self._run_id and self._cancelled is not None
+
+    def _on_stage_done(self, run_id: int, name: str, result):
+        if self._current(run_id):
+            self.stage_ready.emit(name, result)
+
+    def _on_failed(self, run_id: int, name: str, error: str):
+        if self._current(run_id):
+            self._cancelled = None
+            print(f"[AnalysisRunner] Stage '{name}' failed: {error}")
+            self.stage_failed.emit(name, error)
+
+    def _on_finished(self, run_id: int):
+        if self._current(run_id):
+            self._cancelled = None
+            self.finished.emit()
@@ -0,0 +1,283 @@
+"""
+Benchmark: note extractors vs the same functions at a baseline commit.
+
+Targets:
+    risk         risk_overview_panel.analyze_notes_for_risk
+                 (compiled, pre-screened patterns) — output must be identical
+    medications  medication_extractor.extract_medications_from_notes
+                 (phrase trie, one dose scan per note) — with single-word
+                 patterns only the output must be identical; with every
+                 pattern it also finds multi-word and hyphenated names
+    timeline     timeline_builder.build_timeline, one run per note source
+                 (synthetic: RiO, CareNotes and EPJS, --notes each) —
+                 episodes must equal the baseline's, and a second call on
+                 an equal but distinct list must be a cache hit equal to
+                 a fresh build
+
+The baseline version of each module is read with `git show <rev>:<file>`
+and loaded next to the current one, so no old code is kept in the tree.
+The default baseline is the repository's root commit.
+
+Usage:
+    python3 bench_extractors.py risk                     # 14,000 synthetic notes
+    python3 bench_extractors.py medications --notes 3000
+    python3 bench_extractors.py timeline
+    python3 bench_extractors.py risk --baseline HEAD~10
+    python3 bench_extractors.py risk export.xlsx         # real notes via the importers
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ------------------------------------------------------------
+# Synthetic notes
+# ------------------------------------------------------------
+NARRATIVE = [
+    "Seen on the ward today for review with the named nurse.",
+    "Mental state remains settled and he engaged well in the session.",
+    "Attended OT group in the morning and ate 2 meals in the dining room.",
+    "Medication administered as prescribed, no side effects reported.",
+    "Spoke with mother on the phone, conversation was pleasant.",
+    "Sleep pattern good, appeared to sleep through the night on checks.",
+    "Discussed leave plans and the upcoming CPA meeting with the team.",
+    "Physical observations within normal limits, weight 84.5 kg.",
+    "Remained calm and cooperative throughout the shift.",
+    "Took part in a community meeting and raised concerns about the food.",
+    "Risk assessment reviewed, no new concerns identified at this time.",
+    "Plan is to continue current medication and review in one week.",
+]
+RISKY = [
+    "He punched a member of staff in the face and was restrained.",
+    "Was verbally abusive and threatening towards peers, shouting and swearing.",
+    "Found with a ligature around her neck, removed by staff.",
+    "Self-harmed by cutting her forearm with a broken cd.",
+    "Smashed the window in the lounge and kicked the door.",
+    "Tested positive for cannabis on return from leave.",
+    "Absconded from escorted leave and was returned by police.",
+    "Refused his depot injection and declined all oral medication.",
+    "Sexually disinhibited towards female staff, exposing himself.",
+    "Denies any thoughts of self-harm or suicide.",
+    "No aggression or violence noted during the shift.",
+    "Threw a chair across the dining room during an argument.",
+]
+FREQS = ["od", "bd", "tds", "nocte", "mane", "prn", "daily", "weekly", ""]
+ROUTES = ["po", "oral", "im", "sc", ""]
+
+
+def _risk_sentence(rng):
+    return rng.choice(RISKY)
+
+
+def _med_sentence(rng):
+    from CANONICAL_MEDS import MEDICATIONS
+    meta = MEDICATIONS[rng.choice(list(MEDICATIONS))]
+    name = rng.choice(meta.get("patterns") or [meta["canonical"]])
+    if rng.random() < 0.3:
+        name = name.title()
+    allowed = meta.get("allowed_strengths") or [rng.choice((5, 10, 25, 50, 100))]
+    dose = rng.choice(allowed) if rng.random() < 0.8 else rng.randint(1, 900)
+    unit = rng.choice(("mg", "mg", "mcg", "units"))
+    dose_txt = f"{dose}{unit}" if rng.random() < 0.5 else f"{dose} {unit}"
+    return f"{name} {dose_txt} {rng.choice(ROUTES)} {rng.choice(FREQS)}".strip() + "."
+
+
+def synthetic_notes(n: int, sentence, seed: int = 1):
+    """n notes of narrative with 0-4 `sentence(rng)` mentions mixed in."""
+    rng = random.Random(seed)
+    start = datetime(2012, 1, 1)
+    notes = []
+    for _ in range(n):
+        sentences = [rng.choice(NARRATIVE) for _ in range(rng.randint(3, 25))]
+        for _ in range(rng.choice((0, 0, 0, 1, 2, 4))):
+            sentences.insert(rng.randrange(len(sentences) + 1), sentence(rng))
+        notes.append({
+            "date": start + timedelta(minutes=rng.randint(0, 6_000_000)),
+            "content": " ".join(sentences),
+        })
+    return notes
+
+
+WARD = [
+    "Nursing day shift: settled on the ward, 15 minute observation level.",
+    "Ward round today, remains detained under section 3 of the MHA.",
+    "Medication round completed, took all oral medication on the ward.",
+    "Hourly checks overnight, slept well on the ward.",
+]
+COMMUNITY = [
+    "Seen at home by the care coordinator, living independently.",
+    "Telephone contact with the patient, attending college and coping well.",
+    "Outpatient clinic review, mental state stable in the community.",
+]
+
+
+def timeline_notes(n: int, source: str, seed: int = 1):
+    """n notes alternating dense admissions (daily ward notes) and sparse community contact."""
+    rng = random.Random(seed)
+    day = datetime(2010, 1, 1)
+    notes = []
+    while len(notes) < n:
+        # Admission: a few ward notes a day for 1-4 months
+        for _ in range(rng.randint(30, 120)):
+            for _ in range(rng.randint(2, 4)):
+                notes.append({"date": day + timedelta(hours=rng.randint(7, 22)), "source": source,
+                              "type": "Nursing", "raw_type": "Nursing Note", "content": rng.choice(WARD)})
+            day += timedelta(days=1)
+        # Community: a contact every 1-3 weeks for 2 months - 1 year
+        end = day + timedelta(days=rng.randint(60, 400))
+        while day < end:
+            day += timedelta(days=rng.randint(7, 21))
+            notes.append({"date": day, "source": source, "type": "Community",
+                          "raw_type": "Contact Note", "content": rng.choice(COMMUNITY)})
+    for note in notes:
+        note["text"] = note["content"]
+    return notes[:n]
+
+
+# ------------------------------------------------------------
+# Harness
+# ------------------------------------------------------------
+def _git(*args) -> str:
+    return subprocess.run(["git", *args], cwd=HERE, check=True,
+                          capture_output=True, text=True).stdout
+
+
+def root_commit() -> str:
+    return _git("rev-list", "--max-parents=0", "HEAD").split()[0]
+
+
+def baseline_module(name: str, rev: str):
+    """Module `name` as it was at `rev`, imported as baseline_<name>."""
+    source = _git("show", f"{rev}:{name}.py")
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_"), f"{name}.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(source)
+    spec = importlib.util.spec_from_file_location(f"baseline_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def timed(fn, *args):
+    """(fn(*args), seconds), with the extractors' progress output hidden."""
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        res = fn(*args)
+    return res, time.perf_counter() - t0
+
+
+# ------------------------------------------------------------
+# Targets — each returns True if the checks pass
+# ------------------------------------------------------------
+def bench_risk(notes, rev) -> bool:
+    from risk_overview_panel import analyze_notes_for_risk
+    old_fn = baseline_module("risk_overview_panel", rev).analyze_notes_for_risk
+
+    def comparable(results):
+        out = dict(results)
+        out["monthly_counts"] = {m: dict(c) for m, c in results["monthly_counts"].items()}
+        return out
+
+    old, t_old = timed(old_fn, notes)
+    new, t_new = timed(analyze_notes_for_risk, notes)
+    same = comparable(old) == comparable(new)
+    print(f"baseline : {t_old:7.2f} s")
+    print(f"current  : {t_new:7.2f} s   ({t_old / t_new:.1f}x)")
+    print(f"incidents: {sum(c['count'] for c in new['categories'].values())}, identical output: {same}")
+    return same
+
+
+def bench_medications(notes, rev) -> bool:
+    from CANONICAL_MEDS import MEDICATIONS
+    from medication_extractor import extract_medications_from_notes, fast_tokenise
+    old_fn = baseline_module("medication_extractor", rev).extract_medications_from_notes
+
+    single = {
+        key: dict(meta, patterns=[p for p in meta.get("patterns", [])
+                                  if fast_tokenise(p) == [p.lower().strip()]])
+        for key, meta in MEDICATIONS.items()
+    }
+    same = timed(old_fn, notes, single)[0] == timed(extract_medications_from_notes, notes, single)[0]
+
+    old, t_old = timed(old_fn, notes, MEDICATIONS)
+    new, t_new = timed(extract_medications_from_notes, notes, MEDICATIONS)
+    multi = sum(1 for m in new["medications"] if " " in m["raw"])
+    print(f"baseline : {t_old:7.2f} s   {len(old['medications'])} medications")
+    print(f"current  : {t_new:7.2f} s   {len(new['medications'])} medications "
+          f"({multi} multi-word)   ({t_old / t_new:.1f}x)")
+    print(f"single-word patterns, identical output: {same}")
+    return same
+
+
+def bench_timeline(notes, rev) -> bool:
+    import timeline_builder
+    from timeline_builder import build_timeline, clear_timeline_cache
+    old_fn = baseline_module("timeline_builder", rev).build_timeline
+
+    # One run per note source, so each pipeline is exercised on its own
+    runs = {}
+    for n in notes:
+        runs.setdefault(str(n.get("source") or ""), []).append(n)
+
+    ok = True
+    for run_notes in runs.values():
+        pipeline = timeline_builder.decide_pipeline(run_notes)
+        old, t_old = timed(old_fn, run_notes)
+        clear_timeline_cache()
+        new, t_new = timed(build_timeline, run_notes)
+
+        # An equal but distinct list must hit the cache and match a fresh build
+        copy = [dict(n) for n in run_notes]
+        cached, t_cached = timed(build_timeline, copy)
+        hit = len(timeline_builder._timeline_cache) == 1
+        clear_timeline_cache()
+        fresh, _ = timed(build_timeline, copy)
+
+        same = old == new
+        cache_ok = hit and cached == fresh
+        ok = ok and same and cache_ok
+        print(f"{pipeline:10}: baseline {t_old:6.2f} s, current {t_new:6.2f} s, cached {t_cached:6.3f} s   "
+              f"{len(new)} episodes, identical to baseline: {same}, cache hit equal to fresh build: {cache_ok}")
+    return ok
+
+
+TARGETS = {
+    "risk": (bench_risk, lambda n: synthetic_notes(n, _risk_sentence)),
+    "medications": (bench_medications, lambda n: synthetic_notes(n, _med_sentence)),
+    "timeline": (bench_timeline, lambda n: [note for src in ("rio", "carenotes", "epjs")
+                                            for note in timeline_notes(n, src)]),
+}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("target", choices=sorted(TARGETS))
+    ap.add_argument("files", nargs="*", help="note exports to load instead of synthetic notes")
+    ap.add_argument("--notes", type=int, default=14000, help="number of synthetic notes")
+    ap.add_argument("--baseline", help="git revision to compare against (default: root commit)")
+    args = ap.parse_args()
+
+    run, make_notes = TARGETS[args.target]
+    if args.files:
+        from importer_pipeline import parse_import_file
+        notes = [n for f in args.files for n in parse_import_file(f)]
+    else:
+        notes = make_notes(args.notes)
+    rev = args.baseline or root_commit()
+    print(f"{len(notes)} notes, baseline {rev[:10]}")
+    return 0 if run(notes, rev) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+# ================================================================
+# charting.py — LAZY, HEADLESS MATPLOTLIB
+# MyPsychAdmin
+#
+# main.py used to import matplotlib.pyplot before anything else, so
+# every cold start paid for loading matplotlib — even for users who
+# never open a chart. Chart code now gets pyplot from here instead:
+#
+#   • matplotlib is imported on the first chart request, not at startup
+#   • the Agg backend is selected BEFORE pyplot loads, so pyplot never
+#     pulls in a GUI backend (charts are rendered to PNG bytes and
+#     shown in QLabels — see risk_overview_panel / progress_panel)
+#   • main.py records when the window was shown; the first chart
+#     request then logs its import time as the time saved at startup
+#     (sessions that never draw a chart never load matplotlib)
+#
+# pyplot's figure state is process-wide: render from worker threads
+# through analysis_runner.render_chart / cached_chart.
+# ================================================================
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+_lock = threading.Lock()
+_pyplot = None
+
+# Seconds the first import took (None until then)
+load_seconds: Optional[float] = None
+
+# Seconds from launch until the window was shown (set by main.py)
+_shown_after: Optional[float] = None
+
+
+def pyplot():
+    """matplotlib.pyplot on the Agg backend, imported on first use."""
+    global _pyplot, load_seconds
+    if _pyplot is None:
+        with _lock:
+            if _pyplot is None:
+                t0 = time.perf_counter()
+                import matplotlib
+                matplotlib.use("Agg")
+                import matplotlib.pyplot as plt
+                load_seconds = time.perf_counter() - t0
+                print(f"[Charting] matplotlib (Agg) loaded in {load_seconds:.2f}s")
+                if _shown_after is not None:
+                    print(f"[Startup] matplotlib import deferred: {load_seconds:.2f}s saved from the "
+                          f"cold start (window would have shown after {_shown_after + load_seconds:.2f}s)")
+                _pyplot = plt
+    return _pyplot
+
+
+def is_loaded() -> bool:
+    return _pyplot is not None
+
+
+def record_window_shown(seconds: float):
+    """Note when the window appeared, so the first pyplot() reports the time saved."""
+    global _shown_after
+    _shown_after = seconds
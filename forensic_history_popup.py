@@ -631,7 +631,7 @@ class ForensicHistoryPopup(QWidget):
 
                 Display in date order with risk type badges, highlighted matches, and filter panel.
                 """
-                from risk_overview_panel import analyze_notes_for_risk
+                from analysis_cache import when_risk_ready
 
                 print(f"[FORENSIC] set_forensic_data called with {len(notes) if notes else 0} notes, {len(extracted_entries) if extracted_entries else 0} extracted entries")
 
@@ -640,9 +640,13 @@ class ForensicHistoryPopup(QWidget):
                 # Risk categories relevant to forensic history
                 FORENSIC_RISK_CATEGORIES = ["Physical Aggression", "Property Damage", "Sexual Behaviour"]
 
-                # Run risk analysis on notes
+                # Risk analysis runs in the background — come back once it is ready
                 if notes:
-                        results = analyze_notes_for_risk(notes)
+                        results = when_risk_ready(
+                                notes, lambda _: self.set_forensic_data(notes, extracted_entries), self, "forensic"
+                        )
+                        if results is None:
+                                return
                         for cat_name in FORENSIC_RISK_CATEGORIES:
                                 cat_data = results.get("categories", {}).get(cat_name, {})
                                 for incident in cat_data.get("incidents", []):
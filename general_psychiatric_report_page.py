@@ -2225,7 +2225,7 @@ class GPRRiskPopup(QWidget):
 
         Also auto-populates Current Risk (last 3 months) and Historical Risk (all time) checkboxes.
         """
-        from risk_overview_panel import analyze_notes_for_risk
+        from analysis_cache import when_risk_ready
         from datetime import timedelta
         import re
         import html
@@ -2245,8 +2245,12 @@ class GPRRiskPopup(QWidget):
             self.extracted_section.setVisible(False)
             return
 
-        # Run risk analysis
-        results = analyze_notes_for_risk(notes)
+        # Risk analysis runs in the background — come back once it is ready
+        results = when_risk_ready(
+            notes, lambda _: self.set_notes_for_risk_analysis(notes), self, "risk"
+        )
+        if results is None:
+            return
 
         # Mapping from risk_overview categories/subcategories to GPRRiskPopup RISK_TYPES keys
         # Some categories map to multiple risk types based on subcategory
@@ -3585,11 +3589,22 @@ class GPRSubstanceUsePopup(QWidget):
 
         Display in date order with the same format as section 7 (Risk).
         """
-        from risk_overview_panel import analyze_notes_for_risk
+        from analysis_cache import when_risk_ready
         from datetime import datetime
         import re
         import html
 
+        # Risk analysis runs in the background — come back once it is ready
+        results = None
+        if notes:
+            results = when_risk_ready(
+                notes,
+                lambda _: self.set_notes_for_substance_analysis(notes, extracted_entries),
+                self, "substance"
+            )
+            if results is None:
+                return
+
         # Clear existing checkboxes
         for cb in self._extracted_checkboxes:
             cb.deleteLater()
@@ -3603,10 +3618,8 @@ class GPRSubstanceUsePopup(QWidget):
 
         all_incidents = []
 
-        # Run risk analysis on notes to get substance misuse incidents
-        if notes:
-            results = analyze_notes_for_risk(notes)
-
+        # Risk analysis on notes to get substance misuse incidents
+        if results is not None:
             # Only get "Substance Misuse" category
             substance_data = results.get("categories", {}).get("Substance Misuse", {})
             for incident in substance_data.get("incidents", []):
@@ -8042,7 +8055,7 @@ class GPRFixedDataPanel(QWidget):
 
         Display in date order with risk type badges, highlighted matches, and filter panel.
         """
-        from risk_overview_panel import analyze_notes_for_risk
+        from analysis_cache import when_risk_ready
         from datetime import datetime
         import re
         import html
@@ -8054,9 +8067,13 @@ class GPRFixedDataPanel(QWidget):
         # Risk categories relevant to forensic history
         FORENSIC_RISK_CATEGORIES = ["Physical Aggression", "Property Damage", "Sexual Behaviour"]
 
-        # Run risk analysis on notes
+        # Risk analysis runs in the background — come back once it is ready
         if notes:
-            results = analyze_notes_for_risk(notes)
+            results = when_risk_ready(
+                notes, lambda _: self.set_forensic_data(notes, extracted_entries), self, "forensic"
+            )
+            if results is None:
+                return
             for cat_name in FORENSIC_RISK_CATEGORIES:
                 cat_data = results.get("categories", {}).get(cat_name, {})
                 for incident in cat_data.get("incidents", []):
@@ -8784,7 +8801,8 @@ class GeneralPsychReportPage(QWidget):
             return
 
         # Skip if these exact notes were already processed
-        notes_sig = (len(notes), id(notes))
+        from shared_data_store import notes_signature
+        notes_sig = notes_signature(notes)
         if self._notes_processed_id == notes_sig:
             print(f"[GeneralPsych] Skipping set_notes - notes already processed")
             return
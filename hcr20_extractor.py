@@ -6,10 +6,16 @@
 
 from __future__ import annotations
 import re
+import time
+from array import array
+from bisect import bisect_left
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from dateutil import parser as date_parser
 
+from term_automaton import TermAutomaton
+
 
 # ============================================================
 # HCR-20 EXTRACTION TERMS - Keywords to search for each item
@@ -923,6 +929,19 @@ HCR20_EXTRACTION_TERMS = {
 # DATE PARSING UTILITIES
 # ============================================================
 
+@lru_cache(maxsize=8192)
+def _parse_date_text(text: str) -> datetime:
+    """dateutil parse (day first), memoised - the same date strings recur across notes."""
+    return date_parser.parse(text, dayfirst=True)
+
+
+def _date_sort_key(value: datetime) -> datetime:
+    """Naive local datetime, so aware and naive dates sort together."""
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
 def parse_date_from_note(note: Dict) -> Optional[datetime]:
     """Extract date from a note entry."""
     # Try common date fields
@@ -933,7 +952,7 @@ def parse_date_from_note(note: Dict) -> Optional[datetime]:
             try:
                 if isinstance(note[field], datetime):
                     return note[field]
-                return date_parser.parse(str(note[field]), dayfirst=True)
+                return _parse_date_text(str(note[field]))
             except:
                 continue
 
@@ -948,7 +967,7 @@ def parse_date_from_note(note: Dict) -> Optional[datetime]:
         match = re.search(pattern, content, re.I)
         if match:
             try:
-                return date_parser.parse(match.group(1), dayfirst=True)
+                return _parse_date_text(match.group(1))
             except:
                 continue
 
@@ -990,83 +1009,268 @@ def get_note_content(note: Dict) -> str:
     return str(note)
 
 
+# ============================================================
+# HCR-20 TERM INDEXING - one automaton pass per note over every term
+# ============================================================
+# Every item and subsection term goes into one TermAutomaton (see
+# term_automaton.py), so a note is scanned once for all of them
+# rather than once per item x subsection x term.
+
+def _all_hcr20_terms() -> Dict[str, List[Tuple[str, Optional[str]]]]:
+    """lowercase term -> [(item_key, subsection_key or None), ...]"""
+    owners: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+    for item_key, config in HCR20_EXTRACTION_TERMS.items():
+        for term in config['terms']:
+            owners.setdefault(term.lower(), []).append((item_key, None))
+        for sub_key, sub_terms in config.get('subsections', {}).items():
+            for term in sub_terms:
+                owners.setdefault(term.lower(), []).append((item_key, sub_key))
+    return owners
+
+
+_HCR20_TERM_OWNERS = _all_hcr20_terms()
+HCR20_AUTOMATON = TermAutomaton(_HCR20_TERM_OWNERS)
+
+
+def find_hcr20_hits(content_lower: str) -> List[Tuple[str, Optional[str], str, int]]:
+    """Every HCR-20 term in a (lowercased) note as (item, subsection, term, offset)."""
+    hits = []
+    for term, offset in HCR20_AUTOMATON.first_offsets(content_lower).items():
+        for item_key, sub_key in _HCR20_TERM_OWNERS[term]:
+            hits.append((item_key, sub_key, term, offset))
+    hits.sort(key=lambda h: h[3])
+    return hits
+
+
+@lru_cache(maxsize=64)
+def _automaton_for(terms_lower: Tuple[str, ...]) -> TermAutomaton:
+    return TermAutomaton(terms_lower)
+
+
+def preprocess_notes(notes: List[Dict]) -> List[tuple]:
+    """(note, content_lower, term_offsets) for every note - one automaton pass each."""
+    out = []
+    for note in notes:
+        content = get_note_content(note).lower()
+        out.append((note, content, HCR20_AUTOMATON.first_offsets(content)))
+    return out
+
+
+def _excerpts_for_note(content: str, terms: List[str], terms_lower: List[str],
+                       offsets: Dict[str, int]) -> List[Dict]:
+    """Up to 3 distinct excerpts, one per matched term, in term order."""
+    note_matches = []
+    seen_excerpts = set()  # Avoid duplicate excerpts
+
+    for term, term_lower in zip(terms, terms_lower):
+        idx = offsets.get(term_lower)
+        if idx is None:
+            continue
+        # Find the context around the match
+        start = max(0, idx - 100)  # Reduced context for speed
+        end = min(len(content), idx + len(term) + 100)
+        excerpt = content[start:end]
+
+        # Clean up the excerpt
+        if start > 0:
+            excerpt = "..." + excerpt
+        if end < len(content):
+            excerpt = excerpt + "..."
+
+        excerpt = excerpt.strip()
+
+        # Skip if we've already captured this excerpt
+        if excerpt not in seen_excerpts:
+            seen_excerpts.add(excerpt)
+            note_matches.append({
+                'term': term,
+                'excerpt': excerpt,
+            })
+
+        # Limit matches per note for performance
+        if len(note_matches) >= 3:
+            break
+
+    return note_matches
+
+
 def search_notes_for_terms(notes: List[Dict], terms: List[str], preprocessed: List[tuple] = None) -> List[Dict]:
     """Search notes for specific terms and return matching excerpts.
 
     Args:
         notes: List of note dictionaries
         terms: List of search terms
-        preprocessed: Optional list of (note, content_lower) tuples for efficiency
+        preprocessed: Optional list of (note, content_lower[, term_offsets])
+            tuples for efficiency (see preprocess_notes)
     """
-    import re
     matches = []
-
-    # Pre-compile lowercase terms for faster lookup
     terms_lower = [t.lower() for t in terms]
+    term_set = set(terms_lower)
 
-    # Build a combined regex pattern for faster initial screening
-    # Escape special regex chars and join with |
-    escaped_terms = [re.escape(t) for t in terms_lower]
-    combined_pattern = re.compile('|'.join(escaped_terms), re.IGNORECASE) if escaped_terms else None
+    # HCR-20 terms can reuse the offsets from preprocess_notes();
+    # any other term list gets its own (cached) automaton
+    known_terms = term_set.issubset(_HCR20_TERM_OWNERS)
+    automaton = HCR20_AUTOMATON if known_terms else _automaton_for(tuple(sorted(term_set)))
 
     # Use preprocessed data if available, otherwise process on the fly
     notes_to_search = preprocessed if preprocessed else [(note, get_note_content(note).lower()) for note in notes]
 
-    for note, content in notes_to_search:
+    for entry in notes_to_search:
+        note, content = entry[0], entry[1]
+        if known_terms and len(entry) > 2:
+            offsets = entry[2]
+        else:
+            offsets = automaton.first_offsets(content)
+
         # Quick check: does ANY term exist in this note?
-        if combined_pattern and not combined_pattern.search(content):
+        if term_set.isdisjoint(offsets):
             continue
 
-        note_matches = []
-        seen_excerpts = set()  # Avoid duplicate excerpts
-
-        for term, term_lower in zip(terms, terms_lower):
-            if term_lower in content:
-                # Find the context around the match
-                idx = content.find(term_lower)
-                start = max(0, idx - 100)  # Reduced context for speed
-                end = min(len(content), idx + len(term) + 100)
-                excerpt = content[start:end]
-
-                # Clean up the excerpt
-                if start > 0:
-                    excerpt = "..." + excerpt
-                if end < len(content):
-                    excerpt = excerpt + "..."
-
-                excerpt = excerpt.strip()
-
-                # Skip if we've already captured this excerpt
-                if excerpt not in seen_excerpts:
-                    seen_excerpts.add(excerpt)
-                    note_matches.append({
-                        'term': term,
-                        'excerpt': excerpt,
-                    })
-
-                # Limit matches per note for performance
-                if len(note_matches) >= 3:
-                    break
+        note_matches = _excerpts_for_note(content, terms, terms_lower, offsets)
+        if note_matches:
+            matches.append({
+                'note': note,
+                'date': parse_date_from_note(note),
+                'matches': note_matches,
+            })
+
+    return matches
+
 
+# ============================================================
+# INVERTED INDEX - every HCR-20 term over the full note list
+# ============================================================
+# Built once per notes list (one automaton pass per note). Each term
+# maps to the notes it occurs in and its first offset there, so an
+# item search only touches the notes containing one of its terms -
+# which is what lets the historical items search ALL notes instead
+# of the most recent 2000. Every note's date is also resolved once
+# here and kept sorted, so the clinical 6-month scope is a bisect.
+
+class HCR20NoteIndex:
+    """term -> (note indices, first offsets) over a notes list."""
+
+    def __init__(self, notes: List[Dict]):
+        t0 = time.perf_counter()
+        self.notes = notes
+        postings: Dict[str, Tuple[array, array]] = {}
+        for i, note in enumerate(notes):
+            content = get_note_content(note).lower()
+            for term, offset in HCR20_AUTOMATON.first_offsets(content).items():
+                post = postings.get(term)
+                if post is None:
+                    post = postings[term] = (array('l'), array('l'))
+                post[0].append(i)
+                post[1].append(offset)
+        self._postings = postings
+
+        # Resolved date column, plus dated notes in date order for scope filtering
+        self.dates: List[Optional[datetime]] = [parse_date_from_note(note) for note in notes]
+        dated = sorted(
+            ((_date_sort_key(d), i) for i, d in enumerate(self.dates) if d),
+            key=lambda pair: pair[0],
+        )
+        self._sorted_dates = [d for d, _ in dated]
+        self._date_order = array('l', [i for _, i in dated])
+        self._undated = [i for i, d in enumerate(self.dates) if not d]
+        self.build_seconds = time.perf_counter() - t0
+        print(f"[HCR-20 Extractor] Indexed {len(notes)} notes "
+              f"({len(postings)} terms) in {self.build_seconds:.2f}s")
+
+    def __len__(self) -> int:
+        return len(self.notes)
+
+    def date(self, i: int) -> Optional[datetime]:
+        return self.dates[i]
+
+    def indices_since(self, months: int) -> set:
+        """Indices kept by filter_notes_by_date(notes, months): recent or undated."""
+        cutoff = datetime.now() - timedelta(days=months * 30)
+        first = bisect_left(self._sorted_dates, cutoff)
+        kept = set(self._date_order[first:])
+        kept.update(self._undated)
+        return kept
+
+    def candidates(self, terms_lower: Iterable[str]) -> Dict[int, Dict[str, int]]:
+        """note index -> {term: first offset} for notes containing any of the terms."""
+        per_note: Dict[int, Dict[str, int]] = {}
+        for term in set(terms_lower):
+            post = self._postings.get(term)
+            if post is None:
+                continue
+            for i, offset in zip(post[0], post[1]):
+                per_note.setdefault(i, {})[term] = offset
+        return per_note
+
+
+def search_index_for_terms(index: HCR20NoteIndex, notes: List[Dict], terms: List[str],
+                           allowed: Optional[set] = None) -> List[Dict]:
+    """search_notes_for_terms() over `notes` via a prebuilt index.
+
+    `notes` must be the list the index was built from (or one with the
+    same content); `allowed` optionally restricts the note indices.
+    """
+    terms_lower = [t.lower() for t in terms]
+    if not set(terms_lower).issubset(_HCR20_TERM_OWNERS):
+        subset = [n for i, n in enumerate(notes) if allowed is None or i in allowed]
+        return search_notes_for_terms(subset, terms)
+
+    # Positions of each term in the list, so a note only walks the terms it contains
+    positions: Dict[str, List[int]] = {}
+    for j, term_lower in enumerate(terms_lower):
+        positions.setdefault(term_lower, []).append(j)
+
+    matches = []
+    per_note = index.candidates(terms_lower)
+    for i in sorted(per_note):
+        if allowed is not None and i not in allowed:
+            continue
+        offsets = per_note[i]
+        present = sorted(j for term_lower in offsets for j in positions[term_lower])
+        note = notes[i]
+        content = get_note_content(note).lower()
+        note_matches = _excerpts_for_note(content, [terms[j] for j in present],
+                                          [terms_lower[j] for j in present], offsets)
         if note_matches:
             matches.append({
-                'note': note if not preprocessed else note,
-                'date': parse_date_from_note(note if not preprocessed else note),
+                'note': note,
+                'date': index.date(i),
                 'matches': note_matches,
             })
 
     return matches
 
 
-def extract_for_hcr_item(item_key: str, notes: List[Dict], preprocessed: List[tuple] = None, max_notes: int = 2000) -> Dict[str, Any]:
+def get_hcr20_index(notes: List[Dict]) -> HCR20NoteIndex:
+    """
+    Index for `notes`: the shared one from the analysis cache if it has
+    already been built, otherwise built here. Never waits on the cache's
+    background queue, so it is safe to call on the GUI thread.
+    """
+    try:
+        from analysis_cache import get_analysis_cache
+    except ImportError:
+        return HCR20NoteIndex(notes)
+    index = get_analysis_cache().peek("hcr20_index", notes)
+    if index is None:
+        index = HCR20NoteIndex(notes)
+    return index
+
+
+def extract_for_hcr_item(item_key: str, notes: List[Dict], preprocessed: List[tuple] = None,
+                         max_notes: Optional[int] = None,
+                         index: Optional[HCR20NoteIndex] = None) -> Dict[str, Any]:
     """
     Extract relevant information for a specific HCR-20 item.
 
     Args:
         item_key: The HCR-20 item code (e.g., 'H1', 'C3', 'R5')
         notes: List of note dictionaries
-        preprocessed: Optional pre-processed notes (note, content_lower) tuples
-        max_notes: Maximum notes to search for historical items (default 2000)
+        preprocessed: Optional pre-processed notes (see preprocess_notes),
+            used instead of the index when given
+        max_notes: Optional cap on notes searched for non-clinical items
+            (default: search every note)
+        index: Optional prebuilt HCR20NoteIndex for `notes`
 
     Returns:
         Dictionary with extracted information for each subsection
@@ -1074,33 +1278,45 @@ def extract_for_hcr_item(item_key: str, notes: List[Dict], preprocessed: List[tu
     if item_key not in HCR20_EXTRACTION_TERMS:
         return {'error': f'Unknown item: {item_key}'}
 
+    t0 = time.perf_counter()
     item_config = HCR20_EXTRACTION_TERMS[item_key]
     scope = item_config['scope']
+    subsections = item_config.get('subsections', {})
+
+    if preprocessed:
+        # Legacy path: search the caller's preprocessed notes
+        if scope == 'clinical':
+            filtered_notes = filter_notes_by_date(notes, months=6)
+        else:
+            filtered_notes = notes[:max_notes] if max_notes is not None else notes
+        filtered_set = set(id(n) for n in filtered_notes)
+        preprocessed_notes = [entry for entry in preprocessed if id(entry[0]) in filtered_set]
 
-    # Filter notes based on scope
-    if scope == 'clinical':
-        # Clinical items: only last 6 months
-        filtered_notes = filter_notes_by_date(notes, months=6)
+        def search(terms):
+            return search_notes_for_terms(filtered_notes, terms, preprocessed_notes)
+        notes_searched = len(filtered_notes)
     else:
-        # Historical and Risk Management: limit to most recent notes for performance
-        filtered_notes = notes[:max_notes] if len(notes) > max_notes else notes
+        if index is None:
+            index = HCR20NoteIndex(notes)
+        # Clinical items: only last 6 months
+        if scope == 'clinical':
+            allowed = index.indices_since(6)
+        elif max_notes is not None and max_notes < len(notes):
+            allowed = set(range(max_notes))
+        else:
+            allowed = None
 
-    # Pre-process notes for this search (lowercase conversion done once)
-    if not preprocessed:
-        preprocessed_notes = [(note, get_note_content(note).lower()) for note in filtered_notes]
-    else:
-        # Filter preprocessed list to match filtered_notes
-        filtered_set = set(id(n) for n in filtered_notes)
-        preprocessed_notes = [(n, c) for n, c in preprocessed if id(n) in filtered_set]
+        def search(terms):
+            return search_index_for_terms(index, notes, terms, allowed)
+        notes_searched = len(notes) if allowed is None else len(allowed)
 
-    # Search for main terms using preprocessed notes
-    main_matches = search_notes_for_terms(filtered_notes, item_config['terms'], preprocessed_notes)
+    main_matches = search(item_config['terms'])
 
     # Only search subsections if we found main matches (optimization)
     subsection_results = {}
     if main_matches:
-        for subsection_key, subsection_terms in item_config.get('subsections', {}).items():
-            subsection_matches = search_notes_for_terms(filtered_notes, subsection_terms, preprocessed_notes)
+        for subsection_key, subsection_terms in subsections.items():
+            subsection_matches = search(subsection_terms)
             if subsection_matches:
                 subsection_results[subsection_key] = subsection_matches
 
@@ -1108,35 +1324,39 @@ def extract_for_hcr_item(item_key: str, notes: List[Dict], preprocessed: List[tu
         'item_key': item_key,
         'title': item_config['title'],
         'scope': scope,
-        'notes_searched': len(filtered_notes),
+        'notes_searched': notes_searched,
         'total_notes': len(notes),
+        'search_seconds': time.perf_counter() - t0,
         'main_matches': main_matches,
         'subsection_matches': subsection_results,
     }
 
 
-def extract_all_hcr20(notes: List[Dict], max_notes: int = 2000) -> Dict[str, Any]:
+def extract_all_hcr20(notes: List[Dict], max_notes: Optional[int] = None,
+                      index: Optional[HCR20NoteIndex] = None) -> Dict[str, Any]:
     """
     Extract information for all HCR-20 items from notes.
 
     Args:
         notes: List of note dictionaries
-        max_notes: Maximum notes to process for historical items (default 2000)
+        max_notes: Optional cap on notes searched for non-clinical items
+            (default: search every note)
+        index: Optional prebuilt HCR20NoteIndex for `notes`
 
     Returns:
         Dictionary with results for each HCR-20 item
     """
     results = {}
 
-    # Pre-process notes ONCE for all searches (major optimization)
-    # Limit to most recent notes for performance
-    notes_to_process = notes[:max_notes] if len(notes) > max_notes else notes
-    print(f"[HCR-20 Extractor] Pre-processing {len(notes_to_process)} notes...")
-    preprocessed = [(note, get_note_content(note).lower()) for note in notes_to_process]
-    print(f"[HCR-20 Extractor] Pre-processing complete. Extracting items...")
+    # Index the notes ONCE for all searches
+    if index is None:
+        index = HCR20NoteIndex(notes)
 
+    t0 = time.perf_counter()
     for item_key in HCR20_EXTRACTION_TERMS.keys():
-        results[item_key] = extract_for_hcr_item(item_key, notes_to_process, preprocessed, max_notes)
+        results[item_key] = extract_for_hcr_item(item_key, notes, max_notes=max_notes, index=index)
+    print(f"[HCR-20 Extractor] Searched {len(notes)} notes for {len(results)} items "
+          f"in {time.perf_counter() - t0:.2f}s")
 
     return results
 
@@ -1161,10 +1381,13 @@ def format_extraction_for_display(extraction_result: Dict[str, Any]) -> str:
     notes_searched = extraction_result.get('notes_searched', 0)
     total_notes = extraction_result.get('total_notes', 0)
 
+    seconds = extraction_result.get('search_seconds')
+    timing = f" in {seconds:.2f}s" if seconds is not None else ""
+
     if scope == 'clinical':
-        lines.append(f"[Clinical item - searched {notes_searched} notes from last 6 months]")
+        lines.append(f"[Clinical item - searched {notes_searched} notes from last 6 months{timing}]")
     else:
-        lines.append(f"[{scope.title()} item - searched {notes_searched} of {total_notes} notes]")
+        lines.append(f"[{scope.title()} item - searched {notes_searched} of {total_notes} notes{timing}]")
     lines.append("")
 
     # Add main matches
@@ -1266,20 +1489,35 @@ class HCR20Extractor:
     def __init__(self, notes: List[Dict] = None):
         self.notes = notes or []
         self.results = {}
+        self._index: Optional[HCR20NoteIndex] = None
+        self.index_seconds = 0.0
+        self.search_seconds = 0.0
 
     def set_notes(self, notes: List[Dict]):
         """Set the notes to extract from."""
         self.notes = notes
         self.results = {}  # Clear previous results
+        self._index = None
+
+    def get_index(self) -> HCR20NoteIndex:
+        """The note index, fetched from the shared cache or built on first use."""
+        if self._index is None:
+            t0 = time.perf_counter()
+            self._index = get_hcr20_index(self.notes)
+            self.index_seconds = time.perf_counter() - t0
+        return self._index
 
     def extract_all(self) -> Dict[str, Any]:
         """Extract information for all HCR-20 items."""
-        self.results = extract_all_hcr20(self.notes)
+        index = self.get_index()
+        t0 = time.perf_counter()
+        self.results = extract_all_hcr20(self.notes, index=index)
+        self.search_seconds = time.perf_counter() - t0
         return self.results
 
     def extract_item(self, item_key: str) -> Dict[str, Any]:
         """Extract information for a specific HCR-20 item."""
-        result = extract_for_hcr_item(item_key, self.notes)
+        result = extract_for_hcr_item(item_key, self.notes, index=self.get_index())
         self.results[item_key] = result
         return result
 
@@ -1302,6 +1540,9 @@ class HCR20Extractor:
 
         summary = {
             'total_notes': len(self.notes),
+            'notes_searched': max((r.get('notes_searched', 0) for r in self.results.values()), default=0),
+            'index_seconds': self.index_seconds,
+            'search_seconds': self.search_seconds,
             'items_with_matches': 0,
             'items_without_matches': 0,
             'by_scope': {
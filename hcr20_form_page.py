@@ -6,6 +6,7 @@
 
 from __future__ import annotations
 import sys
+from collections.abc import Mapping
 from datetime import datetime
 from typing import Optional
 from PySide6.QtCore import Qt, Signal, QDate, QEvent
@@ -15316,7 +15317,7 @@ class HCR20FormPage(QWidget):
         For H1 (Violence): Analyzes Physical Aggression, Verbal Aggression (high severity)
         For H2 (Antisocial): Analyzes Property Damage, Sexual Behaviour
         """
-        from risk_overview_panel import analyze_notes_for_risk
+        from analysis_cache import when_risk_ready
         from datetime import datetime
         import re
         import html
@@ -15333,9 +15334,13 @@ class HCR20FormPage(QWidget):
 
         all_incidents = []
 
-        # Run risk analysis on notes
+        # Risk analysis runs in the background — come back once it is ready
         if notes:
-            results = analyze_notes_for_risk(notes)
+            results = when_risk_ready(
+                notes, lambda _: self.set_hcr_forensic_data(key, notes), self, f"forensic_{key}"
+            )
+            if results is None:
+                return
             for cat_name in RELEVANT_CATEGORIES:
                 cat_data = results.get("categories", {}).get(cat_name, {})
                 for incident in cat_data.get("incidents", []):
@@ -15913,7 +15918,7 @@ class HCR20FormPage(QWidget):
 
         Uses analyze_notes_for_risk to find "Substance Misuse" category incidents.
         """
-        from risk_overview_panel import analyze_notes_for_risk
+        from analysis_cache import when_risk_ready
         from datetime import datetime
         import re
         import html
@@ -15923,9 +15928,14 @@ class HCR20FormPage(QWidget):
 
         all_incidents = []
 
-        # Run risk analysis on notes - use "Substance Misuse" category
+        # Risk analysis on notes - use "Substance Misuse" category.
+        # It runs in the background — come back once it is ready
         if notes:
-            results = analyze_notes_for_risk(notes)
+            results = when_risk_ready(
+                notes, lambda _: self.set_hcr_substance_data(notes), self, "substance_h5"
+            )
+            if results is None:
+                return
             substance_data = results.get("categories", {}).get("Substance Misuse", {})
             for incident in substance_data.get("incidents", []):
                 all_incidents.append({
@@ -16926,11 +16936,10 @@ class HCR20FormPage(QWidget):
             progress.setLabelText("Step 3/3: Analyzing risk patterns...")
             QApplication.processEvents()
 
-            # Cache risk analysis results to avoid running 3 times
-            from risk_overview_panel import analyze_notes_for_risk
-            # Limit notes for risk analysis to improve performance
-            risk_notes = notes[:2000] if len(notes) > 2000 else notes
-            cached_risk_results = analyze_notes_for_risk(risk_notes)
+            # Make sure the shared risk analysis is computing in the background
+            # (a no-op if it already is, or has finished) — never wait for it here
+            from analysis_cache import get_analysis_cache
+            get_analysis_cache().prefetch("risk", notes)
             progress.setValue(80)
             QApplication.processEvents()
 
@@ -16949,7 +16958,9 @@ class HCR20FormPage(QWidget):
             # Show summary
             msg = (
                 f"Extraction Complete\n\n"
-                f"Notes searched: {summary['total_notes']}\n"
+                f"Notes searched: {summary['notes_searched']} of {summary['total_notes']} "
+                f"in {summary['search_seconds']:.2f}s"
+                f" (index ready in {summary['index_seconds']:.2f}s)\n"
                 f"Items with matches: {summary['items_with_matches']}\n"
                 f"Items without matches: {summary['items_without_matches']}\n\n"
                 f"Historical (H1-H10): {summary['by_scope']['historical']['with_matches']} items with data\n"
@@ -17241,7 +17252,7 @@ class HCR20FormPage(QWidget):
         for match in deduplicated_matches[:max_entries]:
             dt = match.get('date')
             note = match.get('note', {})
-            source = note.get('source', '') if isinstance(note, dict) else ''
+            source = note.get('source', '') if isinstance(note, Mapping) else ''
 
             # For H6-H10, C1-C5, R1-R5, show excerpts around the matched terms
             if key in ('h6', 'h7', 'h8', 'h10', 'c1', 'c2', 'c3', 'c4', 'c5', 'r1', 'r2', 'r3', 'r4', 'r5'):
@@ -17253,7 +17264,7 @@ class HCR20FormPage(QWidget):
                 text = "\n\n".join(match_texts) if match_texts else ''
             else:
                 # Get the FULL note content (not just excerpts)
-                if isinstance(note, dict):
+                if isinstance(note, Mapping):
                     text = note.get('text', '') or note.get('content', '') or ''
                 else:
                     text = str(note) if note else ''
@@ -17463,7 +17474,7 @@ class HCR20FormPage(QWidget):
         # Run the exact same search logic as analyze_notes_for_risk() but only for Substance Misuse
         all_matches = []
         for note in all_notes:
-            if not isinstance(note, dict):
+            if not isinstance(note, Mapping):
                 continue
 
             text = note.get("text", "") or note.get("content", "") or note.get("body", "")
@@ -17771,7 +17782,7 @@ class HCR20FormPage(QWidget):
         # Search all notes for matching terms
         all_matches = []
         for note in all_notes:
-            if not isinstance(note, dict):
+            if not isinstance(note, Mapping):
                 continue
 
             text = note.get('text', '') or note.get('body', '') or note.get('content', '')
@@ -18120,7 +18131,7 @@ class HCR20FormPage(QWidget):
         # Log date range
         dates = []
         for note in all_notes:
-            if isinstance(note, dict):
+            if isinstance(note, Mapping):
                 dt = note.get('date') or note.get('datetime')
                 if dt:
                     dates.append(dt)
@@ -18132,7 +18143,7 @@ class HCR20FormPage(QWidget):
         # Search all notes for matching terms
         all_matches = []
         for note in all_notes:
-            if not isinstance(note, dict):
+            if not isinstance(note, Mapping):
                 continue
 
             text = note.get('text', '') or note.get('body', '') or note.get('content', '')
@@ -18512,7 +18523,7 @@ class HCR20FormPage(QWidget):
         # Log date range of notes being searched
         dates = []
         for note in notes:
-            if isinstance(note, dict):
+            if isinstance(note, Mapping):
                 dt = note.get('date') or note.get('datetime')
                 if dt:
                     dates.append(dt)
@@ -18667,7 +18678,7 @@ class HCR20FormPage(QWidget):
         # Search all notes for matches
         all_matches = []
         for note in notes:
-            if isinstance(note, dict):
+            if isinstance(note, Mapping):
                 text = note.get('text', '') or note.get('content', '') or ''
             else:
                 text = str(note)
@@ -18677,7 +18688,7 @@ class HCR20FormPage(QWidget):
 
             text_lower = text.lower()
             if matches_any_pattern(text_lower, PATTERNS):
-                note_date = note.get('date') or note.get('datetime') if isinstance(note, dict) else None
+                note_date = note.get('date') or note.get('datetime') if isinstance(note, Mapping) else None
                 matched_terms = get_matched_terms(text_lower, PATTERNS)
                 all_matches.append({
                     'text': text,
@@ -18999,7 +19010,7 @@ class HCR20FormPage(QWidget):
         # Log date range of notes being searched
         dates = []
         for note in all_notes:
-            if isinstance(note, dict):
+            if isinstance(note, Mapping):
                 dt = note.get('date') or note.get('datetime')
                 if dt:
                     dates.append(dt)
@@ -19069,7 +19080,7 @@ class HCR20FormPage(QWidget):
 
         for note in all_notes:
             # Get note text
-            if isinstance(note, dict):
+            if isinstance(note, Mapping):
                 text = note.get('text', '') or note.get('content', '') or note.get('body', '') or ''
             else:
                 text = str(note) if note else ''
@@ -19084,7 +19095,7 @@ class HCR20FormPage(QWidget):
             is_non_intimate = matches_any_pattern(text_lower, NON_INTIMATE_PATTERNS)
 
             # Build match entry
-            note_date = note.get('date') or note.get('datetime') if isinstance(note, dict) else None
+            note_date = note.get('date') or note.get('datetime') if isinstance(note, Mapping) else None
 
             if is_intimate:
                 # Get the matched intimate terms for highlighting
@@ -19187,7 +19198,7 @@ class HCR20FormPage(QWidget):
             date_key = get_sort_date(match)
             num_matches = len(match.get('matches', []))
             note = match.get('note', {})
-            text_len = len(note.get('text', '') or note.get('content', '') or '') if isinstance(note, dict) else 0
+            text_len = len(note.get('text', '') or note.get('content', '') or '') if isinstance(note, Mapping) else 0
             relevance_score = num_matches * 100 + text_len
 
             if date_key not in seen_dates:
@@ -19210,10 +19221,10 @@ class HCR20FormPage(QWidget):
         for match in sorted_matches:
             dt = match.get('date')
             note = match.get('note', {})
-            source = note.get('source', '') if isinstance(note, dict) else ''
+            source = note.get('source', '') if isinstance(note, Mapping) else ''
 
             # Get the FULL note content
-            if isinstance(note, dict):
+            if isinstance(note, Mapping):
                 text = note.get('text', '') or note.get('content', '') or ''
             else:
                 text = str(note) if note else ''
@@ -19452,7 +19463,7 @@ class HCR20FormPage(QWidget):
         # Log date range of notes
         dates = []
         for note in all_notes:
-            if isinstance(note, dict):
+            if isinstance(note, Mapping):
                 dt = note.get('date') or note.get('datetime')
                 if dt:
                     dates.append(dt)
@@ -19522,7 +19533,7 @@ class HCR20FormPage(QWidget):
 
         for note in all_notes:
             # Get note text
-            if isinstance(note, dict):
+            if isinstance(note, Mapping):
                 text = note.get('text', '') or note.get('content', '') or note.get('body', '') or ''
             else:
                 text = str(note) if note else ''
@@ -19537,7 +19548,7 @@ class HCR20FormPage(QWidget):
             is_employment = matches_any_pattern(text_lower, EMPLOYMENT_PATTERNS)
 
             # Build match entry
-            note_date = note.get('date') or note.get('datetime') if isinstance(note, dict) else None
+            note_date = note.get('date') or note.get('datetime') if isinstance(note, Mapping) else None
 
             if is_education:
                 matched_terms = get_matched_terms(text_lower, EDUCATION_PATTERNS)
@@ -19636,7 +19647,7 @@ class HCR20FormPage(QWidget):
             date_key = get_sort_date(match)
             num_matches = len(match.get('matches', []))
             note = match.get('note', {})
-            text_len = len(note.get('text', '') or note.get('content', '') or '') if isinstance(note, dict) else 0
+            text_len = len(note.get('text', '') or note.get('content', '') or '') if isinstance(note, Mapping) else 0
             relevance_score = num_matches * 100 + text_len
 
             if date_key not in seen_dates:
@@ -19659,10 +19670,10 @@ class HCR20FormPage(QWidget):
         for match in sorted_matches:
             dt = match.get('date')
             note = match.get('note', {})
-            source = note.get('source', '') if isinstance(note, dict) else ''
+            source = note.get('source', '') if isinstance(note, Mapping) else ''
 
             # Get the FULL note content
-            if isinstance(note, dict):
+            if isinstance(note, Mapping):
                 text = note.get('text', '') or note.get('content', '') or ''
             else:
                 text = str(note) if note else ''
@@ -8,6 +8,8 @@ from __future__ import annotations
 import re
 from datetime import datetime, timedelta
 
+from timeline_builder import NoteDateIndex
+
 DEBUG = False
 print(">>> ACTIVE EXTRACTOR FILE:", __file__)
 
@@ -348,6 +350,7 @@ def is_medical_type(t):
 def find_clerkings_rio(notes, admission_dates):
     clerkings = []
     seen = set()
+    index = NoteDateIndex(notes)
 
     for adm in admission_dates:
         win_start = adm
@@ -358,9 +361,8 @@ def find_clerkings_rio(notes, admission_dates):
 
         # ✅ RIO = MEDICAL NOTES ONLY
         medical_notes = [
-            n for n in notes
-            if win_start <= n["date"].date() <= win_end
-            and is_medical_type(n.get("type", ""))
+            n for n in index.between(win_start, win_end)
+            if is_medical_type(n.get("type", ""))
         ]
 
         if DEBUG:
@@ -417,6 +419,7 @@ CARENOTES_STRONG = [t.lower() for t in CARENOTES_STRONG]
 def find_clerkings_carenotes(notes, admission_dates):
     clerkings = []
     seen = set()
+    index = NoteDateIndex(notes)
 
     if DEBUG:
         print("\n[CN] === CARENOTES SEARCH ===")
@@ -425,10 +428,7 @@ def find_clerkings_carenotes(notes, admission_dates):
         win_start = adm - timedelta(days=5)
         win_end = adm + timedelta(days=5)
 
-        within = [
-            n for n in notes
-            if win_start <= n["date"].date() <= win_end
-        ]
+        within = index.between(win_start, win_end)
 
         if DEBUG:
             print(f"[CN] Window {win_start} → {win_end} | {len(within)} notes")
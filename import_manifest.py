@@ -0,0 +1,98 @@
+# ================================================================
+# import_manifest.py — WHAT HAS ALREADY BEEN IMPORTED
+# MyPsychAdmin
+#
+# Records every source file behind the currently loaded notes:
+# path, size, mtime, sha256 and the IDs of the notes it produced.
+# PatientNotesPanel uses it to make re-imports incremental:
+#   • unchanged file  → not parsed at all
+#   • changed file    → parsed, only notes with unseen IDs merged
+# ================================================================
+
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Set
+
+from note_corpus import note_id
+
+UNCHANGED = "unchanged"
+CHANGED = "changed"
+NEW = "new"
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    path: str
+    size: int
+    mtime: float
+    sha256: str
+    note_ids: Set[str] = field(default_factory=set)
+
+
+class ImportManifest:
+    """Per-session record of imported source files (not persisted)."""
+
+    def __init__(self):
+        self._entries: Dict[str, ManifestEntry] = {}
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def get(self, path: str) -> ManifestEntry | None:
+        return self._entries.get(self._key(path))
+
+    def status(self, path: str) -> str:
+        """NEW, UNCHANGED or CHANGED relative to the last recorded import."""
+        entry = self.get(path)
+        if entry is None:
+            return NEW
+        try:
+            st = os.stat(path)
+        except OSError:
+            return CHANGED
+
+        # Fast path — size and mtime identical, don't hash
+        if st.st_size == entry.size and st.st_mtime == entry.mtime:
+            return UNCHANGED
+
+        # Touched or copied but same bytes
+        if st.st_size == entry.size and file_sha256(path) == entry.sha256:
+            entry.mtime = st.st_mtime
+            return UNCHANGED
+
+        return CHANGED
+
+    def record(self, path: str, note_ids: Iterable[str]):
+        st = os.stat(path)
+        self._entries[self._key(path)] = ManifestEntry(
+            path=path,
+            size=st.st_size,
+            mtime=st.st_mtime,
+            sha256=file_sha256(path),
+            note_ids=set(note_ids),
+        )
+
+    def new_notes(self, path: str, notes: List[Dict]) -> List[Dict]:
+        """Notes from `path` that the previous import of it did not produce."""
+        entry = self.get(path)
+        if entry is None:
+            return list(notes)
+        return [n for n in notes if note_id(n) not in entry.note_ids]
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
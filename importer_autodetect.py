@@ -12,12 +12,16 @@
 # ================================================================
 
 from __future__ import annotations
-from typing import List, Dict
+from typing import List, Dict, Iterator
 from pathlib import Path
 import re
-from importer_rio import parse_rio_file
+from importer_rio import parse_rio_file, iter_rio_notes
 from importer_carenotes import parse_carenotes_file
 from importer_epjs import parse_epjs_file
+from importer_workbook import read_workbook, sniff_lines, sniff_workbook_lines, is_streamable
+
+# Notes per batch handed on by iter_autodetect_batches()
+STREAM_BATCH_SIZE = 500
 
 
 def detect_note_system(lines: list[str]) -> str:
@@ -53,8 +57,6 @@ def import_files_autodetect(paths: List[str]) -> List[Dict]:
     Intelligent importer:
     Detects RIO / CareNotes / EPJS per file and routes accordingly.
     """
-    import pandas as pd
-
     all_notes: List[Dict] = []
 
     for p in paths:
@@ -66,33 +68,27 @@ def import_files_autodetect(paths: List[str]) -> List[Dict]:
         print(f"[AUTO] Inspecting → {p}")
 
         # ---------------------------------
-        # Read minimal content for detection
+        # Read ONCE — sniff a prefix only
         # ---------------------------------
-        df = pd.read_excel(p, header=None, dtype=str)
-
-        lines: list[str] = []
-        for _, row in df.iterrows():
-            for cell in row:
-                s = str(cell).strip()
-                if s and s.lower() not in {"nan", "none", "<na>"}:
-                    lines.append(s)
+        df = read_workbook(p)
+        lines = sniff_lines(df)
 
         system = detect_note_system(lines)
         print(f"[AUTO] Detected system = {system.upper()}")
 
         # ---------------------------------
-        # Route to correct parser
+        # Route to correct parser (same frame)
         # ---------------------------------
         if system == "rio":
-            notes = parse_rio_file(p)
+            notes = parse_rio_file(p, df=df)
             src = "rio"
 
         elif system == "epjs":
-            notes = parse_epjs_file(p)
+            notes = parse_epjs_file(p, df=df)
             src = "epjs"
 
         else:
-            notes = parse_carenotes_file(p)
+            notes = parse_carenotes_file(p, df=df)
             src = "carenotes"
 
         # ---------------------------------
@@ -109,6 +105,44 @@ def import_files_autodetect(paths: List[str]) -> List[Dict]:
     print(f"[AUTO] DONE — {len(all_notes)} notes")
     return all_notes
 
+
+def iter_autodetect_batches(path: str, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """
+    Streaming import_files_autodetect([path]) for ONE file.
+
+    RiO .xlsx exports are walked row by row and yielded in batches as
+    their notes close, so a caller can show the first notes while the
+    rest are still being read. Other systems and legacy .xls files
+    cannot be streamed and arrive as a single batch.
+    """
+    if not is_streamable(path):
+        yield import_files_autodetect([path])
+        return
+
+    system = detect_note_system(sniff_workbook_lines(path))
+    if system != "rio":
+        yield import_files_autodetect([path])
+        return
+
+    print(f"[AUTO] Streaming RIO → {path}")
+    batch: List[Dict] = []
+    total = 0
+    for n in iter_rio_notes(path):
+        if "content" in n:
+            n["text"] = n.pop("content")
+        n["source"] = "rio"
+        n["source_file"] = path
+        batch.append(n)
+        if len(batch) >= batch_size:
+            total += len(batch)
+            yield batch
+            batch = []
+    if batch:
+        total += len(batch)
+        yield batch
+
+    print(f"[AUTO] DONE — {total} notes (streamed)")
+
 # ================================================================
 # RIO IMPORT
 # ================================================================
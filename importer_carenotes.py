@@ -6,6 +6,8 @@ from datetime import datetime
 import pandas as pd
 import re
 from utils.resource_path import resource_path
+from importer_workbook import read_workbook
+from importer_dates import parse_dates
 
 
 def looks_like_carenotes_report(df: pd.DataFrame) -> bool:
@@ -66,6 +68,34 @@ def is_date(s: str) -> bool:
     return DATE_RE1.match(s) or DATE_RE2.match(s) or DATE_RE3.match(s)
 
 
+# Note header "date + time" formats (d/m/Y or ISO, with or without seconds)
+NOTE_DATETIME_FORMATS = (
+    "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M",
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M",
+)
+
+
+def _note_header_datetimes(lines: List[str]) -> Dict[int, datetime | None]:
+    """
+    Batch-parse every candidate note header up front.
+    A candidate is a date line with a time within the next 5 lines;
+    maps the date line's index → parsed datetime (or None).
+    """
+    n = len(lines)
+    idx: List[int] = []
+    combined: List[str] = []
+    for i, line in enumerate(lines):
+        if not is_date(line):
+            continue
+        for j in range(i + 1, min(i + 6, n)):
+            if TIME_RE.match(lines[j]):
+                base = line if "/" in line else line.split()[0]
+                idx.append(i)
+                combined.append(base + " " + lines[j])
+                break
+    return dict(zip(idx, parse_dates(combined, NOTE_DATETIME_FORMATS)))
+
+
 # ============================================================
 # SIGNATURE DETECTOR (bottom-most)
 # ============================================================
@@ -195,11 +225,12 @@ def flatten_rows(df) -> list[str]:
 # MAIN PARSER — matches RIO structure EXACTLY
 # ============================================================
 
-def parse_carenotes_file(path: str) -> List[Dict]:
+def parse_carenotes_file(path: str, df: pd.DataFrame | None = None) -> List[Dict]:
     print("[CARENOTES] Loading →", path)
 
-
-    df = pd.read_excel(path, header=None, dtype=str)
+    # Reuse the frame if the router already loaded the workbook
+    if df is None:
+        df = read_workbook(path)
     print("[CARENOTES] DF SHAPE:", df.shape)
     if looks_like_carenotes_report(df):
         print("[CARENOTES] REPORT PARSER USED (BULK MODE)")
@@ -319,6 +350,8 @@ def parse_carenotes_file(path: str) -> List[Dict]:
     if _demographics_header:
         print(f"[CARENOTES] Captured demographics header ({len(_header_lines)} lines, {len(_demographics_header)} chars)")
 
+    header_dts = _note_header_datetimes(lines)
+
     notes: List[Dict] = []
     n = len(lines)
     i = 0
@@ -340,26 +373,8 @@ def parse_carenotes_file(path: str) -> List[Dict]:
                 i += 1
                 continue
 
-            d_str = line
-            t_str = lines[j]
-            dt = None
-
-            # --- Try date + time parsing
-            try:
-                if "/" in d_str:
-                    dt = datetime.strptime(d_str + " " + t_str, "%d/%m/%Y %H:%M:%S")
-                else:
-                    base = d_str.split()[0]
-                    dt = datetime.strptime(base + " " + t_str, "%Y-%m-%d %H:%M:%S")
-            except:
-                try:
-                    if "/" in d_str:
-                        dt = datetime.strptime(d_str + " " + t_str, "%d/%m/%Y %H:%M")
-                    else:
-                        base = d_str.split()[0]
-                        dt = datetime.strptime(base + " " + t_str, "%Y-%m-%d %H:%M")
-                except:
-                    dt = None
+            # --- Date + time parsed in one batch above
+            dt = header_dts.get(i)
 
             if not dt:
                 i += 1
@@ -0,0 +1,120 @@
+# ================================================================
+# importer_dates.py — SHARED DATE NORMALISATION FOR IMPORTERS
+# MyPsychAdmin
+#
+# Each export uses one date format for almost every note, so the
+# importers no longer try their whole format list (one exception
+# per miss) on every string:
+#
+#   • parse_batch() — detects the dominant format once, parses the
+#     whole batch with a vectorised pd.to_datetime(format=...), and
+#     only falls back item-by-item for the stragglers.
+#   • parse()       — for the streaming state machines (RiO, EPJS):
+#     tries the format that last succeeded first.
+#
+# Results are identical to the old "first format that parses" loops
+# because every importer's format list is mutually exclusive.
+# ================================================================
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+# Strings inspected when picking the dominant format for a batch
+DETECT_SAMPLE = 200
+
+
+class DateNormaliser:
+    """Per-file date parser over an ordered list of strptime formats."""
+
+    def __init__(
+        self,
+        formats: Sequence[str],
+        fallback: Optional[Callable[[str], Optional[datetime]]] = None,
+    ):
+        self.formats: List[str] = list(formats)
+        self.fallback = fallback
+        self.dominant: Optional[str] = None
+
+    # --------------------------------------------------------
+    # Single value (streaming parsers)
+    # --------------------------------------------------------
+    def parse(self, s: str) -> Optional[datetime]:
+        if not s:
+            return None
+
+        if self.dominant is not None:
+            try:
+                return datetime.strptime(s, self.dominant)
+            except ValueError:
+                pass
+
+        for fmt in self.formats:
+            if fmt == self.dominant:
+                continue
+            try:
+                dt = datetime.strptime(s, fmt)
+            except ValueError:
+                continue
+            self.dominant = fmt
+            return dt
+
+        if self.fallback is not None:
+            return self.fallback(s)
+        return None
+
+    # --------------------------------------------------------
+    # Batch (vectorised)
+    # --------------------------------------------------------
+    def detect(self, values: Iterable[str]) -> Optional[str]:
+        """Pick the format that parses the most of a sample of values."""
+        sample = [v for v in values if v][:DETECT_SAMPLE]
+        if not sample:
+            return None
+        series = pd.Series(sample, dtype=object)
+        best, best_hits = None, 0
+        for fmt in self.formats:
+            hits = int(pd.to_datetime(series, format=fmt, errors="coerce").notna().sum())
+            if hits > best_hits:
+                best, best_hits = fmt, hits
+        if best is not None:
+            self.dominant = best
+        return best
+
+    def parse_batch(self, values: Sequence[str]) -> List[Optional[datetime]]:
+        """Parse many strings at once; None where nothing matches."""
+        values = list(values)
+        if not values:
+            return []
+
+        if self.dominant is None:
+            self.detect(values)
+
+        out: List[Optional[datetime]] = [None] * len(values)
+        present = [i for i, v in enumerate(values) if v]
+        if self.dominant is not None and present:
+            parsed = pd.to_datetime(
+                pd.Series([values[i] for i in present], dtype=object),
+                format=self.dominant, errors="coerce",
+            )
+            # datetime64[us] → object gives plain datetimes (NaT → None)
+            for i, dt in zip(present, parsed.to_numpy(dtype="datetime64[us]").astype(object)):
+                out[i] = dt
+
+        # Stragglers — other formats / fallback, one at a time
+        for i in present:
+            if out[i] is None:
+                out[i] = self.parse(values[i])
+        return out
+
+
+def parse_dates(
+    values: Sequence[str],
+    formats: Sequence[str],
+    fallback: Optional[Callable[[str], Optional[datetime]]] = None,
+) -> List[Optional[datetime]]:
+    """One-shot batch parse with a fresh DateNormaliser."""
+    return DateNormaliser(formats, fallback).parse_batch(values)
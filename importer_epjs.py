@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from typing import List, Dict
-from datetime import datetime
 import pandas as pd
 import re
+from importer_workbook import read_workbook
+from importer_dates import DateNormaliser
 
 
 # ============================================================
@@ -89,6 +90,14 @@ DATE_START_NO_TIME_RE = re.compile(
 # ------------------------------------------------------------
 ORIGINATOR_RE = re.compile(r"^Originator:\s*(?P<name>.+)", re.IGNORECASE)
 
+# Date (+ time) formats, mutually exclusive — order kept from the old loop
+EPJS_DATE_FORMATS = (
+    "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y",
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d",
+    # EPJS date format: "17 Feb 2024 14:30"
+    "%d %b %Y %H:%M", "%d %b %Y",
+)
+
 # Metadata lines to skip
 METADATA_PREFIXES = ("event by", "entered by", "amended by", "locked by",
                      "detail", "amend", "lock", "actionsoverview")
@@ -139,10 +148,12 @@ def is_date(s: str) -> bool:
 # ============================================================
 # MAIN PARSER
 # ============================================================
-def parse_epjs_file(path: str) -> List[Dict]:
+def parse_epjs_file(path: str, df: pd.DataFrame | None = None) -> List[Dict]:
     print("[EPJS] Loading →", path)
 
-    df = pd.read_excel(path, header=None, dtype=str)
+    # Reuse the frame if the router already loaded the workbook
+    if df is None:
+        df = read_workbook(path)
 
     # --------------------------------------------------------
     # Flatten: each non-empty cell becomes a separate line
@@ -164,6 +175,7 @@ def parse_epjs_file(path: str) -> List[Dict]:
     current_date = None
     current_body: List[str] = []
     current_originator = ""
+    dates = DateNormaliser(EPJS_DATE_FORMATS)
 
     def _parse_dt(d_str, t_str=None):
         """Parse date string (+ optional time) into datetime."""
@@ -171,19 +183,7 @@ def parse_epjs_file(path: str) -> List[Dict]:
             combined = d_str + " " + t_str
         else:
             combined = d_str
-        for fmt in ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y",
-                     "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(combined, fmt)
-            except ValueError:
-                continue
-        # EPJS date format: "17 Feb 2024 14:30"
-        for fmt in ("%d %b %Y %H:%M", "%d %b %Y"):
-            try:
-                return datetime.strptime(combined, fmt)
-            except ValueError:
-                continue
-        return None
+        return dates.parse(combined)
 
     def save_current_note():
         nonlocal current_date, current_body, current_originator
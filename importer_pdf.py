@@ -21,9 +21,14 @@ import platform
 import os
 import numpy as np
 
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
 from PIL import Image
 from datetime import datetime
 from utils.resource_path import resource_path
+from ocr_cache import page_cache_key, get_cached_ocr, put_cached_ocr
 
 # -------------------------
 # Tesseract Path Handling
@@ -69,6 +74,20 @@ def debug(msg):
     if DEBUG_ENABLED:
         print(msg)
 
+# ---------------------------------------------------------------
+# PARALLEL OCR SETTINGS
+# ---------------------------------------------------------------
+# Worker processes for page OCR (0 = one per CPU, 1 = serial).
+# PDFs parsed inside the multi-file import pool always OCR serially
+# (importer_pipeline.submit_import_file), so pools are never nested.
+OCR_WORKERS = int(os.environ.get("MYPSY_OCR_WORKERS", "0") or 0)
+
+# Documents shorter than this are OCR'd serially (pool start-up dominates)
+OCR_PARALLEL_MIN_PAGES = 8
+
+# Pages handed to a worker per task (each task re-opens the PDF once)
+OCR_CHUNK_PAGES = 4
+
 # ---------------------------------------------------------------
 # REGEXES
 # ---------------------------------------------------------------
@@ -122,7 +141,19 @@ def get_fitz_text(page) -> str:
 
 
 def ocr_page(page, dpi=200) -> str:
-    """Run OCR on a PDF page rendered as an image."""
+    """Run OCR on a PDF page rendered as an image (persistent cache first)."""
+    try:
+        cache_key = page_cache_key(page, dpi)
+    except Exception as e:
+        debug(f"[OCR] Cache key failed: {e}")
+        cache_key = None
+
+    if cache_key:
+        cached = get_cached_ocr(cache_key)
+        if cached is not None:
+            debug("[OCR] Cache hit")
+            return cached
+
     try:
         pix = page.get_pixmap(dpi=dpi)
         img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
@@ -144,7 +175,10 @@ def ocr_page(page, dpi=200) -> str:
             lines.append(ln)
 
     debug(f"[OCR] Extracted {len(lines)} lines")
-    return "\n".join(lines)
+    result = "\n".join(lines)
+    if cache_key:
+        put_cached_ocr(cache_key, result)
+    return result
 
 
 def perform_smart_ocr(page, fitz_text: str) -> str:
@@ -752,13 +786,214 @@ def final_cleanup(notes):
     return cleaned
 
 
+# ===============================================================
+# PAGE CLASSIFICATION — does this page need OCR at all?
+# ===============================================================
+# Set True to OCR every page regardless of its text layer
+ALWAYS_OCR = False
+
+MIN_TEXT_CHARS = 40          # below this the page has no usable text layer
+MIN_TEXT_DENSITY = 0.0015    # text chars per pt² of page area (~150 chars on A4)
+MAX_IMAGE_COVERAGE = 0.5     # image area / page area above which it's a scan
+MAX_GARBLED_RATIO = 0.02     # share of U+FFFD glyphs → broken font encoding
+
+
+def _image_coverage(page) -> float:
+    """Fraction of the page area covered by embedded images."""
+    page_area = abs(page.rect)
+    if not page_area:
+        return 0.0
+    try:
+        infos = page.get_image_info()
+    except Exception:
+        return 0.0
+    covered = 0.0
+    for info in infos:
+        bbox = fitz.Rect(info.get("bbox", (0, 0, 0, 0))) & page.rect
+        covered += abs(bbox)
+    return min(1.0, covered / page_area)
+
+
+def classify_page(page, fitz_text: str) -> tuple[bool, str]:
+    """
+    Decide whether a page needs Tesseract.
+    Returns (needs_ocr, reason) — reason is used in the import summary.
+    """
+    if ALWAYS_OCR:
+        return True, "OCR forced"
+
+    chars = len(fitz_text.replace("\n", ""))
+    if chars < MIN_TEXT_CHARS:
+        return True, "no text layer"
+
+    if fitz_text.count("\ufffd") / chars > MAX_GARBLED_RATIO:
+        return True, "garbled text layer"
+
+    if _image_coverage(page) > MAX_IMAGE_COVERAGE:
+        return True, "scanned image"
+
+    # Note headers present → the text layer carries the structure we parse
+    if any(DATE1_RE.match(ln) for ln in fitz_text.split("\n")):
+        return False, "date headers in text layer"
+
+    page_area = abs(page.rect) or 1.0
+    if chars / page_area >= MIN_TEXT_DENSITY:
+        return False, "dense text layer"
+
+    return True, "sparse text layer"
+
+
+# ===============================================================
+# PAGE PIPELINE — classify every page, OCR only those that need it
+# ===============================================================
+def summarise_ocr(pages: list[tuple[str, bool, str]]) -> str:
+    """One-line summary: how many pages were OCR'd and why."""
+    ocr_reasons: dict[str, int] = {}
+    skip_reasons: dict[str, int] = {}
+    for _, ocr_done, reason in pages:
+        bucket = ocr_reasons if ocr_done else skip_reasons
+        bucket[reason] = bucket.get(reason, 0) + 1
+
+    def _fmt(counts):
+        return ", ".join(f"{n} {r}" for r, n in sorted(counts.items(), key=lambda kv: -kv[1]))
+
+    ocr_count = sum(ocr_reasons.values())
+    summary = f"{len(pages)} pages: {ocr_count} OCR'd"
+    if ocr_reasons:
+        summary += f" ({_fmt(ocr_reasons)})"
+    summary += f", {len(pages) - ocr_count} skipped"
+    if skip_reasons:
+        summary += f" ({_fmt(skip_reasons)})"
+    return summary
+
+
+def _init_ocr_worker():
+    # One Tesseract thread per process — the pool already uses every core
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _ocr_page_chunk(path: str, page_numbers: list[int]) -> list[str]:
+    """Worker task: open the PDF and smart-OCR a run of pages."""
+    doc = fitz.open(path)
+    try:
+        return [perform_smart_ocr(doc[i], get_fitz_text(doc[i])) for i in page_numbers]
+    finally:
+        doc.close()
+
+
+_ocr_pool: ProcessPoolExecutor | None = None
+_ocr_pool_size = 0
+
+
+def _ocr_worker_count(workers) -> int:
+    if workers is None:
+        workers = OCR_WORKERS
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(1, workers)
+
+
+def _get_ocr_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared spawn pool, kept alive between imports (recreated if resized)."""
+    global _ocr_pool, _ocr_pool_size
+    if _ocr_pool is None or _ocr_pool_size != workers:
+        reset_ocr_pool()
+        _ocr_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_ocr_worker,
+        )
+        _ocr_pool_size = workers
+    return _ocr_pool
+
+
+def reset_ocr_pool():
+    """Shut the OCR pool down (broken pool, or before the OCR cache is purged)."""
+    global _ocr_pool, _ocr_pool_size
+    if _ocr_pool is not None:
+        _ocr_pool.shutdown(wait=False, cancel_futures=True)
+    _ocr_pool = None
+    _ocr_pool_size = 0
+
+
+def _ocr_pages_serial(doc, page_numbers: list[int], fitz_texts: list[str]) -> list[str]:
+    texts = []
+    for i in page_numbers:
+        debug(f"[PAGE] OCR page {i + 1}/{len(doc)}")
+        texts.append(perform_smart_ocr(doc[i], fitz_texts[i]))
+    return texts
+
+
+def _ocr_pages(path: str, doc, page_numbers: list[int], fitz_texts: list[str], workers) -> list[str]:
+    """
+    Smart-OCR the given pages, in parallel for long runs. Order preserved.
+    A chunk whose worker fails is OCR'd again serially in this process,
+    so one bad page never fails the whole import.
+    """
+    workers = _ocr_worker_count(workers)
+
+    if workers <= 1 or len(page_numbers) < OCR_PARALLEL_MIN_PAGES:
+        return _ocr_pages_serial(doc, page_numbers, fitz_texts)
+
+    debug(f"[PAGE] OCR {len(page_numbers)} pages across {workers} workers")
+    chunks = [
+        page_numbers[start:start + OCR_CHUNK_PAGES]
+        for start in range(0, len(page_numbers), OCR_CHUNK_PAGES)
+    ]
+    try:
+        pool = _get_ocr_pool(workers)
+        futures = [pool.submit(_ocr_page_chunk, path, chunk) for chunk in chunks]
+    except Exception as e:
+        debug(f"[PAGE] OCR pool unavailable ({e}) — falling back to serial")
+        reset_ocr_pool()
+        return _ocr_pages_serial(doc, page_numbers, fitz_texts)
+
+    texts = []
+    for chunk, fut in zip(chunks, futures):
+        try:
+            texts.extend(fut.result())
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                reset_ocr_pool()
+            debug(f"[PAGE] OCR worker failed on pages {chunk[0] + 1}-{chunk[-1] + 1} "
+                  f"({e}) — OCR'ing them serially")
+            texts.extend(_ocr_pages_serial(doc, chunk, fitz_texts))
+    return texts
+
+
+def extract_pdf_pages(path: str, doc, workers=None) -> list[tuple[str, bool, str]]:
+    """
+    Return (text, ocr_done, reason) for every page, in page order.
+    The text layer is read for every page; only pages that
+    classify_page() flags are rasterised and sent to Tesseract.
+    """
+    fitz_texts: list[str] = []
+    decisions: list[tuple[bool, str]] = []
+    for page in doc:
+        fitz_text = get_fitz_text(page)
+        fitz_texts.append(fitz_text)
+        decisions.append(classify_page(page, fitz_text))
+
+    need_ocr = [i for i, (needs, _) in enumerate(decisions) if needs]
+    texts = list(fitz_texts)
+    if need_ocr:
+        for i, text in zip(need_ocr, _ocr_pages(path, doc, need_ocr, fitz_texts, workers)):
+            texts[i] = text
+
+    return [
+        (texts[i], needs, reason)
+        for i, (needs, reason) in enumerate(decisions)
+    ]
+
+
 # ===============================================================
 # PUBLIC ENTRY POINT — CALLED BY MyPsychAdmin
 # ===============================================================
-def import_pdf_notes(file_list):
+def import_pdf_notes(file_list, workers=None):
     """
     Main entry point called by MyPsychAdmin.
     file_list — list of PDF paths.
+    workers — OCR worker processes (None = OCR_WORKERS, 1 = serial).
     Returns a list of structured notes.
     """
 
@@ -774,12 +1009,14 @@ def import_pdf_notes(file_list):
             debug(f"[IMPORT] ERROR opening file {path}: {e}")
             continue
 
-        for page_num, page in enumerate(doc):
-            debug(f"[PAGE] Processing page {page_num + 1}/{len(doc)}")
+        try:
+            pages = extract_pdf_pages(path, doc, workers)
+        finally:
+            doc.close()
 
-            fitz_text = get_fitz_text(page)
-            merged = perform_smart_ocr(page, fitz_text)
+        print(f"[PDF] {os.path.basename(path)} — {summarise_ocr(pages)}")
 
+        for merged, _, _ in pages:
             # page break marker
             all_lines.append("<<<PAGEBREAK>>>")
 
@@ -788,8 +1025,6 @@ def import_pdf_notes(file_list):
                 if ln:
                     all_lines.append(ln)
 
-        doc.close()
-
     debug(f"[IMPORT] Total collected lines: {len(all_lines)}")
 
     # ----------------------------------------------------------
@@ -0,0 +1,123 @@
+# ================================================================
+# importer_pipeline.py — MULTI-FILE IMPORT ORCHESTRATION
+# MyPsychAdmin
+#
+# Every importer is a pure function path → list[dict], so a batch
+# of independent files (PDF / DOCX / CSV / RTF / Excel) can be
+# parsed concurrently in worker processes. The GUI side lives in
+# patient_notes_panel.ImportWorker; this module stays Qt-free so
+# it can be pickled into spawned workers.
+#
+# A single file is parsed in-process instead, through
+# iter_import_batches(), so large RiO exports reach the notes panel
+# in batches while the rest of the file is still being read.
+# ================================================================
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, Iterator, List
+
+SUPPORTED_EXTS = (".pdf", ".docx", ".csv", ".rtf", ".xlsx", ".xls")
+
+# Worker processes for multi-file imports (0 = one per CPU, max 4)
+IMPORT_WORKERS = int(os.environ.get("MYPSY_IMPORT_WORKERS", "0") or 0)
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def parse_import_file(path: str, ocr_workers: int | None = None) -> List[Dict]:
+    """
+    Route ONE file to its importer (in an import worker or in-process).
+    ocr_workers — passed to import_pdf_notes (None = its default pool).
+    """
+    fl = path.lower()
+
+    # ---------------------------------
+    # PDF
+    # ---------------------------------
+    if fl.endswith(".pdf"):
+        from importer_pdf import import_pdf_notes
+        return import_pdf_notes([path], workers=ocr_workers)
+
+    # ---------------------------------
+    # DOCX
+    # ---------------------------------
+    if fl.endswith(".docx"):
+        from importer_docx import import_docx_notes
+        return import_docx_notes(path)
+
+    # ---------------------------------
+    # CSV (SystmOne)
+    # ---------------------------------
+    if fl.endswith(".csv"):
+        from importer_systmone import is_systmone_csv, parse_systmone_csv
+        if is_systmone_csv(path):
+            return parse_systmone_csv(path)
+        return []
+
+    # ---------------------------------
+    # RTF (SystmOne)
+    # ---------------------------------
+    if fl.endswith(".rtf"):
+        from importer_systmone import parse_systmone_rtf
+        return parse_systmone_rtf(path)
+
+    # ---------------------------------
+    # EXCEL (AUTO-DETECT ONLY)
+    # ---------------------------------
+    if fl.endswith((".xlsx", ".xls")):
+        from importer_autodetect import import_files_autodetect
+        return import_files_autodetect([path])
+
+    return []
+
+
+def iter_import_batches(path: str) -> Iterator[List[Dict]]:
+    """
+    parse_import_file() in batches, for a single file parsed in-process.
+    Excel exports go through the streaming auto-detect router (RiO
+    notes arrive as they are read); every other format is one batch.
+    """
+    if path.lower().endswith((".xlsx", ".xls")):
+        from importer_autodetect import iter_autodetect_batches
+        yield from iter_autodetect_batches(path)
+        return
+    yield parse_import_file(path)
+
+
+def _worker_count() -> int:
+    if IMPORT_WORKERS > 0:
+        return IMPORT_WORKERS
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+def get_import_pool() -> ProcessPoolExecutor:
+    """
+    Shared, lazily created process pool.
+    Spawned workers are kept alive between imports so the interpreter
+    start-up cost is only paid once per session.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=_worker_count(),
+            mp_context=get_context("spawn"),
+        )
+    return _pool
+
+
+def reset_import_pool():
+    """Drop a broken pool (e.g. a worker crashed) so the next import starts fresh."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def submit_import_file(path: str) -> Future:
+    # The import pool already runs one file per core — OCR serially inside
+    # each worker instead of nesting a second, per-worker process pool
+    return get_import_pool().submit(parse_import_file, path, ocr_workers=1)
@@ -4,11 +4,14 @@
 
 from __future__ import annotations
 
+from collections import deque
 from pathlib import Path
-from typing import List, Dict
+from typing import Iterable, Iterator, List, Dict
 from datetime import datetime
 import pandas as pd
 from utils.resource_path import resource_path
+from importer_workbook import iter_workbook_rows
+from importer_dates import DateNormaliser
 
 
 def _clean_line(value) -> str:
@@ -29,17 +32,7 @@ _DATE_FORMATS = [
 ]
 
 
-def _parse_date(line: str) -> datetime | None:
-    line = _clean_line(line)
-    if not line:
-        return None
-
-    for fmt in _DATE_FORMATS:
-        try:
-            return datetime.strptime(line, fmt)
-        except ValueError:
-            pass
-
+def _parse_date_fallback(line: str) -> datetime | None:
     try:
         dt = pd.to_datetime(line, errors="coerce", dayfirst=True)
         if pd.notna(dt):
@@ -50,6 +43,21 @@ def _parse_date(line: str) -> datetime | None:
     return None
 
 
+def _date_normaliser() -> DateNormaliser:
+    return DateNormaliser(_DATE_FORMATS, fallback=_parse_date_fallback)
+
+
+def _parse_date(line: str, dates: DateNormaliser | None = None) -> datetime | None:
+    line = _clean_line(line)
+    if not line:
+        return None
+
+    # One normaliser per file remembers the export's date format
+    if dates is None:
+        dates = _date_normaliser()
+    return dates.parse(line)
+
+
 def _canonical_type(type_raw: str) -> str:
     s = (type_raw or "").lower()
 
@@ -67,51 +75,122 @@ def _canonical_type(type_raw: str) -> str:
     return type_raw or "Unknown"
 
 
+class _Lookahead:
+    """Lazy line cursor with a few lines of lookahead (for date search)."""
+
+    def __init__(self, lines: Iterable[str]):
+        self._it = iter(lines)
+        self._buf: deque[str] = deque()
+
+    def peek(self, k: int = 0) -> str | None:
+        while len(self._buf) <= k:
+            try:
+                self._buf.append(next(self._it))
+            except StopIteration:
+                return None
+        return self._buf[k]
+
+    def pop(self) -> str | None:
+        if self.peek() is None:
+            return None
+        return self._buf.popleft()
+
+
+def _build_note(originator: str, dt: datetime, body: List[str], path: str) -> Dict | None:
+    note_type_raw = ""
+    type_seen = False
+    content_lines: List[str] = []
+
+    for ln in body:
+        s = ln.strip()
+        if not s:
+            content_lines.append("")
+            continue
+
+        # bracket-type
+        if not type_seen and s.startswith("[") and s.endswith("]"):
+            note_type_raw = s.strip("[] ").strip()
+            type_seen = True
+            continue
+
+        if s.lower() in {"detail", "amend", "lock"}:
+            continue
+
+        content_lines.append(ln)
+
+    content = "\n".join(content_lines).strip()
+    if not content:
+        return None
+
+    note_type = _canonical_type(note_type_raw)
+
+    preview = " ".join(content.split("\n")[:3]).strip()
+    if len(preview) > 200:
+        preview = preview[:197] + "…"
+
+    return {
+        "date": dt,
+        "type": note_type,
+        "originator": originator,
+        "preview": preview,
+        "text": content,       # REQUIRED BY UI
+        "content": content,    # REQUIRED BY HISTORY EXTRACTOR
+        "source_file": path,
+        "source": "rio",
+    }
+
+
 # --------------------------------------------------------------------
-# MAIN PARSER — FIXED TO HANDLE: date on first body line, not second
+# STREAMING PARSER — FIXED TO HANDLE: date on first body line, not second
+# Yields each note as soon as its Originator: block closes, so only
+# one note body is held in memory at a time.
 # --------------------------------------------------------------------
-def parse_rio_file(path: str) -> List[Dict]:
+def iter_rio_notes(path: str, lines: Iterable[str] | None = None) -> Iterator[Dict]:
     path = str(Path(path))
-    print("parse_rio_file →", path)
 
-    df = pd.read_excel(path, header=None, dtype=str)
-    lines = [_clean_line(v) for v in df.iloc[:, 0].tolist()]
+    if lines is None:
+        lines = (
+            _clean_line(row[0] if row else None)
+            for row in iter_workbook_rows(path)
+        )
 
-    notes: List[Dict] = []
-    i = 0
-    n = len(lines)
+    cur = _Lookahead(lines)
+    dates = _date_normaliser()
 
-    while i < n:
-        line = lines[i]
+    while True:
+        line = cur.peek()
+        if line is None:
+            return
         if not line.startswith("Originator:"):
-            i += 1
+            cur.pop()
             continue
 
         originator = line.split(":", 1)[1].strip() or "Unknown"
-        i += 1
+        cur.pop()
 
         # --------------------------------------------------------
         # FIX: find the first *non-empty* body line containing date
         # --------------------------------------------------------
-        while i < n and not lines[i]:
-            i += 1
-        if i >= n:
-            break
-
-        date_line = lines[i]
+        while cur.peek() == "":
+            cur.pop()
+        date_line = cur.peek()
+        if date_line is None:
+            return
 
-        dt = _parse_date(date_line)
+        dt = _parse_date(date_line, dates)
         if not dt:
             # NEW FIX: try next lines until date found
-            j = i + 1
-            while j < n and j < i + 5 and not dt:
-                dt = _parse_date(lines[j])
+            for k in range(1, 5):
+                ahead = cur.peek(k)
+                if ahead is None:
+                    break
+                dt = _parse_date(ahead, dates)
                 if dt:
-                    i = j  # jump to the correct date line
+                    for _ in range(k):  # jump to the correct date line
+                        cur.pop()
                     break
-                j += 1
 
-        i += 1  # move past date
+        cur.pop()  # move past date
 
         if not dt:
             continue
@@ -120,53 +199,31 @@ def parse_rio_file(path: str) -> List[Dict]:
             continue
 
         body: List[str] = []
-        while i < n and not lines[i].startswith("Originator:"):
-            body.append(lines[i])
-            i += 1
+        while True:
+            ln = cur.peek()
+            if ln is None or ln.startswith("Originator:"):
+                break
+            body.append(cur.pop())
 
-        note_type_raw = ""
-        type_seen = False
-        content_lines: List[str] = []
+        note = _build_note(originator, dt, body, path)
+        if note:
+            yield note
 
-        for ln in body:
-            s = ln.strip()
-            if not s:
-                content_lines.append("")
-                continue
 
-            # bracket-type
-            if not type_seen and s.startswith("[") and s.endswith("]"):
-                note_type_raw = s.strip("[] ").strip()
-                type_seen = True
-                continue
-
-            if s.lower() in {"detail", "amend", "lock"}:
-                continue
-
-            content_lines.append(ln)
+# --------------------------------------------------------------------
+# MAIN PARSER — list wrapper around iter_rio_notes()
+# --------------------------------------------------------------------
+def parse_rio_file(path: str, df: pd.DataFrame | None = None) -> List[Dict]:
+    path = str(Path(path))
+    print("parse_rio_file →", path)
 
-        content = "\n".join(content_lines).strip()
-        if not content:
-            continue
+    # Reuse the frame if the router already loaded the workbook,
+    # otherwise stream rows straight from the read-only workbook
+    lines = None
+    if df is not None:
+        lines = (_clean_line(v) for v in df.iloc[:, 0].tolist())
 
-        note_type = _canonical_type(note_type_raw)
-
-        preview = " ".join(content.split("\n")[:3]).strip()
-        if len(preview) > 200:
-            preview = preview[:197] + "…"
-
-        notes.append(
-            {
-                "date": dt,
-                "type": note_type,
-                "originator": originator,
-                "preview": preview,
-                "text": content,       # REQUIRED BY UI
-                "content": content,    # REQUIRED BY HISTORY EXTRACTOR
-                "source_file": path,
-                "source": "rio",
-            }
-        )
+    notes = list(iter_rio_notes(path, lines))
 
     print("FINAL VALID NOTES AFTER CLEANING:", len(notes))
     return notes
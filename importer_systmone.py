@@ -11,6 +11,8 @@ from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime
 
+from importer_dates import parse_dates
+
 
 # ----------------------------------------------------------------
 # Constants
@@ -21,6 +23,9 @@ SYSTMONE_HEADER = ["L", "Date", "Details", "Drawing", "Flags", "R"]
 # Matches dates like "27 Jan 2026", "01 Feb 2026", "8 Jan 2026"
 _DATE_RE = re.compile(r"^\d{1,2}\s+[A-Za-z]{3,9}\s+\d{4}$")
 
+# 'DD Mon YYYY' or 'DD Month YYYY'
+_DATE_FORMATS = ("%d %b %Y", "%d %B %Y")
+
 # Matches clinician initials in the Date column (content rows)
 _INITIALS_RE = re.compile(r"^[A-Z]{2,4}$")
 
@@ -76,7 +81,7 @@ def _parse_date(date_str: str) -> Optional[datetime]:
     if _INITIALS_RE.match(s):
         return None
 
-    for fmt in ("%d %b %Y", "%d %B %Y"):
+    for fmt in _DATE_FORMATS:
         try:
             return datetime.strptime(s, fmt)
         except ValueError:
@@ -84,6 +89,14 @@ def _parse_date(date_str: str) -> Optional[datetime]:
     return None
 
 
+def _parse_date_column(values: List[str]) -> List[Optional[datetime]]:
+    """Batch version of _parse_date for a whole Date column."""
+    cleaned = [_clean(v) for v in values]
+    # Initials rows are never dates — keep them out of the batch
+    cleaned = ["" if _INITIALS_RE.match(s) else s for s in cleaned]
+    return parse_dates(cleaned, _DATE_FORMATS)
+
+
 def _extract_clinician(details: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """Extract (time_str, clinician_name, location) from header row Details.
 
@@ -315,7 +328,10 @@ def _group_entries(rows: List[List[str]]) -> List[Dict]:
     entries: List[Dict] = []
     current: Optional[Dict] = None
 
-    for row in rows:
+    # Parse the whole Date column in one batch
+    row_dates = _parse_date_column([row[1].strip() for row in rows])
+
+    for row, dt in zip(rows, row_dates):
         l_col, date_col, details, drawing, flags, r_col = row
         date_str = date_col.strip()
         details = details.strip()
@@ -329,7 +345,6 @@ def _group_entries(rows: List[List[str]]) -> List[Dict]:
             continue
 
         # --- HEADER ROW: has a parseable date ---
-        dt = _parse_date(date_str)
         if dt is not None:
             # Flush previous entry
             if current and current["text"].strip():
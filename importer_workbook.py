@@ -0,0 +1,119 @@
+# ================================================================
+# importer_workbook.py — SHARED EXCEL LOADING LAYER
+# MyPsychAdmin
+#
+# Every Excel export (RiO / CareNotes / EPJS) is read ONCE here.
+# The auto-detect router sniffs the system markers from a short
+# prefix of the loaded rows and then hands the SAME frame to the
+# chosen parser, so large exports are never read from disk twice.
+#
+# iter_workbook_rows() is the streaming counterpart: it walks an
+# .xlsx in openpyxl read-only mode without building a DataFrame,
+# for parsers that can emit notes as they go (see importer_rio).
+# ================================================================
+
+from __future__ import annotations
+
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+import pandas as pd
+
+
+# Number of non-empty cells inspected by detect_note_system()
+SNIFF_LIMIT = 300
+
+_EMPTY_CELLS = {"nan", "none", "<na>"}
+
+# Strings pd.read_excel turns into NaN by default — the streaming
+# reader blanks the same cells so both paths see identical lines.
+_PANDAS_NA_STRINGS = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+}
+
+_STREAMABLE_EXTS = {".xlsx", ".xlsm"}
+
+
+def read_workbook(path: str) -> pd.DataFrame:
+    """Read the first sheet of an Excel export as an all-string frame."""
+    return pd.read_excel(str(Path(path)), header=None, dtype=str)
+
+
+def iter_cell_lines(df: pd.DataFrame) -> Iterator[str]:
+    """
+    Yield every non-empty cell of the frame, row by row, left to right.
+    Lazy — callers that only need a prefix stop reading early.
+    """
+    for row in df.itertuples(index=False, name=None):
+        for cell in row:
+            s = str(cell).strip()
+            if s and s.lower() not in _EMPTY_CELLS:
+                yield s
+
+
+def sniff_lines(df: pd.DataFrame, limit: int = SNIFF_LIMIT) -> List[str]:
+    """Return the first `limit` non-empty cells for system detection."""
+    return list(islice(iter_cell_lines(df), limit))
+
+
+def sniff_workbook_lines(path: str, limit: int = SNIFF_LIMIT) -> List[str]:
+    """sniff_lines() straight from disk, reading only the rows it needs."""
+    rows = iter_workbook_rows(path)
+    try:
+        cells = (
+            s
+            for row in rows
+            for s in (cell.strip() for cell in row)
+            if s and s.lower() not in _EMPTY_CELLS
+        )
+        return list(islice(cells, limit))
+    finally:
+        rows.close()  # releases the read-only workbook
+
+
+def is_streamable(path: str) -> bool:
+    """True if iter_workbook_rows() can read the file without loading it whole."""
+    return Path(path).suffix.lower() in _STREAMABLE_EXTS
+
+
+def _stream_cell(value) -> str:
+    """Coerce an openpyxl cell value the way pd.read_excel(dtype=str) does."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    s = str(value)
+    return "" if s in _PANDAS_NA_STRINGS else s
+
+
+def iter_workbook_rows(path: str) -> Iterator[Tuple[str, ...]]:
+    """
+    Stream the first sheet row by row as tuples of strings ("" = empty).
+
+    .xlsx files are read in openpyxl read-only mode, so only one row
+    is materialised at a time. Legacy .xls files cannot be streamed
+    and fall back to a one-shot read_workbook().
+    """
+    path = str(Path(path))
+
+    if Path(path).suffix.lower() not in _STREAMABLE_EXTS:
+        df = read_workbook(path)
+        for row in df.itertuples(index=False, name=None):
+            yield tuple(
+                "" if pd.isna(cell) else str(cell)
+                for cell in row
+            )
+        return
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        for row in ws.iter_rows(values_only=True):
+            yield tuple(_stream_cell(v) for v in row)
+    finally:
+        wb.close()
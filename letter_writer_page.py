@@ -1313,7 +1313,8 @@ class LetterWriterPage(QWidget):
                 new_notes = notes or []
 
                 # Skip if these exact notes were already processed
-                notes_sig = (len(new_notes), id(notes))
+                from shared_data_store import notes_signature
+                notes_sig = notes_signature(new_notes)
                 if self._notes_processed_id == notes_sig:
                         print(f"[LETTER] Skipping set_notes - notes already processed")
                         return
@@ -1708,7 +1709,11 @@ class LetterWriterPage(QWidget):
 
                 # Build timeline and extract history
                 try:
-                        episodes = build_timeline(prepared)
+                        # When all_notes is the store's list, its version identifies `prepared`
+                        from shared_data_store import get_shared_store
+                        store = get_shared_store()
+                        notes_key = ("letter_writer", store.notes_version) if self.all_notes is store.notes else None
+                        episodes = build_timeline(prepared, notes_key=notes_key)
                         history = extract_patient_history(prepared, episodes=episodes)
                         panel_data = convert_to_panel_format(history)
                 except Exception as e:
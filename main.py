@@ -1,29 +1,44 @@
 from __future__ import annotations
 
 import os, sys
+import multiprocessing
+import time
 
-# Show splash screen immediately before heavy imports
+_STARTUP_T0 = time.perf_counter()
+
+# six installs its lazy six.moves importer on sys.meta_path. It has to be
+# there before shiboken hooks the import system, or dateutil / pandas /
+# matplotlib imported later trip over it — previously solved by
+# importing pandas and matplotlib.pyplot up front (see charting.py).
+import six  # noqa: F401
+
+# Show splash screen immediately before heavy imports.
+# Import worker processes (importer_pipeline) re-import this module as
+# __mp_main__ under the spawn start method — they must not open a splash.
 from PySide6.QtWidgets import QApplication, QSplashScreen
 from PySide6.QtGui import QPixmap, QPainter, QColor, QFont
 from PySide6.QtCore import Qt
 
-_splash_app = QApplication.instance()
-if _splash_app is None:
-    _splash_app = QApplication(sys.argv)
-_splash_px = QPixmap(420, 200)
-_splash_px.fill(QColor("#1e1e2e"))
-_splash_painter = QPainter(_splash_px)
-_splash_painter.setPen(QColor("#4fc3f7"))
-_splash_painter.setFont(QFont("Segoe UI", 22, QFont.Bold))
-_splash_painter.drawText(_splash_px.rect(), Qt.AlignCenter, "MyPsychAdmin\nLoading...")
-_splash_painter.end()
-_early_splash = QSplashScreen(_splash_px)
-_early_splash.show()
-_splash_app.processEvents()
+_early_splash = None
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # frozen (PyInstaller) worker processes exit here
+
+    _splash_app = QApplication.instance()
+    if _splash_app is None:
+        _splash_app = QApplication(sys.argv)
+    _splash_px = QPixmap(420, 200)
+    _splash_px.fill(QColor("#1e1e2e"))
+    _splash_painter = QPainter(_splash_px)
+    _splash_painter.setPen(QColor("#4fc3f7"))
+    _splash_painter.setFont(QFont("Segoe UI", 22, QFont.Bold))
+    _splash_painter.drawText(_splash_px.rect(), Qt.AlignCenter, "MyPsychAdmin\nLoading...")
+    _splash_painter.end()
+    _early_splash = QSplashScreen(_splash_px)
+    _early_splash.show()
+    _splash_app.processEvents()
 
  #import numpy  # required to force inclusion for PyInstaller
-import pandas             # must import before PySide6 to avoid six/shiboken conflict
-import matplotlib.pyplot  # must import before PySide6 to avoid six/shiboken conflict
+# matplotlib is imported on the first chart request (charting.py)
 
 from license_manager import load_license
 from activation_dialog import ActivationDialog
@@ -80,6 +95,8 @@ from moj_leave_form_page import MOJLeaveFormPage
 from moj_asr_form_page import MOJASRFormPage
 from hcr20_form_page import HCR20FormPage
 
+_STARTUP_IMPORTS_DONE = time.perf_counter()
+
 
 # ============================================================
 # HOME PAGE BANNER
@@ -144,6 +161,10 @@ class MainWindow(QMainWindow):
         self.shared_store.patient_info_changed.connect(self._on_shared_patient_info_changed)
         print("[DEBUG MainWindow] SharedDataStore initialized")
 
+        # Shared analysis cache - risk analysis runs once per import, in the background
+        from analysis_cache import get_analysis_cache
+        get_analysis_cache()
+
         # Central root
         central = QWidget()
         central.setObjectName("CentralRoot")
@@ -1175,6 +1196,10 @@ class MainWindow(QMainWindow):
         Called when notes are updated in the shared store.
         Propagates data to all forms, reports, and letter writer.
         """
+        delta = self.shared_store.last_delta
+        if notes and delta.is_empty:
+            print(f"[SharedData] Notes v{delta.version} identical - not re-propagating")
+            return
         print(f"[SharedData] Notes changed - propagating to {len(notes)} notes to all sections")
 
         # Update letter writer if it exists
@@ -1432,6 +1457,15 @@ def main():
     win.show()
     splash.finish(win)
 
+    import charting
+    shown_after = time.perf_counter() - _STARTUP_T0
+    print(f"[Startup] Modules imported in {_STARTUP_IMPORTS_DONE - _STARTUP_T0:.2f}s, "
+          f"window shown after {shown_after:.2f}s "
+          f"(matplotlib {'already loaded' if charting.is_loaded() else 'deferred'})")
+    if not charting.is_loaded():
+        # The first chart request reports the import time this saved
+        charting.record_window_shown(shown_after)
+
     # Unregister session and close patient DB on shutdown
     def _on_app_quit():
         if win.patient_db is not None:
@@ -1,16 +1,25 @@
 # ===============================================================
 # ULTRA-FAST TOKEN-BASED MEDICATION EXTRACTOR (Hybrid Mode C)
-# ~1–2 seconds for 14,000 notes
+# ~1–2 seconds for 14,000 notes (see bench_extractors.py medications)
 # Fully cross-platform, no dependencies
+#
+# Every "patterns" entry — multi-word and hyphenated names included —
+# is tokenised the same way as the notes and stored in a phrase trie,
+# so each note position takes the LONGEST matching pattern. Doses are
+# found by one precompiled scan per note instead of re.match on the
+# tokens around every candidate.
 # ===============================================================
 
 import re
+from bisect import bisect_left
 from datetime import datetime
 
 BUILT = False
-TOKEN_MAP = {}        # token -> (key, canonical)
+BUILT_FOR = None      # the MEDS dict the index was built from
+TOKEN_MAP = {}        # pattern -> (key, canonical)
 META_MAP = {}         # key -> metadata
-FIRST_CHARS = {}      # first char -> list of tokens
+FIRST_CHARS = {}      # first char -> list of patterns
+PHRASE_TRIE = {}      # token -> {token -> ..., None: (key, canonical)}
 
 
 # ---------------------------------------------------------------
@@ -18,10 +27,15 @@ FIRST_CHARS = {}      # first char -> list of tokens
 # ---------------------------------------------------------------
 
 def build_token_index(MEDS):
-    global BUILT, TOKEN_MAP, META_MAP, FIRST_CHARS
-    if BUILT:
+    global BUILT, BUILT_FOR
+    if BUILT and BUILT_FOR is MEDS:
         return
 
+    TOKEN_MAP.clear()
+    META_MAP.clear()
+    FIRST_CHARS.clear()
+    PHRASE_TRIE.clear()
+
     for key, meta in MEDS.items():
         META_MAP[key] = meta
         canonical = meta["canonical"]
@@ -35,24 +49,49 @@ def build_token_index(MEDS):
             first = s[0]
             FIRST_CHARS.setdefault(first, []).append(s)
 
+            # "co-trimoxazole" → ("co", "trimoxazole"), as the notes tokenise
+            words = fast_tokenise(s)
+            if not words:
+                continue
+            node = PHRASE_TRIE
+            for w in words:
+                node = node.setdefault(w, {})
+            node[None] = (key, canonical)
+            if words[0][0] != first:
+                FIRST_CHARS.setdefault(words[0][0], []).append(s)
+
     BUILT = True
+    BUILT_FOR = MEDS
+
+
+def match_phrase(tokens, i):
+    """Longest pattern starting at tokens[i] → (end index, key, canonical) or None."""
+    node = PHRASE_TRIE.get(tokens[i])
+    best = None
+    j = i
+    while node is not None:
+        if None in node:
+            best = (j + 1, *node[None])
+        j += 1
+        if j >= len(tokens):
+            break
+        node = node.get(tokens[j])
+    return best
 
 
 # ---------------------------------------------------------------
 # TOKENISER (extremely fast)
 # ---------------------------------------------------------------
 
+# Runs of a-z / 0-9, keeping decimal points between digits
+TOKEN_REGEX = re.compile(r'[a-z0-9]+(?:(?<=[0-9])\.(?=[0-9])[a-z0-9]+)*')
+
+
 def fast_tokenise(text):
     """
-    Converts "clozapine 25 mg OD" → ["clozapine", "25mg", "od"]
+    Converts "clozapine 25 mg OD" → ["clozapine", "25", "mg", "od"]
     """
-    text = text.lower()
-    # protect decimals
-    text = re.sub(r'(?<=\d)\.(?=\d)', 'DOT', text)
-    text = re.sub(r'[^a-z0-9DOT]+', ' ', text)
-    text = text.replace("DOT", ".")
-    tokens = text.split()
-    return tokens
+    return TOKEN_REGEX.findall(text.lower())
 
 
 # ---------------------------------------------------------------
@@ -68,27 +107,73 @@ _DRUG_SUFFIXES = (
     "ril", "oxin", "afil", "etine", "xaban", "vaptan", "semide",
 )
 
+COMBINED_DOSE_REGEX = re.compile(r'(\d+(?:\.\d+)?)(mg|mcg|µg|g|units|iu)$')
+DECIMAL_REGEX = re.compile(r'\d+\.\d+')
+
+
 def parse_dose(tokens, idx):
     """
     Look at token idx-3 → idx+3 for dose tokens.
     """
-    start = max(idx - 3, 0)
-    end = min(idx + 3, len(tokens))
+    return scan_doses(tokens).near(idx)
 
-    for i in range(start, end):
-        tok = tokens[i]
+
+class DoseScan:
+    """
+    Dose candidates of one tokenised note, found in a single pass:
+    combined tokens ("10mg") and numbers followed by a unit ("10", "mg").
+    """
+
+    __slots__ = ("positions", "doses", "needs_unit", "covered")
+
+    def __init__(self, positions, doses, needs_unit):
+        self.positions = positions    # token indices, ascending
+        self.doses = doses            # (strength, unit) per position
+        self.needs_unit = needs_unit  # True if the unit is the next token
+
+        # Token indices whose parse_dose window contains a dose
+        self.covered = set()
+        for p, sep in zip(positions, needs_unit):
+            self.covered.update(range(max(p - 1 if sep else p - 2, 0), p + 4))
+
+    def near(self, idx, last=None):
+        """First dose in tokens idx-3 → (last or idx)+3, as parse_dose looked."""
+        start = max(idx - 3, 0)
+        end = (idx if last is None else last) + 3
+        k = bisect_left(self.positions, start)
+        while k < len(self.positions) and self.positions[k] < end:
+            # A separate unit token must fall inside the window too
+            if not self.needs_unit[k] or self.positions[k] + 1 < end:
+                return self.doses[k]
+            k += 1
+        return None, None
+
+
+def scan_doses(tokens):
+    positions, doses, needs_unit = [], [], []
+    n = len(tokens)
+    for i, tok in enumerate(tokens):
+        if not tok[0].isdigit():
+            continue
 
         # 1) Combined token e.g. 10mg
-        m = re.match(r'(\d+(?:\.\d+)?)(mg|mcg|µg|g|units|iu)$', tok)
+        m = COMBINED_DOSE_REGEX.match(tok)
         if m:
-            return float(m.group(1)), m.group(2)
+            positions.append(i)
+            doses.append((float(m.group(1)), m.group(2)))
+            needs_unit.append(False)
 
         # 2) Separate tokens e.g. "10" + "mg"
-        if tok.isdigit() or re.match(r'\d+\.\d+', tok):
-            if i+1 < end and tokens[i+1] in UNIT_SET:
-                return float(tok), tokens[i+1]
+        elif (tok.isdigit() or DECIMAL_REGEX.match(tok)) and i + 1 < n and tokens[i + 1] in UNIT_SET:
+            try:
+                strength = float(tok)
+            except ValueError:   # e.g. "1.5x"
+                continue
+            positions.append(i)
+            doses.append((strength, tokens[i + 1]))
+            needs_unit.append(True)
 
-    return None, None
+    return DoseScan(positions, doses, needs_unit)
 
 
 # ---------------------------------------------------------------
@@ -146,44 +231,58 @@ def extract_medications_from_notes(notes, MEDS):
     for n in notes:
         raw = n.get("content", "") or ""
         tokens = fast_tokenise(raw)
+        doses = None    # scanned on first use
 
-        for i, tok in enumerate(tokens):
+        i = 0
+        while i < len(tokens):
+            tok = tokens[i]
             first = tok[0]
             # quick reject: if no synonym starts with this letter
             if first not in FIRST_CHARS:
+                i += 1
                 continue
 
-            # fast exact match
-            if tok in TOKEN_MAP:
-                key, canonical = TOKEN_MAP[tok]
+            # longest pattern match, multi-word included
+            hit = match_phrase(tokens, i)
+            if hit:
+                end, key, canonical = hit
                 meta = META_MAP[key]
+                last = end - 1
 
-                strength, unit = parse_dose(tokens, i)
+                if doses is None:
+                    doses = scan_doses(tokens)
+                strength, unit = doses.near(i, last)
                 if strength is None or not plausible(strength, meta):
+                    i = end
                     continue
 
-                route, freq = parse_route_freq(tokens, i)
+                route, freq = parse_route_freq(tokens, last)
 
                 date = n.get("date") or n.get("datetime")
 
                 results.append({
                     "med_key": key,
                     "canonical": canonical,
-                    "raw": tok,
+                    "raw": " ".join(tokens[i:end]),
                     "strength": strength,
                     "unit": unit,
                     "route": route,
                     "frequency": freq,
                     "date": date,
                 })
+                i = end
             else:
                 # Check for unrecognised medication-like tokens:
                 # token has a dose nearby OR ends with a drug suffix
+                i += 1
                 if len(tok) < 3 or tok in FREQ_SET or tok in ROUTE_SET or tok in UNIT_SET:
                     continue
-                dose_nearby, _ = parse_dose(tokens, i)
-                has_suffix = any(tok.endswith(s) for s in _DRUG_SUFFIXES)
-                if dose_nearby is not None or has_suffix:
+                if tok.endswith(_DRUG_SUFFIXES):
+                    unrecognised.add(tok)
+                    continue
+                if doses is None:
+                    doses = scan_doses(tokens)
+                if i - 1 in doses.covered:
                     unrecognised.add(tok)
 
     print(f"[ULTRA-FAST-MEDS] extracted {len(results)} items, {len(unrecognised)} unrecognised")
@@ -537,7 +537,8 @@ class MOJASRFormPage(QWidget):
             return
 
         # Skip if these exact notes were already processed
-        notes_sig = (len(notes), id(notes))
+        from shared_data_store import notes_signature
+        notes_sig = notes_signature(notes)
         if self._notes_processed_id == notes_sig:
             print(f"[MOJ-ASR] Skipping set_notes - notes already processed ({len(notes)} notes)")
             return
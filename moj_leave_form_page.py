@@ -7,6 +7,7 @@
 
 from __future__ import annotations
 import re
+from collections.abc import Mapping
 from datetime import datetime
 from PySide6.QtCore import Qt, Signal, QDate, QEvent
 from PySide6.QtWidgets import (
@@ -461,7 +462,8 @@ class MOJLeaveFormPage(QWidget):
             return
 
         # Skip if these exact notes were already processed
-        notes_sig = (len(notes), id(notes))
+        from shared_data_store import notes_signature
+        notes_sig = notes_signature(notes)
         if self._notes_processed_id == notes_sig:
             print(f"[MOJ-LEAVE] Skipping set_notes - notes already processed ({len(notes)} notes)")
             return
@@ -3400,7 +3402,7 @@ class MOJLeaveFormPage(QWidget):
         if hasattr(self, '_leave_data_extractor') and self._leave_data_extractor:
             raw_notes = getattr(self._leave_data_extractor, 'notes', [])
             if raw_notes:
-                notes_text = "\n".join([str(n.get('body', '')) for n in raw_notes if isinstance(n, dict)])
+                notes_text = "\n".join([str(n.get('body', '')) for n in raw_notes if isinstance(n, Mapping)])
                 self._search_leave_in_text(notes_text, leave_text_parts, suspension_text_parts)
 
         # Also check LEAVE category from extracted data
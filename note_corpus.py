@@ -0,0 +1,451 @@
+# ================================================================
+# note_corpus.py — COMPACT COLUMNAR NOTE STORAGE
+# MyPsychAdmin
+#
+# SharedDataStore used to keep every note as its own dict, with the
+# same body often held twice (RiO: "text" and "content") and the
+# same handful of type / originator / source strings repeated on
+# every row. NoteCorpus stores the notes column-wise instead:
+#
+#   • date        → one int64 array (µs since epoch, NaT = missing)
+#   • type / originator / source / raw_type / source_file
+#                 → int32 codes into an append-only string pool
+#   • body        → ONE utf-8 buffer + offsets; "content", "text"
+#                   and "body" all read from it when they are equal
+#   • preview     → recomputed from the body when it is the standard
+#                   importer preview, stored only when it differs
+#   • anything else (status, edit_deadline, dict sources, …)
+#                 → a sparse per-row "extras" dict
+#
+# Rows are exposed as read-only, dict-like NoteRow views so existing
+# code that calls note.get("date") keeps working. between() returns
+# date-range slices that share the corpus columns (no row copies).
+#
+# Every row also has a stable, content-derived note_id(), the same ID
+# the import manifest records, so stores and pages can tell which
+# notes were added or removed between two corpora. note_state() covers
+# the remaining fields (status, type, …) for notes kept under one ID.
+# ================================================================
+
+from __future__ import annotations
+
+import hashlib
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+CATEGORICAL_KEYS = ("type", "originator", "source", "raw_type", "source_file")
+BODY_KEYS = ("content", "text", "body")
+
+_NAT = np.iinfo(np.int64).min
+_EPOCH = datetime(1970, 1, 1)
+_MISSING = object()
+
+
+def note_id(note: Mapping) -> str:
+    """Stable, content-derived ID for a note (date + source + body)."""
+    content = str(
+        note.get("content")
+        or note.get("text")
+        or note.get("body")
+        or note.get("note")
+        or ""
+    ).strip()
+    key = f"{note.get('date')}|{str(note.get('source', '')).lower()}|{content}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+# Keys note_id() already covers (or, for "preview", derives from the body)
+_ID_KEYS = ("date", "source", "note", "preview") + BODY_KEYS
+
+
+def note_state(note: Mapping) -> Tuple:
+    """
+    Everything about a note that note_id() does not cover: its key order
+    and every other field (type, originator, status, edit_deadline, …).
+    Two notes are the same iff their IDs and states are equal.
+    """
+    return tuple(note.keys()), tuple((k, note[k]) for k in note if k not in _ID_KEYS)
+
+
+def changed_ids(old: "NoteCorpus", new: "NoteCorpus") -> frozenset:
+    """IDs in both corpora whose note_state() differs between them."""
+    if old.ids == new.ids:
+        pairs = zip(old.ids, old.rows(), new.rows())
+        return frozenset(nid for nid, a, b in pairs if note_state(a) != note_state(b))
+    changed = set()
+    for nid in set(old.ids) & set(new.ids):
+        if note_state(old[old.index_of(nid)]) != note_state(new[new.index_of(nid)]):
+            changed.add(nid)
+    return frozenset(changed)
+
+
+def content_key(notes: Sequence[Mapping]) -> Tuple[int, int]:
+    """Order-sensitive key for a list of notes, derived from their IDs."""
+    return (len(notes), hash(tuple(
+        n.note_id if isinstance(n, NoteRow) else note_id(n) for n in notes
+    )))
+
+
+def make_preview(body: str) -> str:
+    """The preview every importer builds: first three lines, max 200 chars."""
+    preview = " ".join(body.split("\n", 3)[:3]).strip()
+    if len(preview) > 200:
+        preview = preview[:197] + "…"
+    return preview
+
+
+def _to_micros(dt: datetime) -> int:
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=us)
+
+
+class _Pool:
+    """Append-only intern table shared by a corpus and the corpora extended from it."""
+
+    __slots__ = ("values", "index")
+
+    def __init__(self):
+        self.values: List = []
+        self.index: Dict = {}
+
+    def code(self, value) -> int:
+        c = self.index.get(value)
+        if c is None:
+            c = len(self.values)
+            self.values.append(value)
+            self.index[value] = c
+        return c
+
+
+def _frozen(arr: np.ndarray) -> np.ndarray:
+    arr.flags.writeable = False
+    return arr
+
+
+# ================================================================
+# ROW VIEW
+# ================================================================
+class NoteRow(Mapping):
+    """Read-only dict-like view of one note in a NoteCorpus."""
+
+    __slots__ = ("_corpus", "_i")
+
+    def __init__(self, corpus: "NoteCorpus", i: int):
+        self._corpus = corpus
+        self._i = i
+
+    def __getitem__(self, key):
+        value = self._corpus._value(self._i, key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._corpus._keys(self._i))
+
+    def __len__(self) -> int:
+        return len(self._corpus._keys(self._i))
+
+    def __contains__(self, key) -> bool:
+        return key in self._corpus._keys(self._i)
+
+    @property
+    def note_id(self) -> str:
+        return self._corpus.ids[self._i]
+
+    def stored(self, key, default=None):
+        """
+        The value kept for `key` if it is stored apart from the body
+        (e.g. a custom preview, or a "text" that differs from "content"),
+        else default. Never decodes the body.
+        """
+        extra = self._corpus._extras.get(self._i)
+        return extra.get(key, default) if extra else default
+
+    def copy(self) -> Dict:
+        """A plain, mutable dict with the same contents."""
+        return {k: self[k] for k in self._corpus._keys(self._i)}
+
+    def __reduce__(self):
+        # Pickle / deepcopy as a plain dict, never the whole corpus
+        return (dict, (self.copy(),))
+
+    def __repr__(self) -> str:
+        return f"NoteRow({self.copy()!r})"
+
+
+# ================================================================
+# DATE-RANGE SLICE
+# ================================================================
+class NoteSlice(Sequence):
+    """Rows of a corpus selected by an index array (a view, not a copy)."""
+
+    __slots__ = ("corpus", "indices")
+
+    def __init__(self, corpus: "NoteCorpus", indices: np.ndarray):
+        self.corpus = corpus
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return NoteSlice(self.corpus, self.indices[i])
+        return self.corpus.rows()[int(self.indices[i])]
+
+    def __iter__(self) -> Iterator[NoteRow]:
+        rows = self.corpus.rows()
+        for i in self.indices.tolist():
+            yield rows[i]
+
+
+# ================================================================
+# CORPUS
+# ================================================================
+class NoteCorpus(Sequence):
+    """Immutable, column-oriented collection of notes."""
+
+    def __init__(self):
+        self._strings = _Pool()   # categorical values
+        self._keysets = _Pool()   # per-row key tuples (keeps key order)
+
+        self._ts = _frozen(np.empty(0, dtype=np.int64))
+        self._codes = {k: _frozen(np.empty(0, dtype=np.int32)) for k in CATEGORICAL_KEYS}
+        self._keyset_codes = _frozen(np.empty(0, dtype=np.int32))
+        self._offsets = _frozen(np.zeros(1, dtype=np.int64))
+        self._buffer = b""
+        self._extras: Dict[int, Dict] = {}
+        self._ids: List[str] = []
+
+        self._rows: Optional[List[NoteRow]] = None
+        self._id_index: Optional[Dict[str, int]] = None
+        self._content_key: Optional[Tuple[int, int]] = None
+        self._order: Optional[np.ndarray] = None
+        self._sorted_ts: Optional[List[int]] = None
+
+    # --------------------------------------------------------
+    # Construction
+    # --------------------------------------------------------
+    @classmethod
+    def from_notes(cls, notes: Iterable[Mapping], base: Optional["NoteCorpus"] = None) -> "NoteCorpus":
+        """Compact `notes` into a new corpus, appended after `base` if given."""
+        corpus = cls()
+        if base is not None:
+            corpus._strings = base._strings
+            corpus._keysets = base._keysets
+
+        strings, keysets = corpus._strings, corpus._keysets
+        start = len(base) if base is not None else 0
+
+        ts: List[int] = []
+        codes: Dict[str, List[int]] = {k: [] for k in CATEGORICAL_KEYS}
+        keyset_codes: List[int] = []
+        bodies: List[bytes] = []
+        extras: Dict[int, Dict] = {}
+        ids: List[str] = []
+
+        for i, note in enumerate(notes, start):
+            extra = {}
+            ids.append(note.note_id if isinstance(note, NoteRow) else note_id(note))
+            keyset_codes.append(keysets.code(tuple(note.keys())))
+
+            # Date
+            dt = note.get("date")
+            if type(dt) is datetime and dt.tzinfo is None:
+                ts.append(_to_micros(dt))
+            else:
+                ts.append(_NAT)
+                if dt is not None:
+                    extra["date"] = dt
+
+            # Interned strings
+            for key in CATEGORICAL_KEYS:
+                value = note.get(key, _MISSING)
+                if isinstance(value, str):
+                    codes[key].append(strings.code(value))
+                else:
+                    codes[key].append(-1)
+                    if value is not _MISSING:
+                        extra[key] = value
+
+            # Body — stored once, other body keys only kept if they differ
+            body = None
+            for key in BODY_KEYS:
+                value = note.get(key, _MISSING)
+                if value is _MISSING:
+                    continue
+                if isinstance(value, str) and body is None:
+                    body = value
+                elif value != body or not isinstance(value, str):
+                    extra[key] = value
+            body = body or ""
+            bodies.append(body.encode("utf-8"))
+
+            # Preview — only stored when it isn't the standard one
+            if "preview" in note:
+                preview = note["preview"]
+                if not isinstance(preview, str) or preview != make_preview(body):
+                    extra["preview"] = preview
+
+            for key, value in note.items():
+                if key != "date" and key != "preview" and key not in CATEGORICAL_KEYS and key not in BODY_KEYS:
+                    extra[key] = value
+
+            if extra:
+                extras[i] = extra
+
+        lengths = np.fromiter((len(b) for b in bodies), dtype=np.int64, count=len(bodies))
+        if base is not None:
+            corpus._ts = _frozen(np.concatenate([base._ts, np.asarray(ts, dtype=np.int64)]))
+            corpus._codes = {
+                k: _frozen(np.concatenate([base._codes[k], np.asarray(codes[k], dtype=np.int32)]))
+                for k in CATEGORICAL_KEYS
+            }
+            corpus._keyset_codes = _frozen(np.concatenate(
+                [base._keyset_codes, np.asarray(keyset_codes, dtype=np.int32)]
+            ))
+            corpus._offsets = _frozen(np.concatenate(
+                [base._offsets, base._offsets[-1] + np.cumsum(lengths)]
+            ))
+            corpus._buffer = base._buffer + b"".join(bodies)
+            corpus._extras = {**base._extras, **extras}
+            corpus._ids = base._ids + ids
+        else:
+            corpus._ts = _frozen(np.asarray(ts, dtype=np.int64))
+            corpus._codes = {k: _frozen(np.asarray(codes[k], dtype=np.int32)) for k in CATEGORICAL_KEYS}
+            corpus._keyset_codes = _frozen(np.asarray(keyset_codes, dtype=np.int32))
+            corpus._offsets = _frozen(np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64))
+            corpus._buffer = b"".join(bodies)
+            corpus._extras = extras
+            corpus._ids = ids
+        return corpus
+
+    def extended(self, notes: Iterable[Mapping]) -> "NoteCorpus":
+        """A new corpus with `notes` appended (this one is left untouched)."""
+        return NoteCorpus.from_notes(notes, base=self)
+
+    # --------------------------------------------------------
+    # Column access
+    # --------------------------------------------------------
+    def _keys(self, i: int) -> Tuple[str, ...]:
+        return self._keysets.values[self._keyset_codes[i]]
+
+    def body(self, i: int) -> str:
+        return self._buffer[self._offsets[i]:self._offsets[i + 1]].decode("utf-8")
+
+    def date(self, i: int) -> Optional[datetime]:
+        us = self._ts[i]
+        if us == _NAT:
+            extra = self._extras.get(i)
+            return extra.get("date") if extra else None
+        return _from_micros(int(us))
+
+    def _value(self, i: int, key: str):
+        if key not in self._keys(i):
+            return _MISSING
+        extra = self._extras.get(i)
+        if extra and key in extra:
+            return extra[key]
+        if key == "date":
+            return self.date(i)
+        if key in BODY_KEYS:
+            return self.body(i)
+        if key == "preview":
+            return make_preview(self.body(i))
+        code = self._codes[key][i]
+        return self._strings.values[code]
+
+    @property
+    def ids(self) -> List[str]:
+        """note_id() of every row, in row order."""
+        return self._ids
+
+    def index_of(self, nid: str) -> Optional[int]:
+        """Row index of the first note with this ID, or None."""
+        if self._id_index is None:
+            index: Dict[str, int] = {}
+            for i, x in enumerate(self._ids):
+                index.setdefault(x, i)
+            self._id_index = index
+        return self._id_index.get(nid)
+
+    @property
+    def content_key(self) -> Tuple[int, int]:
+        """content_key() of rows(), computed once."""
+        if self._content_key is None:
+            self._content_key = (len(self._ids), hash(tuple(self._ids)))
+        return self._content_key
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Read-only int64 µs-since-epoch per row (NaT sentinel = no date)."""
+        return self._ts
+
+    # --------------------------------------------------------
+    # Rows
+    # --------------------------------------------------------
+    def rows(self) -> List[NoteRow]:
+        """All rows as NoteRow views (built once, so identities are stable)."""
+        if self._rows is None:
+            self._rows = [NoteRow(self, i) for i in range(len(self))]
+        return self._rows
+
+    def to_dicts(self) -> List[Dict]:
+        return [row.copy() for row in self.rows()]
+
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return NoteSlice(self, np.arange(len(self))[i])
+        return self.rows()[i]
+
+    def __iter__(self) -> Iterator[NoteRow]:
+        return iter(self.rows())
+
+    # --------------------------------------------------------
+    # Date ranges
+    # --------------------------------------------------------
+    def _date_index(self):
+        if self._order is None:
+            order = np.argsort(self._ts, kind="stable")
+            dated = int(np.count_nonzero(self._ts == _NAT))  # NaT sorts first
+            self._order = _frozen(order[dated:])
+            self._sorted_ts = self._ts[self._order].tolist()
+        return self._order, self._sorted_ts
+
+    def between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> NoteSlice:
+        """
+        Dated rows with start <= date <= end, oldest first.
+        Either bound may be None. The result indexes into this corpus.
+        """
+        order, sorted_ts = self._date_index()
+        lo = bisect_left(sorted_ts, _to_micros(start)) if start is not None else 0
+        hi = bisect_right(sorted_ts, _to_micros(end)) if end is not None else len(sorted_ts)
+        return NoteSlice(self, order[lo:hi])
+
+    # --------------------------------------------------------
+    # Diagnostics
+    # --------------------------------------------------------
+    @property
+    def nbytes(self) -> int:
+        """Approximate size of the column data (excludes the extras dicts)."""
+        return (
+            self._ts.nbytes
+            + sum(c.nbytes for c in self._codes.values())
+            + self._keyset_codes.nbytes
+            + self._offsets.nbytes
+            + len(self._buffer)
+        )
+
+    def __repr__(self) -> str:
+        return f"NoteCorpus(notes={len(self)}, strings={len(self._strings.values)}, bytes={self.nbytes})"
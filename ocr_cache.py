@@ -0,0 +1,180 @@
+# ocr_cache.py
+# Persistent, content-addressed cache of Tesseract output for PDF pages.
+#
+# Key   = sha256(page content stream + embedded image streams + geometry)
+#         + render DPI + Tesseract version
+# Value = OCR text, Fernet-encrypted (it is patient text)
+#
+# Stored in a small SQLite file under user_data_path(). Entries are
+# evicted least-recently-used once the cache exceeds OCR_CACHE_MAX_BYTES.
+# purge_ocr_cache() deletes the whole cache (file + key); users reach
+# it from the notes panel's Upload menu ("Clear Cached OCR Text…").
+import base64
+import hashlib
+import os
+import sqlite3
+import time
+
+from utils.resource_path import user_data_path
+
+OCR_CACHE_FILE = user_data_path("ocr_cache.db")
+OCR_CACHE_KEY_FILE = user_data_path("ocr_cache.key")
+OCR_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Set MYPSY_OCR_CACHE=0 to disable the cache entirely
+OCR_CACHE_ENABLED = os.environ.get("MYPSY_OCR_CACHE", "1") != "0"
+
+_conn: sqlite3.Connection | None = None
+_fernet = None
+_tesseract_version: str | None = None
+
+
+# ---------------------------------------------------------
+# ENCRYPTION
+# ---------------------------------------------------------
+def _get_fernet():
+    """Fernet bound to this install AND this machine, or None if unavailable.
+
+    The random secret lives next to the cache, but the key also mixes in
+    the machine id, so a copied cache directory cannot be read elsewhere.
+    """
+    global _fernet
+    if _fernet is not None:
+        return _fernet
+    try:
+        from cryptography.fernet import Fernet
+    except ImportError:
+        return None  # never store patient text unencrypted
+
+    from machine_id import get_machine_id
+
+    try:
+        fd = os.open(OCR_CACHE_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass  # created earlier (or by another import worker)
+    else:
+        with os.fdopen(fd, "wb") as f:
+            f.write(os.urandom(32))
+    with open(OCR_CACHE_KEY_FILE, "rb") as f:
+        secret = f.read()
+
+    raw = hashlib.sha256(secret + get_machine_id().encode()).digest()
+    _fernet = Fernet(base64.urlsafe_b64encode(raw))
+    return _fernet
+
+
+# ---------------------------------------------------------
+# STORAGE
+# ---------------------------------------------------------
+def _get_conn() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        # Import worker processes each open their own connection
+        _conn = sqlite3.connect(OCR_CACHE_FILE, timeout=30)
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_last_used ON ocr_cache(last_used)")
+        _conn.commit()
+    return _conn
+
+
+def _get_tesseract_version() -> str:
+    global _tesseract_version
+    if _tesseract_version is None:
+        try:
+            import pytesseract
+            _tesseract_version = str(pytesseract.get_tesseract_version())
+        except Exception:
+            _tesseract_version = "unknown"
+    return _tesseract_version
+
+
+def page_cache_key(page, dpi: int) -> str:
+    """Content address of a PDF page as it would be rendered for OCR."""
+    h = hashlib.sha256()
+    doc = page.parent
+    h.update(f"{page.rotation}|{tuple(page.mediabox)}|{dpi}|{_get_tesseract_version()}".encode())
+    h.update(page.read_contents())
+    for img in page.get_images(full=True):
+        h.update(doc.xref_stream_raw(img[0]) or b"")
+    return h.hexdigest()
+
+
+def get_cached_ocr(key: str) -> str | None:
+    if not OCR_CACHE_ENABLED:
+        return None
+    fernet = _get_fernet()
+    if fernet is None:
+        return None
+    try:
+        conn = _get_conn()
+        row = conn.execute("SELECT value FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE ocr_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        conn.commit()
+        return fernet.decrypt(row[0]).decode("utf-8")
+    except Exception as e:
+        print(f"[OCR CACHE] read failed: {e}")
+        return None
+
+
+def put_cached_ocr(key: str, text: str):
+    if not OCR_CACHE_ENABLED:
+        return
+    fernet = _get_fernet()
+    if fernet is None:
+        return
+    try:
+        token = fernet.encrypt(text.encode("utf-8"))
+        conn = _get_conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO ocr_cache (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+            (key, token, len(token), time.time()),
+        )
+        _evict(conn)
+        conn.commit()
+    except Exception as e:
+        print(f"[OCR CACHE] write failed: {e}")
+
+
+def _evict(conn: sqlite3.Connection):
+    """Drop least-recently-used entries until the cache fits the size cap."""
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+    if total <= OCR_CACHE_MAX_BYTES:
+        return
+    excess = total - OCR_CACHE_MAX_BYTES
+    freed = 0
+    stale = []
+    for key, size in conn.execute("SELECT key, size FROM ocr_cache ORDER BY last_used ASC"):
+        stale.append((key,))
+        freed += size
+        if freed >= excess:
+            break
+    conn.executemany("DELETE FROM ocr_cache WHERE key = ?", stale)
+
+
+def purge_ocr_cache() -> bool:
+    """Delete every cached page and the cache key. False if a file is still in use."""
+    global _conn, _fernet
+    if _conn is not None:
+        _conn.close()
+        _conn = None
+    _fernet = None
+    ok = True
+    for path in (OCR_CACHE_FILE, OCR_CACHE_KEY_FILE):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[OCR CACHE] Could not delete {path}: {e}")
+            ok = False
+    print("[OCR CACHE] Purged" if ok else "[OCR CACHE] Purge incomplete")
+    return ok
@@ -30,7 +30,7 @@ from patient_history_panel import PatientHistoryPanel
 from history_extractor_sections import extract_patient_history, convert_to_panel_format
 
 # Physical Health
-from physical_health_extractor import extract_physical_health_from_notes
+from physical_health_extractor import extract_physical_health_batched
 from physical_health_panel import PhysicalHealthPanel
 from utils.resource_path import resource_path
 
@@ -380,9 +380,7 @@ class WorkspaceArea(QWidget):
             return self._wrap_panel(panel)
 
         elif key == "physical":
-            phys = extract_physical_health_from_notes(notes)
-            panel = PhysicalHealthPanel(phys, parent=None, embedded=True)
-            return self._wrap_panel(panel)
+            return self._wrap_panel(self._create_physical_panel(notes))
 
         elif key == "meds":
             from CANONICAL_MEDS import MEDICATIONS
@@ -402,6 +400,34 @@ class WorkspaceArea(QWidget):
 
         return None
 
+    def _create_physical_panel(self, notes) -> QWidget:
+        """
+        Holder that shows a message while physical health data is extracted
+        in the background (new notes go to worker processes), then the panel.
+        """
+        from analysis_runner import AnalysisRunner
+
+        holder = QWidget()
+        layout = QVBoxLayout(holder)
+        layout.setContentsMargins(0, 0, 0, 0)
+        msg = QLabel("Extracting physical health data...")
+        msg.setAlignment(Qt.AlignCenter)
+        msg.setStyleSheet("font-size: 14px; color: #666; padding: 16px; background: transparent;")
+        layout.addWidget(msg)
+
+        def show(_stage, phys):
+            msg.deleteLater()
+            layout.addWidget(PhysicalHealthPanel(phys, parent=None, embedded=True))
+
+        def failed(_stage, error):
+            msg.setText(f"Physical health extraction failed: {error}")
+
+        runner = AnalysisRunner(holder)  # deleted (and cancelled) with the holder
+        runner.stage_ready.connect(show)
+        runner.stage_failed.connect(failed)
+        runner.start([("physical", lambda done: extract_physical_health_batched(notes))])
+        return holder
+
     def _wrap_panel(self, panel: QWidget) -> QWidget:
         """Wrap panel in a scroll area for consistent display."""
         # Make panel expand to fill available space
@@ -546,17 +572,29 @@ class PatientNotesPage(QWidget):
             return
 
         # Skip if these exact notes were already processed
-        notes_sig = (len(notes), id(notes))
+        from shared_data_store import notes_signature
+        notes_sig = notes_signature(notes)
         if self._notes_processed_id == notes_sig:
             print(f"[NotesPage] Skipping set_notes - notes already processed")
             return
         self._notes_processed_id = notes_sig
 
+        # Incremental path: the panel already shows these notes (its own
+        # import or edit coming back) — swap in the shared rows, keep the table
+        if self.notes_panel.adopt_shared_rows(notes):
+            print(f"[NotesPage] Notes unchanged for the panel - re-pointed {len(notes)} rows, table kept")
+            return
+
         print(f"[NotesPage] set_notes called with {len(notes)} notes")
         print(f"[NotesPage] First note keys: {list(notes[0].keys()) if notes else 'N/A'}")
 
-        # Update the notes panel with the new notes
-        self.notes_panel.all_notes = notes
+        # Update the notes panel with the new notes. The panel only edits
+        # notes_entry notes in place (confirm / edit / error): those get
+        # their own mutable copies, every other note stays a shared view
+        self.notes_panel.all_notes = [
+            dict(n) if n.get("source") == "notes_entry" else n
+            for n in notes
+        ]
         self.notes_panel._rebuild_type_filter()
         self.notes_panel.filter_types()
 
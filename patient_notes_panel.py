@@ -9,11 +9,15 @@ from PySide6.QtWidgets import (
     QTableWidget, QTableWidgetItem, QHeaderView, QComboBox,
     QTextEdit, QLineEdit, QFileDialog, QSplitter, QAbstractItemView, QSizePolicy,
     QGraphicsOpacityEffect, QCalendarWidget, QDialog, QDialogButtonBox, QMessageBox,
-    QToolButton, QMenu
+    QToolButton, QMenu, QProgressDialog
 )
 from PySide6.QtCore import QPropertyAnimation, QEasingCurve
-from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtCore import Qt, Signal, QTimer, QThread
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, date, time
+from threading import Event
+import os
 
 # IMPORT OPTIONS
 from importer_autodetect import (
@@ -21,6 +25,11 @@ from importer_autodetect import (
     import_files_carenotes,
     import_files_epjs,
 )
+from importer_pipeline import (
+    parse_import_file, iter_import_batches, submit_import_file, reset_import_pool,
+)
+from import_manifest import ImportManifest, UNCHANGED, note_id
+from note_corpus import NoteRow, note_state
 from utils.resource_path import resource_path
 
 # SHARED DATA STORE - centralized data sharing
@@ -69,6 +78,69 @@ SOURCE_COLOURS = {
     "notes_entry": "#d97706",
     "systmone": "#e74c3c",
 }
+# ======================================================================
+# BACKGROUND IMPORT WORKER
+# ======================================================================
+class ImportWorker(QThread):
+    """Parse a batch of files off the GUI thread (process pool for >1 file)."""
+
+    file_done = Signal(int, str, int, str)   # index, path, note count, error
+    notes_batch = Signal(int, object)        # index, notes just read (single file only)
+    done = Signal(object, bool)              # per-file note lists (file order), cancelled
+
+    def __init__(self, paths, parent=None):
+        super().__init__(parent)
+        self.paths = list(paths)
+        self._stop = Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        results = [[] for _ in self.paths]
+
+        if len(self.paths) == 1:
+            # Single file — not worth spinning up worker processes.
+            # Parsed in batches so the panel can show notes as they arrive
+            path = self.paths[0]
+            try:
+                for batch in iter_import_batches(path):
+                    if self._stop.is_set():
+                        break
+                    results[0].extend(batch)
+                    self.notes_batch.emit(0, batch)
+                self.file_done.emit(0, path, len(results[0]), "")
+            except Exception as e:
+                self.file_done.emit(0, path, 0, str(e))
+        else:
+            futures = {submit_import_file(p): i for i, p in enumerate(self.paths)}
+            pending = set(futures)
+
+            while pending and not self._stop.is_set():
+                finished, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    i = futures[fut]
+                    path = self.paths[i]
+                    try:
+                        results[i] = fut.result()
+                        self.file_done.emit(i, path, len(results[i]), "")
+                    except BrokenProcessPool as e:
+                        reset_import_pool()
+                        self.file_done.emit(i, path, 0, f"worker crashed: {e}")
+                    except Exception as e:
+                        self.file_done.emit(i, path, 0, str(e))
+
+            for fut in pending:
+                fut.cancel()
+
+        if self._stop.is_set():
+            self.done.emit([], True)
+            return
+
+        # Keep the original file order so tie-breaks in the date sort are unchanged
+        self.done.emit(results, False)
+
+
 # ======================================================================
 # MAIN PANEL
 # ======================================================================
@@ -90,6 +162,14 @@ class PatientNotesPanel(QWidget):
         self.extraction_highlight_terms: list = []
         self.is_collapsed = False
 
+        self._import_worker: ImportWorker | None = None
+        self._import_progress: QProgressDialog | None = None
+        self._import_files: List[str] = []
+        # Notes shown while a single-file import is still streaming in
+        self._import_preview: List[Dict[str, Any]] | None = None
+        # Source files behind all_notes — makes re-imports incremental
+        self._import_manifest = ImportManifest()
+
         self._build_ui()
         self._entry_notes_loaded = False
 
@@ -432,27 +512,54 @@ class PatientNotesPanel(QWidget):
                     lambda checked=False, p=path: self._import_from_upload(p)
                 )
 
+        self._upload_menu.addSeparator()
+        purge_action = self._upload_menu.addAction("Clear Cached OCR Text…")
+        purge_action.triggered.connect(self._purge_ocr_cache)
+
+    def _purge_ocr_cache(self):
+        """Delete the OCR text cached from scanned PDF pages (asks first)."""
+        if self._import_worker is not None and self._import_worker.isRunning():
+            QMessageBox.information(
+                self, "Import in Progress",
+                "Please wait for the current import to finish before clearing cached OCR text."
+            )
+            return
+
+        reply = QMessageBox.question(
+            self, "Clear Cached OCR Text",
+            "Text read from scanned PDF pages is kept, encrypted, on this computer "
+            "so that re-importing a document does not OCR it again.\n\n"
+            "Delete all cached OCR text now? Scanned PDFs will be OCR'd again "
+            "the next time they are imported.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+
+        # Worker processes keep their own connections to the cache file.
+        # The OCR pool only exists if a PDF was imported this session.
+        reset_import_pool()
+        importer_pdf = sys.modules.get("importer_pdf")
+        if importer_pdf is not None:
+            importer_pdf.reset_ocr_pool()
+
+        from ocr_cache import purge_ocr_cache
+        if purge_ocr_cache():
+            QMessageBox.information(self, "Cached OCR Text Cleared",
+                                    "All cached OCR text has been deleted.")
+        else:
+            QMessageBox.warning(
+                self, "Cached OCR Text",
+                "Some cached OCR files are still in use and could not be deleted.\n"
+                "Please try again after restarting MyPsychAdmin."
+            )
+
     def _import_from_upload(self, path):
         """Process an uploaded file through the full notes pipeline."""
-        from importer_pdf import import_pdf_notes
-        from importer_docx import import_docx_notes
+        if not self._filter_unchanged_files([path]):
+            return
 
-        raw = []
-        fl = path.lower()
-        if fl.endswith(".pdf"):
-            raw.extend(import_pdf_notes([path]))
-        elif fl.endswith(".docx"):
-            raw.extend(import_docx_notes(path))
-        elif fl.endswith(".csv"):
-            from importer_systmone import is_systmone_csv, parse_systmone_csv
-            if is_systmone_csv(path):
-                raw.extend(parse_systmone_csv(path))
-        elif fl.endswith(".rtf"):
-            from importer_systmone import parse_systmone_rtf
-            raw.extend(parse_systmone_rtf(path))
-        elif fl.endswith((".xlsx", ".xls")):
-            from importer_autodetect import import_files_autodetect
-            raw.extend(import_files_autodetect([path]))
+        raw = parse_import_file(path)
 
         if not raw:
             QMessageBox.information(
@@ -462,7 +569,7 @@ class PatientNotesPanel(QWidget):
             return
 
         print(f"[NotesPanel] Upload: parsed {len(raw)} notes from {path}")
-        self._clean_and_load(raw)
+        self._load_parsed_files([path], [raw])
 
     def _upload_from_document(self):
         """Open file dialog and import the selected document."""
@@ -520,8 +627,8 @@ class PatientNotesPanel(QWidget):
     # IMPORT
     # ==================================================================
     def on_import_clicked(self):
-        from importer_pdf import import_pdf_notes
-        from importer_docx import import_docx_notes
+        if self._import_worker is not None and self._import_worker.isRunning():
+            return
 
         files, _ = QFileDialog.getOpenFileNames(
             self, "Select files", "",
@@ -535,94 +642,166 @@ class PatientNotesPanel(QWidget):
         for f in files:
             shared_store.add_uploaded_document(f)
 
-        raw = []
+        # ---------------------------------
+        # Incremental: skip files already loaded and unchanged
+        # ---------------------------------
+        files = self._filter_unchanged_files(files)
+        if not files:
+            return
 
-        for f in files:
-            fl = f.lower()
+        # ---------------------------------
+        # Parse in the background (files are independent)
+        # ---------------------------------
+        progress = QProgressDialog("Importing notes...", "Cancel", 0, len(files), self)
+        progress.setWindowTitle("Import Notes")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.setValue(0)
+        self._import_progress = progress
+
+        self._import_files = list(files)
+        # Preview streamed notes only into an empty panel — never mixed
+        # into notes that are already loaded
+        self._import_preview = [] if not self.all_notes else None
+        worker = ImportWorker(files, self)
+        worker.file_done.connect(self._on_import_file_done)
+        worker.notes_batch.connect(self._on_import_batch)
+        worker.done.connect(self._on_import_done)
+        progress.canceled.connect(worker.stop)
+        self._import_worker = worker
+
+        progress.show()
+        worker.start()
+
+    def _on_import_file_done(self, index, path, count, error):
+        name = os.path.basename(path)
+        if error:
+            print(f"[NotesPanel] Import failed for {path}: {error}")
+        else:
+            print(f"[NotesPanel] Parsed {count} notes from {path}")
 
-            # ---------------------------------
-            # PDF
-            # ---------------------------------
-            if fl.endswith(".pdf"):
-                raw.extend(import_pdf_notes([f]))
-                continue
+        progress = self._import_progress
+        if progress is None:
+            return
+        progress.setValue(progress.value() + 1)
+        status = f"failed ({error})" if error else f"{count} notes"
+        progress.setLabelText(
+            f"Parsed {progress.value()} of {progress.maximum()} files\n{name}: {status}"
+        )
 
-            # ---------------------------------
-            # DOCX
-            # ---------------------------------
-            if fl.endswith(".docx"):
-                raw.extend(import_docx_notes([f], "auto"))
-                continue
+    def _on_import_batch(self, index, notes):
+        """Show the notes of a streaming import while the rest of the file is read."""
+        preview = self._import_preview
+        if preview is None or not notes:
+            return
+        start = len(preview)
+        preview.extend(self._clean_note(n) for n in notes)
+        self.filtered_notes = preview
+        self._append_table_rows(start)
+        if start == 0:
+            self.table.selectRow(0)  # show the first note straight away
+
+        if self._import_progress is not None:
+            name = os.path.basename(self._import_files[index])
+            self._import_progress.setLabelText(f"Reading {name}...\n{len(preview)} notes so far")
+
+    def _on_import_done(self, results, cancelled):
+        had_preview = bool(self._import_preview)
+        self._import_preview = None
+        if self._import_progress is not None:
+            self._import_progress.close()
+            self._import_progress.deleteLater()
+            self._import_progress = None
+        if self._import_worker is not None:
+            self._import_worker.deleteLater()
+            self._import_worker = None
+
+        if cancelled:
+            print("[NotesPanel] Import cancelled")
+            if had_preview:
+                self.filter_types()  # drop the partial preview
+            return
 
-            # ---------------------------------
-            # CSV (SystmOne)
-            # ---------------------------------
-            if fl.endswith(".csv"):
-                from importer_systmone import is_systmone_csv, parse_systmone_csv
-                if is_systmone_csv(f):
-                    raw.extend(parse_systmone_csv(f))
-                continue
+        self._load_parsed_files(self._import_files, results)
 
-            # ---------------------------------
-            # RTF (SystmOne)
-            # ---------------------------------
-            if fl.endswith(".rtf"):
-                from importer_systmone import parse_systmone_rtf
-                raw.extend(parse_systmone_rtf(f))
-                continue
+    # ==================================================================
+    # INCREMENTAL RE-IMPORT (manifest)
+    # ==================================================================
+    def _filter_unchanged_files(self, files):
+        """Drop files whose notes are already loaded and whose bytes are unchanged."""
+        if not self.all_notes:
+            self._import_manifest.clear()
+            return files
 
-            # ---------------------------------
-            # EXCEL (AUTO-DETECT ONLY)
-            # ---------------------------------
-            if fl.endswith(".xlsx") or fl.endswith(".xls"):
-                from importer_autodetect import import_files_autodetect
-                raw.extend(import_files_autodetect([f]))
-                continue
+        unchanged = [f for f in files if self._import_manifest.status(f) == UNCHANGED]
+        for f in unchanged:
+            print(f"[NotesPanel] Unchanged since last import, skipped: {f}")
+
+        remaining = [f for f in files if f not in unchanged]
+        if not remaining:
+            QMessageBox.information(
+                self, "Already Imported",
+                "The selected files have not changed since they were imported.\n"
+                "The loaded notes are already up to date."
+            )
+        return remaining
+
+    def _load_parsed_files(self, files, results):
+        """Merge freshly parsed files, keeping only notes not already imported."""
+        raw = []
+        produced = []
+        for path, notes in zip(files, results):
+            produced.append((path, [note_id(n) for n in notes]))
+            fresh = self._import_manifest.new_notes(path, notes)
+            if len(fresh) < len(notes):
+                print(f"[NotesPanel] {path}: {len(notes) - len(fresh)} notes already loaded, "
+                      f"{len(fresh)} new")
+            raw.extend(fresh)
+
+        # Re-import of files we already hold → merge the new tail, don't ask
+        known = bool(self.all_notes) and all(self._import_manifest.get(p) for p in files)
 
         print("TOTAL RAW NOTES IMPORTED:", len(raw))
-        self._clean_and_load(raw)
+        if known and not raw:
+            for path, ids in produced:
+                self._import_manifest.record(path, ids)
+            print("[NotesPanel] Re-import produced no new notes")
+            return
+
+        if self._clean_and_load(raw, merge=known) is None:
+            return
+        for path, ids in produced:
+            self._import_manifest.record(path, ids)
 
     # ==================================================================
     # CLEAN
     # ==================================================================
-    def _clean_and_load(self, raw):
-        cleaned = []
-        for n in raw:
-            dt = n.get("date")
-
-            content = (
-                n.get("content")
-                or n.get("text")
-                or n.get("body")
-                or n.get("note")
-                or ""
-            )
-            content = str(content)
-
-            preview = " ".join(content.split("\n")[:3]).strip()
-            if len(preview) > 200:
-                preview = preview[:197] + "…"
-
-            cleaned.append({
-                "date": dt,
-                "type": str(n.get("type", "")).strip(),
-                "raw_type": str(n.get("raw_type", "")).strip(),
-                "originator": str(n.get("originator", "")).strip(),
-                "preview": preview,
-                "content": content,
-                "source": str(n.get("source", "")).lower()
-            })
+    def _clean_and_load(self, raw, merge=False):
+        """
+        Normalise raw importer output and load it into the panel.
+        merge=True adds to the existing notes without asking.
+        Returns "add", "replace", or None if the user cancelled.
+        """
+        cleaned = [self._clean_note(n) for n in raw]
 
         # --- Ask to add or replace if notes already loaded ---
+        decision = "replace"
         if self.all_notes and cleaned:
-            cleaned = self._ask_add_or_replace(cleaned)
+            if merge:
+                cleaned, decision = self._merge_with_existing(cleaned), "add"
+            else:
+                cleaned, decision = self._ask_add_or_replace(cleaned)
             if cleaned is None:
-                return  # User cancelled
+                return None  # User cancelled
 
         # Always sort latest first
         cleaned.sort(key=lambda n: n.get("date") or datetime.min, reverse=True)
 
         self.all_notes = cleaned
+        if decision == "replace":
+            self._import_manifest.clear()  # old source files no longer loaded
         # Merge back any persisted notes_entry notes so they're not lost on import
         self._entry_notes_loaded = False  # force reload after replace
         self._load_entry_notes_from_db()
@@ -637,6 +816,33 @@ class PatientNotesPanel(QWidget):
 
         # Run extraction and push extracted data for auto-populating reports/forms
         self._run_extraction_for_global_import(self.all_notes, shared_store)
+        return decision
+
+    @staticmethod
+    def _clean_note(n):
+        """One raw importer note → the panel's note dict."""
+        content = (
+            n.get("content")
+            or n.get("text")
+            or n.get("body")
+            or n.get("note")
+            or ""
+        )
+        content = str(content)
+
+        preview = " ".join(content.split("\n")[:3]).strip()
+        if len(preview) > 200:
+            preview = preview[:197] + "…"
+
+        return {
+            "date": n.get("date"),
+            "type": str(n.get("type", "")).strip(),
+            "raw_type": str(n.get("raw_type", "")).strip(),
+            "originator": str(n.get("originator", "")).strip(),
+            "preview": preview,
+            "content": content,
+            "source": str(n.get("source", "")).lower()
+        }
 
     # ==================================================================
     # ADD / REPLACE DIALOG
@@ -644,7 +850,7 @@ class PatientNotesPanel(QWidget):
     def _ask_add_or_replace(self, new_notes):
         """When notes already exist, ask the user whether to add or replace.
 
-        Returns the final notes list, or None if cancelled.
+        Returns (final notes list, "add" | "replace"), or (None, None) if cancelled.
         """
         existing_count = len(self.all_notes)
         new_count = len(new_notes)
@@ -671,22 +877,26 @@ class PatientNotesPanel(QWidget):
         clicked = msg.clickedButton()
 
         if clicked == cancel_btn:
-            return None
+            return None, None
 
         if clicked == add_btn:
-            merged = list(self.all_notes) + new_notes
-            before = len(merged)
-            merged = self._deduplicate_notes(merged)
-            dupes = before - len(merged)
-            if dupes:
-                print(f"[NotesPanel] Removed {dupes} duplicate notes during merge")
-            # Sort by date, latest first
-            merged.sort(key=lambda n: n.get("date") or datetime.min, reverse=True)
-            return merged
+            return self._merge_with_existing(new_notes), "add"
 
         # Replace — sort by date, latest first
         new_notes.sort(key=lambda n: n.get("date") or datetime.min, reverse=True)
-        return new_notes
+        return new_notes, "replace"
+
+    def _merge_with_existing(self, new_notes):
+        """Append new notes to all_notes, drop duplicates, sort latest first."""
+        merged = list(self.all_notes) + new_notes
+        before = len(merged)
+        merged = self._deduplicate_notes(merged)
+        dupes = before - len(merged)
+        if dupes:
+            print(f"[NotesPanel] Removed {dupes} duplicate notes during merge")
+        # Sort by date, latest first
+        merged.sort(key=lambda n: n.get("date") or datetime.min, reverse=True)
+        return merged
 
     @staticmethod
     def _describe_notes(notes):
@@ -729,16 +939,17 @@ class PatientNotesPanel(QWidget):
             from history_extractor_sections import extract_patient_history, convert_to_panel_format
             from timeline_builder import build_timeline
 
-            # Prepare notes for extraction
+            # Prepare notes for extraction ("content" and "text" share one string)
             prepared = []
             for n in notes:
+                body = n.get("content", "").strip()
                 prepared.append({
                     "date": n.get("date"),
                     "type": (n.get("type") or "").strip().lower(),
                     "raw_type": (n.get("raw_type") or "").strip(),
                     "originator": n.get("originator", "").strip(),
-                    "content": n.get("content", "").strip(),
-                    "text": n.get("content", "").strip(),
+                    "content": body,
+                    "text": body,
                     "source": n.get("source", "").strip().lower()
                 })
 
@@ -754,8 +965,9 @@ class PatientNotesPanel(QWidget):
                 shared_store.set_patient_info(patient_info, source="notes_panel")
                 print(f"[NotesPanel] 🌐 Global import: pushed patient info to SharedDataStore: {list(k for k,v in patient_info.items() if v)}")
 
-            # Build timeline and extract history
-            episodes = build_timeline(prepared)
+            # Build timeline and extract history (`notes` are what the store
+            # was just set to, so its version identifies `prepared`)
+            episodes = build_timeline(prepared, notes_key=("notes_panel_import", shared_store.notes_version))
             history = extract_patient_history(prepared, episodes=episodes)
             panel_data = convert_to_panel_format(history)
 
@@ -980,9 +1192,18 @@ class PatientNotesPanel(QWidget):
         self.cmb_type.setCurrentIndex(0)
         self.cmb_type.blockSignals(False)
 
-    def filter_types(self):
+    def _type_filtered(self):
         t = self.cmb_type.currentText()
 
+        # Filter directly without unnecessary copy
+        if t == "All types":
+            return self.all_notes
+        elif t == "(No type)":
+            return [x for x in self.all_notes if not x["type"]]
+        else:
+            return [x for x in self.all_notes if x["type"] == t]
+
+    def filter_types(self):
         # Remember currently selected note before filtering
         selected_note = None
         rows = self.table.selectionModel().selectedRows()
@@ -991,16 +1212,37 @@ class PatientNotesPanel(QWidget):
             if row < len(self.filtered_notes):
                 selected_note = self.filtered_notes[row]
 
-        # Filter directly without unnecessary copy
-        if t == "All types":
-            self.filtered_notes = self.all_notes
-        elif t == "(No type)":
-            self.filtered_notes = [x for x in self.all_notes if not x["type"]]
-        else:
-            self.filtered_notes = [x for x in self.all_notes if x["type"] == t]
-
+        self.filtered_notes = self._type_filtered()
         self.refresh_table(preserve_selection=selected_note)
 
+    def adopt_shared_rows(self, rows) -> bool:
+        """
+        Incremental update for notes this panel already shows.
+
+        If the shared store's rows are exactly all_notes (same note IDs and
+        fields, same order — e.g. our own import or entry-note edit coming back),
+        re-point all_notes at them so the panel's dict copies can be freed,
+        keep notes_entry notes as our own editable dicts, and leave the
+        table and selection alone. Returns False if the notes differ and
+        the caller must reload.
+        """
+        if not rows or len(rows) != len(self.all_notes) or not isinstance(rows[0], NoteRow):
+            return False
+        for n, row in zip(self.all_notes, rows):
+            if n is row:
+                continue
+            if (n.note_id if isinstance(n, NoteRow) else note_id(n)) != row.note_id:
+                return False
+            if note_state(n) != note_state(row):
+                return False
+
+        self.all_notes = [
+            n if n.get("source") == "notes_entry" and type(n) is dict else row
+            for n, row in zip(self.all_notes, rows)
+        ]
+        self.filtered_notes = self._type_filtered()  # same rows, same order
+        return True
+
 
     # ==================================================================
     # TABLE REFRESH + HTML HIGHLIGHTING
@@ -1009,6 +1251,11 @@ class PatientNotesPanel(QWidget):
     _COLOR_WHITE = QColor("white")
     _COLOR_CACHE = {}
 
+    def _search_pattern(self):
+        if not self.current_search:
+            return None
+        return re.compile(re.escape(self.current_search), re.IGNORECASE)
+
     def refresh_table(self, preserve_selection=None):
         # Disable updates during batch operation for performance
         self.table.setUpdatesEnabled(False)
@@ -1016,65 +1263,10 @@ class PatientNotesPanel(QWidget):
             self.table.setRowCount(len(self.filtered_notes))
 
             # Pre-compile regex pattern outside loop if searching
-            search_pattern = None
-            if self.current_search:
-                search_pattern = re.compile(re.escape(self.current_search), re.IGNORECASE)
+            search_pattern = self._search_pattern()
 
             for r, n in enumerate(self.filtered_notes):
-                preview = n["preview"]
-
-                if search_pattern:
-                    preview = search_pattern.sub(
-                        r'<span style="background-color:#CCE5FF; color:#003366;">\g<0></span>',
-                        preview
-                    )
-
-                # Create items directly without inner loop
-                date_item = QTableWidgetItem(format_pretty_date(n["date"]))
-                date_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-                self.table.setItem(r, 0, date_item)
-
-                type_item = QTableWidgetItem(n["type"])
-                type_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-                # Apply source colour to TYPE column
-                src = n.get("source", "")
-                colour = SOURCE_COLOURS.get(src)
-                if colour:
-                    # Use cached QColor objects
-                    if colour not in self._COLOR_CACHE:
-                        self._COLOR_CACHE[colour] = QColor(colour)
-                    type_item.setBackground(self._COLOR_CACHE[colour])
-                    type_item.setForeground(self._COLOR_WHITE)
-                self.table.setItem(r, 1, type_item)
-
-                orig_item = QTableWidgetItem(n["originator"])
-                orig_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-                self.table.setItem(r, 2, orig_item)
-
-                preview_item = QTableWidgetItem()
-                preview_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-                preview_item.setData(Qt.DisplayRole, preview)
-                self.table.setItem(r, 3, preview_item)
-
-                # Style notes_entry rows by status
-                status = n.get("status", "")
-                if status == "errored":
-                    red = QColor("#dc2626")
-                    red_bg = QColor("#fef2f2")
-                    font = date_item.font()
-                    font.setStrikeOut(True)
-                    for item in (date_item, type_item, orig_item, preview_item):
-                        item.setForeground(red)
-                        item.setBackground(red_bg)
-                        item.setFont(font)
-                elif status == "confirmed":
-                    lock_bg = QColor("#f0fdf4")
-                    for item in (date_item, orig_item, preview_item):
-                        item.setBackground(lock_bg)
-                elif status in ("draft", "editing"):
-                    yellow_bg = QColor("#fefce8")
-                    for item in (date_item, orig_item, preview_item):
-                        item.setBackground(yellow_bg)
+                self._fill_table_row(r, n, search_pattern)
 
         finally:
             # Re-enable updates
@@ -1093,6 +1285,73 @@ class PatientNotesPanel(QWidget):
             idx = self.table.model().index(target_row, 0)
             self.table.scrollTo(idx, QAbstractItemView.PositionAtCenter)
 
+    def _append_table_rows(self, start):
+        """Add filtered_notes[start:] to the table, leaving the rows above untouched."""
+        self.table.setUpdatesEnabled(False)
+        try:
+            self.table.setRowCount(len(self.filtered_notes))
+            search_pattern = self._search_pattern()
+            for r in range(start, len(self.filtered_notes)):
+                self._fill_table_row(r, self.filtered_notes[r], search_pattern)
+        finally:
+            self.table.setUpdatesEnabled(True)
+
+    def _fill_table_row(self, r, n, search_pattern):
+        preview = n["preview"]
+
+        if search_pattern:
+            preview = search_pattern.sub(
+                r'<span style="background-color:#CCE5FF; color:#003366;">\g<0></span>',
+                preview
+            )
+
+        # Create items directly without inner loop
+        date_item = QTableWidgetItem(format_pretty_date(n["date"]))
+        date_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+        self.table.setItem(r, 0, date_item)
+
+        type_item = QTableWidgetItem(n["type"])
+        type_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+        # Apply source colour to TYPE column
+        src = n.get("source", "")
+        colour = SOURCE_COLOURS.get(src)
+        if colour:
+            # Use cached QColor objects
+            if colour not in self._COLOR_CACHE:
+                self._COLOR_CACHE[colour] = QColor(colour)
+            type_item.setBackground(self._COLOR_CACHE[colour])
+            type_item.setForeground(self._COLOR_WHITE)
+        self.table.setItem(r, 1, type_item)
+
+        orig_item = QTableWidgetItem(n["originator"])
+        orig_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+        self.table.setItem(r, 2, orig_item)
+
+        preview_item = QTableWidgetItem()
+        preview_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+        preview_item.setData(Qt.DisplayRole, preview)
+        self.table.setItem(r, 3, preview_item)
+
+        # Style notes_entry rows by status
+        status = n.get("status", "")
+        if status == "errored":
+            red = QColor("#dc2626")
+            red_bg = QColor("#fef2f2")
+            font = date_item.font()
+            font.setStrikeOut(True)
+            for item in (date_item, type_item, orig_item, preview_item):
+                item.setForeground(red)
+                item.setBackground(red_bg)
+                item.setFont(font)
+        elif status == "confirmed":
+            lock_bg = QColor("#f0fdf4")
+            for item in (date_item, orig_item, preview_item):
+                item.setBackground(lock_bg)
+        elif status in ("draft", "editing"):
+            yellow_bg = QColor("#fefce8")
+            for item in (date_item, orig_item, preview_item):
+                item.setBackground(yellow_bg)
+
     # ==================================================================
     # SELECT ROW → DISPLAY CONTENT
     # ==================================================================
@@ -1285,6 +1544,24 @@ class PatientNotesPanel(QWidget):
         except Exception as e:
             print(f"[NotesPanel] Persist entry notes error: {e}")
 
+    def _publish_entry_edit(self, n):
+        """
+        Push an edited entry note to the shared store so other pages see it,
+        then redraw just that note's table row.
+        """
+        store = get_shared_store()
+        store.set_notes(self.all_notes, source="notes_panel")
+        self.adopt_shared_rows(store.notes)  # no-op if the page already did
+
+        for r, shown in enumerate(self.filtered_notes):
+            if shown is n:
+                self.table.setUpdatesEnabled(False)
+                try:
+                    self._fill_table_row(r, n, self._search_pattern())
+                finally:
+                    self.table.setUpdatesEnabled(True)
+                break
+
     # ==================================================================
     # NOTES ENTRY — ACTION HANDLERS
     # ==================================================================
@@ -1332,7 +1609,7 @@ class PatientNotesPanel(QWidget):
         n["status"] = "confirmed"
         n["edit_deadline"] = None
         self.txt_detail.setReadOnly(True)
-        self.refresh_table(preserve_selection=n)
+        self._publish_entry_edit(n)
         self.on_select()
         self._persist_entry_notes()
 
@@ -1346,7 +1623,7 @@ class PatientNotesPanel(QWidget):
         from datetime import timedelta
         n["status"] = "editing"
         n["edit_deadline"] = datetime.now() + timedelta(days=30)
-        self.refresh_table(preserve_selection=n)
+        self._publish_entry_edit(n)
         self.on_select()
 
         # Open notes entry panel pre-filled for editing
@@ -1412,7 +1689,7 @@ class PatientNotesPanel(QWidget):
         n["error_reason"] = reason
         n["edit_deadline"] = None
         self.txt_detail.setReadOnly(True)
-        self.refresh_table(preserve_selection=n)
+        self._publish_entry_edit(n)
         self.on_select()
         self._persist_entry_notes()
 
@@ -2,8 +2,13 @@
 # PHYSICAL HEALTH EXTRACTOR (FULL COMBINED VERSION)
 # MyPsychAdmin 2.3 — 28 Nov 2025
 # ============================================================
+import hashlib
 import re
+import threading
 from datetime import datetime
+from functools import lru_cache
+
+from term_automaton import TermAutomaton
 
 ############################################################
 # 1. CANONICAL_BLOODS — MUST BE FIRST
@@ -865,8 +870,147 @@ def extract_bloods_from_text(text):
         return []
 
 ############################################################
-# 9. NHS-STYLE BLOOD EXTRACTOR — FAST v3
+# 9. NHS-STYLE BLOOD EXTRACTOR — SINGLE PASS
 ############################################################
+# Every synonym of every test is compiled into ONE TermAutomaton,
+# so a note is scanned once for all test names. For each test the
+# first of its synonyms present in the note (list order) is used,
+# and the value/flag/unit tail is matched straight after each
+# occurrence of it with one precompiled regex, within that line.
+# Unit and range checks come from BLOOD_RULES, built from
+# CANONICAL_BLOODS.
+
+# Tests whose value may be reported without a unit
+# (GGT / Prolactin / CRP / ESR / Clozapine)
+UNITLESS_OK = {21, 44, 13, 18, 11}
+
+# Fix NHS glitches where H/L flags glue onto numbers
+# Example: "CountH5.56" → "Count 5.56"
+_FLAG_GLUE_REGEX = re.compile(r"([a-z])([hHlL])([0-9])")
+
+# Everything after the test name: wording, value, H/L flag, unit
+_BLOOD_VALUE_REGEX = re.compile(
+    r"""
+    (?:[^0-9]{0,80})?                   # allow extra wording like "level, plasma"
+    (?P<val>[0-9]+(?:\.[0-9]+)?)        # capture the number (value)
+    (?:\s*(?:h|l|high|low))?            # allow H/L flags
+    \s*
+    (?P<unit>
+        g\/?l|G\/?L|
+        mmol\/?l|
+        µ?mol\/?l|umol\/?l|
+        iu\/?l|unit\/?l|u\/?l|iu|
+        miu\/?l|munit\/?l|mu\/?l|
+        ng\/ml|pg\/ml|
+        fL|fl|
+        l\/?l|
+        %|
+        ratio|
+        mg\/l| \bmg\b |
+        (?:x|×)\s*10[\*\^]?9\/?l|
+        (?:x|×)\s*10[\*\^]?12\/?l
+    )?
+    """,
+    flags=re.IGNORECASE | re.VERBOSE,
+)
+
+_BLOOD_UNIT_REPLACEMENTS = {
+    "g/l": "g/l", "g\\l": "g/l",
+    "mmol/l": "mmol/l",
+    "µmol/l": "µmol/l", "umol/l": "µmol/l",
+    "iu/l": "iu/l",
+    "miu/l": "miu/l", "munit/l": "miu/l",
+    "fl": "fl",
+    "pg": "pg",
+    "l/l": "l/l",
+    "%": "%",
+    "ratio": "ratio",
+    "ng/ml": "ng/ml", "pg/ml": "pg/ml",
+    "×10^9/l": "×10^9/l",
+    "×10^12/l": "×10^12/l",
+}
+
+
+@lru_cache(maxsize=256)
+def _norm_blood_unit(u):
+    """Unit normalisation used to compare extracted and expected units."""
+    if not u:
+        return ""
+
+    u = u.lower().strip()
+    u = u.replace("μ", "µ")
+    u = u.replace("u", "µ") if "mol" in u else u
+    u = u.replace(" ", "")
+
+    # ×10 ranges
+    u = u.replace("x10*9/l", "×10^9/l").replace("x10^9/l", "×10^9/l")
+    u = u.replace("x10*12/l", "×10^12/l").replace("x10^12/l", "×10^12/l")
+
+    # ALT/AST/GGT: "unit/l", "u/l" → "iu/l"
+    u = u.replace("unit/l", "iu/l").replace("u/l", "iu/l")
+
+    return _BLOOD_UNIT_REPLACEMENTS.get(u, u)
+
+
+# bid → synonyms (lowercase, list order), expected unit, range, unit rules
+BLOOD_RULES = [
+    (
+        bid,
+        [syn.lower() for syn in meta.get("synonyms", [])],
+        _norm_blood_unit(meta.get("unit", "")),
+        meta["min"],
+        meta["max"],
+        bid in UNITLESS_OK,
+        meta.get("convert"),
+    )
+    for bid, meta in CANONICAL_BLOODS.items()
+]
+
+BLOOD_SYNONYM_AUTOMATON = TermAutomaton(
+    syn for _, syns, *_ in BLOOD_RULES for syn in syns
+)
+
+
+def _check_blood_value(raw_val, raw_unit, expected_unit, min_v, max_v,
+                       allow_missing, convert):
+    """Validated value for one candidate match, or None if it is rejected."""
+    try:
+        val = float(raw_val)
+    except:
+        return None
+
+    unit = _norm_blood_unit(raw_unit) if raw_unit else ""
+
+    # Unit conversion table (Clozapine): a unit is required and must
+    # convert to mg/L (prevents dose extraction)
+    if convert is not None:
+        if not raw_unit:
+            return None
+
+        u = unit.lower()
+        if u in convert:
+            val = val * convert[u]
+        else:
+            # Accept only mg/L or µg/L variants
+            if u not in ("mg/l", "µg/l", "ug/l"):
+                return None
+            if u in ("µg/l", "ug/l"):
+                val = val / 1000
+
+    # MIN/MAX CHECK (reject impossible narrative numbers)
+    if val < min_v or val > max_v:
+        return None
+
+    # UNIT MUST MATCH (except whitelist)
+    if not raw_unit:
+        if not allow_missing:
+            return None
+    elif convert is None and unit != expected_unit:
+        return None
+
+    return val
+
+
 def extract_bloods(text):
     """
     NHS-compatible blood extractor — Flexible Mode.
@@ -879,161 +1023,40 @@ def extract_bloods(text):
         return []
 
     # working copy
-    t = text.lower()
+    t = _FLAG_GLUE_REGEX.sub(r"\1 \3", text.lower())
 
-    # Fix NHS glitches where H/L flags glue onto numbers
-    # Example: "CountH5.56" → "Count 5.56"
-    t = re.sub(r"([a-z])([hHlL])([0-9])", r"\1 \3", t)
+    found = BLOOD_SYNONYM_AUTOMATON.occurrences(t)
+    if not found:
+        return []
 
     results = []
-    seen = set()
-
-    # --- UNIT NORMALISATION ---
-    def norm_unit(u):
-        if not u:
-            return ""
-
-        u = u.lower().strip()
-        u = u.replace("μ", "µ")
-        u = u.replace("u", "µ") if "mol" in u else u
-        u = u.replace(" ", "")
-
-        # ×10 ranges
-        u = u.replace("x10*9/l", "×10^9/l").replace("x10^9/l", "×10^9/l")
-        u = u.replace("x10*12/l", "×10^12/l").replace("x10^12/l", "×10^12/l")
-
-        # ALT/AST/GGT: "unit/l", "u/l" → "iu/l"
-        u = u.replace("unit/l", "iu/l").replace("u/l", "iu/l")
-
-        replacements = {
-            "g/l": "g/l", "g\\l": "g/l",
-            "mmol/l": "mmol/l",
-            "µmol/l": "µmol/l", "umol/l": "µmol/l",
-            "iu/l": "iu/l",
-            "miu/l": "miu/l", "munit/l": "miu/l",
-            "fl": "fl",
-            "pg": "pg",
-            "l/l": "l/l",
-            "%": "%",
-            "ratio": "ratio",
-            "ng/ml": "ng/ml", "pg/ml": "pg/ml",
-            "×10^9/l": "×10^9/l",
-            "×10^12/l": "×10^12/l",
-        }
-        return replacements.get(u, u)
-
-    # --- MAIN EXTRACTION LOOP ---
-    for bid, meta in CANONICAL_BLOODS.items():
-        syns = meta.get("synonyms", [])
-        expected_unit = norm_unit(meta.get("unit", ""))
-
-        # find synonym in text
-        syn_found = None
-        for syn in syns:
-            s = syn.lower()
-            if s in t:
-                syn_found = s
-                break
-
-        if not syn_found:
+    for bid, syns, expected_unit, min_v, max_v, allow_missing, convert in BLOOD_RULES:
+        syn_found = next((s for s in syns if s in found), None)
+        if syn_found is None:
             continue
 
-        # scan line by line — more accurate
-        for line in t.split("\n"):
-            if syn_found not in line:
+        # Occurrences in order; a value match consumes the text it
+        # covers, so occurrences inside it are skipped
+        consumed_to = -1
+        for pos in found[syn_found]:
+            if pos < consumed_to:
                 continue
+            line_end = t.find("\n", pos)
+            if line_end < 0:
+                line_end = len(t)
 
-            patt = rf"""
-                {re.escape(syn_found)}
-                (?:[^0-9]{{0,80}})?                 # allow extra wording like "level, plasma"
-                (?P<val>[0-9]+(?:\.[0-9]+)?)        # capture the number (value)
-                (?:\s*(?:h|l|high|low))?            # allow H/L flags
-                \s*
-                (?P<unit>
-                    g\/?l|G\/?L|
-                    mmol\/?l|
-                    µ?mol\/?l|umol\/?l|
-                    iu\/?l|unit\/?l|u\/?l|iu|
-                    miu\/?l|munit\/?l|mu\/?l|
-                    ng\/ml|pg\/ml|
-                    fL|fl|
-                    l\/?l|
-                    %|
-                    ratio|
-                    mg\/l| \bmg\b |
-                    (?:x|×)\s*10[\*\^]?9\/?l|
-                    (?:x|×)\s*10[\*\^]?12\/?l
-                )?
-            """
-
-            for m in re.finditer(patt, line, flags=re.IGNORECASE | re.VERBOSE):
-                raw_val = m.group("val")
-                raw_unit = m.group("unit")
-
-                try:
-                    val = float(raw_val)
-                except:
-                    continue
-
-                if raw_unit:
-                    unit = norm_unit(raw_unit)
-                else:
-                    unit = ""
-
-                # ---------------------------------------------------------------------
-                # CLOZAPINE SPECIAL HANDLING (bid == 11)
-                # ---------------------------------------------------------------------
-                if bid == 11:
-
-                    # If no unit was extracted → REJECT (prevents dose extraction)
-                    if not raw_unit:
-                        continue
-
-                    u = unit.lower()
-                    conv = meta.get("convert", {})
-
-                    # If unit explicitly appears in conversion table → convert to mg/L
-                    if u in conv:
-                        val = val * conv[u]
-                        unit = "mg/l"
-
-                    else:
-                        # Accept only mg/L or µg/L variants
-                        if u not in ("mg/l", "µg/l", "ug/l"):
-                            continue
-
-                        # µg/L → mg/L
-                        if u in ("µg/l", "ug/l"):
-                            val = val / 1000
-                            unit = "mg/l"
-
-                # ---------------------------------------------------------------------
-                # MIN/MAX CHECK (reject impossible narrative numbers)
-                # ---------------------------------------------------------------------
-                min_v = meta["min"]
-                max_v = meta["max"]
-                if val < min_v or val > max_v:
-                    continue
-
-                # ---------------------------------------------------------------------
-                # UNIT MUST MATCH (except whitelist)
-                # ---------------------------------------------------------------------
-                allow_missing = bid in {21, 44, 13, 18, 11}  # GGT/Prolactin/CRP/ESR/Clozapine
-
-                if not raw_unit:
-                    if not allow_missing:
-                        continue
-                else:
-                    if bid != 11:  # clozapine already handled
-                        if unit != expected_unit:
-                            continue
-
-                # avoid duplicates
-                if bid in seen:
-                    continue
-                seen.add(bid)
+            m = _BLOOD_VALUE_REGEX.match(t, pos + len(syn_found), line_end)
+            if not m:
+                continue
+            consumed_to = m.end()
 
+            val = _check_blood_value(
+                m.group("val"), m.group("unit"),
+                expected_unit, min_v, max_v, allow_missing, convert,
+            )
+            if val is not None:
                 results.append((bid, val))
+                break
 
     return results
 
@@ -1227,3 +1250,122 @@ def extract_physical_health_from_notes(notes):
         "bloods": bloods,
     }
 
+
+
+# ============================================================
+# BATCHED EXTRACTION (PER-NOTE CACHE + WORKER PROCESSES)
+# ============================================================
+# Per-note results depend only on the note's "content" text, so they
+# are cached by a digest of that text and EXTRACTOR_VERSION:
+# re-opening the physical health panel, or adding a few notes, only
+# extracts the notes not seen before. Large batches of new notes are
+# split across the shared worker-process pool from importer_pipeline.
+# extract_physical_health_batched() blocks until every batch is back —
+# GUI code runs it from a worker (see patient_notes_page).
+
+# Bump whenever BMI / BP / bloods extraction changes (drops cached results)
+EXTRACTOR_VERSION = 2
+
+# New notes per worker task, and the fewest worth sending to workers
+BATCH_SIZE = 500
+MIN_PARALLEL_NOTES = 2000
+
+MAX_CACHED_NOTES = 200_000
+
+_note_cache = {}   # (content digest, EXTRACTOR_VERSION) → (bmi, bp list, blood hits)
+_note_cache_lock = threading.Lock()
+
+
+def _cache_key(txt):
+    """Cache key for a note's text — the same field extraction reads."""
+    return (hashlib.blake2b(txt.encode("utf-8"), digest_size=16).digest(), EXTRACTOR_VERSION)
+
+
+def _extract_note(txt):
+    """(bmi dict or None, [bp dicts], [(bid, value)]) for one note's text."""
+    return (
+        extract_bmi_from_text(txt),
+        extract_bp_from_text(txt) or [],
+        extract_bloods_from_text(txt),
+    )
+
+
+def _extract_batch(texts):
+    """Worker-process entry point: _extract_note for each text."""
+    return [_extract_note(t) for t in texts]
+
+
+def _extract_uncached(texts, workers):
+    """Per-note results for texts, in order — in worker processes when worthwhile."""
+    if workers == 0 or len(texts) < MIN_PARALLEL_NOTES:
+        return _extract_batch(texts)
+
+    from concurrent.futures.process import BrokenProcessPool
+    from importer_pipeline import get_import_pool, reset_import_pool
+
+    batches = [texts[i:i + BATCH_SIZE] for i in range(0, len(texts), BATCH_SIZE)]
+    try:
+        pool = get_import_pool()
+        out = []
+        for part in pool.map(_extract_batch, batches):
+            out.extend(part)
+        return out
+    except BrokenProcessPool as e:
+        reset_import_pool()
+        print(f"[PHYS] Worker pool failed ({e}) — extracting in process")
+        return _extract_batch(texts)
+
+
+def extract_physical_health_batched(notes, workers=None):
+    """
+    Same result as extract_physical_health_from_notes(notes), but reuses
+    cached per-note results and only extracts notes not seen before.
+    workers=0 forces in-process extraction. Blocks — call it off the
+    GUI thread.
+    """
+    texts = [n.get("content", "") or "" for n in notes]
+    keys = [_cache_key(t) for t in texts]
+
+    missing = {}
+    for txt, key in zip(texts, keys):
+        if key not in _note_cache and key not in missing:
+            missing[key] = txt
+
+    if missing:
+        fresh = _extract_uncached(list(missing.values()), workers)
+        with _note_cache_lock:
+            _note_cache.update(zip(missing, fresh))
+            while len(_note_cache) > MAX_CACHED_NOTES:
+                del _note_cache[next(iter(_note_cache))]
+
+    print(f"[PHYS] {len(notes)} notes: {len(missing)} extracted, "
+          f"{len(notes) - len(missing)} from cache")
+
+    bmi_list = []
+    bp_list = []
+    bloods = {}
+
+    for n, txt, key in zip(notes, texts, keys):
+        bmi, bp, hits = _note_cache.get(key) or _extract_note(txt)
+        date = n.get("date") or n.get("datetime")
+
+        if bmi:
+            bmi_list.append({"date": date, **bmi})
+
+        for entry in bp:
+            bp_list.append({"date": date, **entry})
+
+        for bid, val in hits:
+            meta = CANONICAL_BLOODS.get(bid, {})
+            bloods.setdefault(bid, []).append({
+                "date": date,
+                "value": val,
+                "unit": meta.get("unit", ""),
+                "name": meta.get("canonical", f"Test {bid}")
+            })
+
+    return {
+        "bmi": bmi_list,
+        "bp": bp_list,
+        "bloods": bloods,
+    }
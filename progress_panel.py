@@ -8,7 +8,7 @@ from __future__ import annotations
 import re
 from datetime import datetime, timedelta
 from collections import defaultdict
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import io
 
 from PySide6.QtWidgets import (
@@ -20,6 +20,7 @@ from PySide6.QtGui import QPixmap
 
 from patient_history_panel_shared import CollapsibleSection, apply_macos_blur
 from timeline_builder import build_timeline
+from analysis_runner import CHART_DPI, cached_chart, new_data_version, peek_chart
 from shared_data_store import get_shared_store
 import random
 
@@ -2784,6 +2785,62 @@ NEGATIVE_CONTEXT_PATTERNS = [
 ]
 
 
+# Patterns for _has_negative_context. Each list is tested as "any of these
+# matches", so it is compiled into one alternation below.
+_NEGATIVE_BEFORE = [
+    r'\b(no|nil|none|denies?|denied|without|lacks?)\s*$',
+    r'\b(no|nil|none|denies?|denied|without|lacks?)\s+(any|all|the|a)?\s*$',
+    r'\b(no\s+evidence|no\s+history|no\s+signs?|no\s+indication)\s+of\s*$',
+    r'\b(has\s+not|did\s+not|does\s+not|hasn\'t|didn\'t|doesn\'t)\s*$',
+    r'\b(not\s+noted|not\s+reported|not\s+observed)\s*$',
+    r'\bdenied\s+(any|all)?\s*(thoughts?\s+of|ideation\s+of|intent\s+to|intention\s+to)?\s*$',
+    # Additional patterns for common clinical negations
+    r'\b(not|never)\s+express(ing|ed)?\s*(any)?\s*$',
+    r'\bno\s+(current|recent|active|new)?\s*(thoughts?|episodes?|ideation|urges?|intent)\s+(of|to)\s*$',
+    r'\b(doesn\'t|does\s+not|don\'t|do\s+not)\s+have\s+(\w+\s+)*$',  # "doesn't have current active"
+    r'\b(there\s+)?(were|was|are|is)\s+no\s+(episode|evidence|history|indication)s?\s+(of)?\s*$',
+    r'\bno\s+\w+\s+of\s*$',  # "no episode of", "no thoughts of", etc.
+    r'\bwith\s+no\s*$',  # "with no self-harming"
+    # Handle "or" clauses - negation earlier in phrase carries through
+    r'\bor\s+(urges?\s+to|thoughts?\s+of|intent\s+to)?\s*$',
+    # "was not X", "were not X" patterns
+    r'\b(was|were|is|are)\s+not\s*$',
+    # Negation earlier in the broader context (handles "X or Y" constructs)
+    r'\b(no|not|nil|none|denied|denies|without)\b.{0,40}\bor\b',
+    r'\b(doesn\'t|does\s+not|don\'t)\s+have\b',
+]
+
+_NEGATIVE_AFTER = [
+    r'^\s*(nil|none|denied|not\s+noted|not\s+reported)\b',
+    r'^\s*-\s*(nil|no|none|denied)\b',
+    r'^\s*(were|was|are|is)?\s*(not\s+present|not\s+identified|not\s+expressed|absent)\b',
+    r'^\s*(were|was|are|is)?\s*not\s+(noted|reported|observed|evident|identified)\b',
+    # Allow for intervening words like "thoughts", "ideation" before negative phrase
+    r'^\s*\w*\s*(were|was|are|is)?\s*(not\s+present|absent)\b',
+    r'^\s*(thoughts?|ideation)?\s*(were|was|are|is)?\s*(not\s+present|absent|not\s+expressed|denied)\b',
+    # "X was not required/needed" patterns
+    r'^\s*(was|were|is|are)?\s*not\s+(required|needed|necessary|indicated)\b',
+]
+
+# Assessment/documentation language - only a negation if paired with a negative word
+_ASSESSMENT_CONTEXT = [
+    r'\brisk\s+(assessment|screen|factor)',
+    r'\b(asked|enquired|assessed)\s+about\b',
+    r'\bqueried\s+(re|regarding|about)\b',
+]
+
+
+def _any_of(patterns: List[str]):
+    """One compiled regex that matches wherever any of `patterns` would."""
+    return re.compile("|".join(f"(?:{p})" for p in patterns))
+
+
+_NEGATIVE_BEFORE_RE = _any_of(_NEGATIVE_BEFORE)
+_NEGATIVE_AFTER_RE = _any_of(_NEGATIVE_AFTER)
+_ASSESSMENT_RE = _any_of(_ASSESSMENT_CONTEXT)
+_NEGATIVE_WORD_RE = re.compile(r'\b(no|nil|denied|denies|negative)\b')
+
+
 def _has_negative_context(text: str, match_start: int, match_end: int) -> bool:
     """Check if a match has negative context (nil, no, denied, etc.)."""
     # Get context around the match (50 chars before and after)
@@ -2791,74 +2848,36 @@ def _has_negative_context(text: str, match_start: int, match_end: int) -> bool:
     context_end = min(len(text), match_end + 50)
 
     before_text = text[context_start:match_start].lower()
-    after_text = text[match_end:context_end].lower()
-    full_context = text[context_start:context_end].lower()
-
-    # Check for negative patterns before the match
-    negative_before = [
-        r'\b(no|nil|none|denies?|denied|without|lacks?)\s*$',
-        r'\b(no|nil|none|denies?|denied|without|lacks?)\s+(any|all|the|a)?\s*$',
-        r'\b(no\s+evidence|no\s+history|no\s+signs?|no\s+indication)\s+of\s*$',
-        r'\b(has\s+not|did\s+not|does\s+not|hasn\'t|didn\'t|doesn\'t)\s*$',
-        r'\b(not\s+noted|not\s+reported|not\s+observed)\s*$',
-        r'\bdenied\s+(any|all)?\s*(thoughts?\s+of|ideation\s+of|intent\s+to|intention\s+to)?\s*$',
-        # Additional patterns for common clinical negations
-        r'\b(not|never)\s+express(ing|ed)?\s*(any)?\s*$',
-        r'\bno\s+(current|recent|active|new)?\s*(thoughts?|episodes?|ideation|urges?|intent)\s+(of|to)\s*$',
-        r'\b(doesn\'t|does\s+not|don\'t|do\s+not)\s+have\s+(\w+\s+)*$',  # "doesn't have current active"
-        r'\b(there\s+)?(were|was|are|is)\s+no\s+(episode|evidence|history|indication)s?\s+(of)?\s*$',
-        r'\bno\s+\w+\s+of\s*$',  # "no episode of", "no thoughts of", etc.
-        r'\bwith\s+no\s*$',  # "with no self-harming"
-        # Handle "or" clauses - negation earlier in phrase carries through
-        r'\bor\s+(urges?\s+to|thoughts?\s+of|intent\s+to)?\s*$',
-        # "was not X", "were not X" patterns
-        r'\b(was|were|is|are)\s+not\s*$',
-    ]
-
-    for pattern in negative_before:
-        if re.search(pattern, before_text):
-            return True
-
-    # Check if negation appears earlier in the broader context (handles "X or Y" constructs)
-    broader_negation = [
-        r'\b(no|not|nil|none|denied|denies|without)\b.{0,40}\bor\b',
-        r'\b(doesn\'t|does\s+not|don\'t)\s+have\b',
-    ]
-    for pattern in broader_negation:
-        if re.search(pattern, before_text):
-            return True
-
-    # Check for negative patterns after the match
-    negative_after = [
-        r'^\s*(nil|none|denied|not\s+noted|not\s+reported)\b',
-        r'^\s*-\s*(nil|no|none|denied)\b',
-        r'^\s*(were|was|are|is)?\s*(not\s+present|not\s+identified|not\s+expressed|absent)\b',
-        r'^\s*(were|was|are|is)?\s*not\s+(noted|reported|observed|evident|identified)\b',
-        # Allow for intervening words like "thoughts", "ideation" before negative phrase
-        r'^\s*\w*\s*(were|was|are|is)?\s*(not\s+present|absent)\b',
-        r'^\s*(thoughts?|ideation)?\s*(were|was|are|is)?\s*(not\s+present|absent|not\s+expressed|denied)\b',
-        # "X was not required/needed" patterns
-        r'^\s*(was|were|is|are)?\s*not\s+(required|needed|necessary|indicated)\b',
-    ]
-
-    for pattern in negative_after:
-        if re.search(pattern, after_text):
-            return True
+    if _NEGATIVE_BEFORE_RE.search(before_text):
+        return True
 
-    # Check full context for assessment/documentation language
-    assessment_patterns = [
-        r'\brisk\s+(assessment|screen|factor)',
-        r'\b(asked|enquired|assessed)\s+about\b',
-        r'\bqueried\s+(re|regarding|about)\b',
-    ]
+    after_text = text[match_end:context_end].lower()
+    if _NEGATIVE_AFTER_RE.search(after_text):
+        return True
 
-    for pattern in assessment_patterns:
-        if re.search(pattern, full_context):
-            # Only exclude if also has negative indicator
-            if re.search(r'\b(no|nil|denied|denies|negative)\b', full_context):
-                return True
+    full_context = text[context_start:context_end].lower()
+    return bool(_ASSESSMENT_RE.search(full_context) and _NEGATIVE_WORD_RE.search(full_context))
+
+
+# Compiled forms of RISK_PATTERNS / TENTPOLE_PATTERNS. Each category also
+# gets one alternation of all its patterns: most notes match nothing, and
+# a single failed search rules the whole category out.
+_RISK_RULES = [
+    (
+        name,
+        config["weight"],
+        "high" if config["weight"] >= 8 else "medium" if config["weight"] >= 3 else "low",
+        _any_of(config["patterns"]),
+        [re.compile(p) for p in config["patterns"]],
+    )
+    for name, config in RISK_PATTERNS.items()
+]
+_RISK_PRESCREEN = _any_of([p for config in RISK_PATTERNS.values() for p in config["patterns"]])
 
-    return False
+_TENTPOLE_RULES = [
+    (name, config["color"], _any_of(config["patterns"]))
+    for name, config in TENTPOLE_PATTERNS.items()
+]
 
 
 def _normalise_date(d):
@@ -2886,22 +2905,102 @@ def _get_month_name(month_key):
         return month_key
 
 
+def score_notes_for_progress(notes: List[Dict]) -> Dict[str, Any]:
+    """
+    Score every dated note against RISK_PATTERNS and TENTPOLE_PATTERNS.
+
+    Returns flat, note-ordered columns rather than per-month data:
+      rows:      note_index / month / score, one entry per dated note
+      incidents: incident dicts, with their months in incident_months
+      tentpole_events: event dicts in note order
+    Notes are referred to by their index in `notes`; only the incident
+    popup keeps a short text excerpt.
+    """
+    note_index, months, scores = [], [], []
+    incidents, incident_months = [], []
+    tentpole_events = []
+
+    for i, note in enumerate(notes):
+        text = note.get("text", "") or note.get("content", "") or note.get("body", "")
+        date = _normalise_date(note.get("date") or note.get("datetime"))
+
+        if not text or not date:
+            continue
+
+        month_key = date.strftime("%Y-%m")
+        text_lower = text.lower()
+
+        # Risk score: first non-negated pattern per category counts once
+        score = 0
+        if _RISK_PRESCREEN.search(text_lower):
+            for risk_name, weight, severity, any_pattern, patterns in _RISK_RULES:
+                if not any_pattern.search(text_lower):
+                    continue
+                for pattern in patterns:
+                    match = pattern.search(text_lower)
+                    if not match:
+                        continue
+                    if _has_negative_context(text_lower, match.start(), match.end()):
+                        continue  # Skip this match - it's negated
+
+                    score += weight
+                    incidents.append({
+                        "date": date,
+                        "category": risk_name,
+                        "matched": match.group(0),
+                        "text": text[:200],
+                        "severity": severity,
+                    })
+                    incident_months.append(month_key)
+                    break
+
+        note_index.append(i)
+        months.append(month_key)
+        scores.append(score)
+
+        for event_name, color, any_pattern in _TENTPOLE_RULES:
+            if any_pattern.search(text_lower):
+                tentpole_events.append({
+                    "date": date,
+                    "month": month_key,
+                    "type": event_name,
+                    "color": color,
+                    "text": text,
+                })
+
+    return {
+        "note_index": note_index,
+        "months": months,
+        "scores": scores,
+        "incidents": incidents,
+        "incident_months": incident_months,
+        "tentpole_events": tentpole_events,
+    }
+
+
+def _new_month_entry():
+    return {
+        "note_indices": [],  # positions in results["notes"]
+        "scores": [],
+        "risk_factors": defaultdict(int),
+        "tentpole_events": [],
+        "violence_count": 0,
+        "verbal_count": 0,
+        "total_incidents": 0,
+        "incidents": [],  # Store individual incidents for popup
+    }
+
+
 def analyze_notes_for_progress(notes: List[Dict]) -> Dict[str, Any]:
     """Analyze notes for progress events and build timeline data."""
+    import pandas as pd
+
     results = {
         "total_notes": len(notes),
-        "monthly_data": defaultdict(lambda: {
-            "notes": [],
-            "scores": [],
-            "risk_factors": defaultdict(int),
-            "tentpole_events": [],
-            "violence_count": 0,
-            "verbal_count": 0,
-            "total_incidents": 0,
-            "incidents": [],  # Store individual incidents for popup
-        }),
+        "notes": notes,
+        "monthly_data": defaultdict(_new_month_entry),
         "tentpole_events": [],
-        "all_months": set(),
+        "all_months": [],
         "monthly_violence": defaultdict(int),
         "monthly_verbal": defaultdict(int),
         "monthly_incidents": defaultdict(int),
@@ -2928,69 +3027,52 @@ def analyze_notes_for_progress(notes: List[Dict]) -> Dict[str, Any]:
                 "label": ep.get("label", "Discharge"),
             })
 
-    for note in notes:
-        text = note.get("text", "") or note.get("content", "") or note.get("body", "")
-        date = _normalise_date(note.get("date") or note.get("datetime"))
-
-        if not text or not date:
-            continue
-
-        month_key = date.strftime("%Y-%m")
-        results["all_months"].add(month_key)
-        text_lower = text.lower()
-
-        # Calculate risk score for this note
-        score = 0
-        for risk_name, risk_config in RISK_PATTERNS.items():
-            for pattern in risk_config["patterns"]:
-                match = re.search(pattern, text_lower)
-                if match:
-                    # Check for negative context (nil, no, denied, etc.)
-                    if _has_negative_context(text_lower, match.start(), match.end()):
-                        continue  # Skip this match - it's negated
-
-                    score += risk_config["weight"]
-                    results["monthly_data"][month_key]["risk_factors"][risk_name] += 1
-                    results["monthly_data"][month_key]["total_incidents"] += 1
-                    results["monthly_incidents"][month_key] += 1
-
-                    # Store incident details for popup
-                    results["monthly_data"][month_key]["incidents"].append({
-                        "date": date,
-                        "category": risk_name,
-                        "matched": match.group(0),
-                        "text": text[:200],
-                        "severity": "high" if risk_config["weight"] >= 8 else "medium" if risk_config["weight"] >= 3 else "low",
-                    })
-
-                    # Track violence and verbal separately
-                    if risk_name == "Physical Violence":
-                        results["monthly_data"][month_key]["violence_count"] += 1
-                        results["monthly_violence"][month_key] += 1
-                    elif risk_name == "Verbal Aggression":
-                        results["monthly_data"][month_key]["verbal_count"] += 1
-                        results["monthly_verbal"][month_key] += 1
-                    break
-
-        results["monthly_data"][month_key]["scores"].append(score)
-        results["monthly_data"][month_key]["notes"].append({"date": date, "text": text})
+    scored = score_notes_for_progress(notes)
+    monthly_data = results["monthly_data"]
 
-        # Check for tentpole events
-        for event_name, event_config in TENTPOLE_PATTERNS.items():
-            for pattern in event_config["patterns"]:
-                if re.search(pattern, text_lower):
-                    event = {
-                        "date": date,
-                        "month": month_key,
-                        "type": event_name,
-                        "color": event_config["color"],
-                        "text": text,
-                    }
-                    results["tentpole_events"].append(event)
-                    results["monthly_data"][month_key]["tentpole_events"].append(event)
-                    break
+    # Per-month scores and note references
+    rows = pd.DataFrame({
+        "month": scored["months"],
+        "note": pd.Series(scored["note_index"], dtype="int64"),
+        "score": pd.Series(scored["scores"], dtype="int64"),
+    })
+    for month, group in rows.groupby("month", sort=True):
+        data = monthly_data[month]
+        data["note_indices"] = group["note"].tolist()
+        data["scores"] = group["score"].tolist()
+    results["all_months"] = list(monthly_data)
+
+    # Per-month incident counts by category
+    if scored["incidents"]:
+        counts = (
+            pd.DataFrame({
+                "month": scored["incident_months"],
+                "category": [inc["category"] for inc in scored["incidents"]],
+            })
+            .groupby(["month", "category"], sort=False)
+            .size()
+        )
+        for (month, category), n in counts.items():
+            n = int(n)
+            data = monthly_data[month]
+            data["risk_factors"][category] += n
+            data["total_incidents"] += n
+            results["monthly_incidents"][month] += n
+            # Track violence and verbal separately
+            if category == "Physical Violence":
+                data["violence_count"] += n
+                results["monthly_violence"][month] += n
+            elif category == "Verbal Aggression":
+                data["verbal_count"] += n
+                results["monthly_verbal"][month] += n
+
+    for incident, month in zip(scored["incidents"], scored["incident_months"]):
+        monthly_data[month]["incidents"].append(incident)
+
+    for event in scored["tentpole_events"]:
+        results["tentpole_events"].append(event)
+        monthly_data[event["month"]]["tentpole_events"].append(event)
 
-    results["all_months"] = sorted(results["all_months"])
     return results
 
 
@@ -4739,9 +4821,8 @@ def create_progress_timeline_chart(results: Dict) -> tuple:
     Modeled after create_risk_timeline_visual from risk_overview_panel.
     """
     try:
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
+        from charting import pyplot
+        plt = pyplot()
         import matplotlib.patches as mpatches
         import matplotlib.lines as mlines
         from io import BytesIO
@@ -4803,7 +4884,7 @@ def create_progress_timeline_chart(results: Dict) -> tuple:
         fig_width = max(12, num_months * 0.4)
         fig_height = 2.8 if has_markers else 2.2
 
-        dpi = 100
+        dpi = CHART_DPI
         fig, ax = plt.subplots(figsize=(fig_width, fig_height))
         fig.patch.set_facecolor('#1a1a2e')
         ax.set_facecolor('#1a1a2e')
@@ -5064,6 +5145,124 @@ def create_progress_timeline_chart(results: Dict) -> tuple:
         return None, {}
 
 
+def progress_chart_results(results: Dict, years=None):
+    """
+    The part of `results` the timeline chart shows for the last `years`
+    (None = everything), or None when that covers fewer than 2 months.
+    """
+    all_months = results["all_months"]
+    if years is None:
+        filtered_months = all_months
+    else:
+        cutoff = datetime.now() - timedelta(days=years * 365)
+        cutoff_key = cutoff.strftime("%Y-%m")
+        filtered_months = [m for m in all_months if m >= cutoff_key]
+
+    if len(filtered_months) < 2:
+        return None
+
+    # Create filtered results with ALL required keys
+    return {
+        "all_months": filtered_months,
+        "monthly_data": {m: results["monthly_data"][m] for m in filtered_months},
+        "tentpole_events": [e for e in results["tentpole_events"] if e["month"] in filtered_months],
+        "monthly_violence": {m: c for m, c in results.get("monthly_violence", {}).items() if m in filtered_months},
+        "monthly_verbal": {m: c for m, c in results.get("monthly_verbal", {}).items() if m in filtered_months},
+        "monthly_incidents": {m: c for m, c in results.get("monthly_incidents", {}).items() if m in filtered_months},
+    }
+
+
+# Timeline zoom buttons: years shown (None = all)
+TIMELINE_ZOOM_YEARS = (0.25, 0.5, 1, 2, 5, None)
+
+
+def render_progress_chart(results: Dict, years=None, version=None, theme: str = "",
+                          cached_only: bool = False) -> Optional[tuple]:
+    """
+    (chart bytes, timeline info, chart results) for the last `years`;
+    widget-free. Images are cached per (version, years, theme, DPI).
+    With cached_only=True the result is None instead of rendering an
+    image the cache does not have (safe on the GUI thread).
+    """
+    filtered_results = progress_chart_results(results, years)
+    if filtered_results is None:
+        return None, {}, None
+    key = ("progress_timeline", version, years, theme, CHART_DPI)
+    if cached_only:
+        cached = peek_chart(key)
+        if cached is None:
+            return None
+        chart_bytes, timeline_info = cached
+    else:
+        chart_bytes, timeline_info = cached_chart(key, create_progress_timeline_chart, filtered_results)
+    return chart_bytes, timeline_info, filtered_results
+
+
+def prerender_progress_zoom_levels(results: Dict, version, theme: str = ""):
+    """Fill the chart cache with the timeline at every zoom level."""
+    for years in TIMELINE_ZOOM_YEARS:
+        render_progress_chart(results, years, version, theme)
+
+
+def narrative_entries(notes: List[Dict]) -> list:
+    """Notes in narrative_generator entry format."""
+    entries = []
+    for note in notes:
+        date = note.get('date') or note.get('datetime')
+        content = note.get('content', note.get('text', ''))
+        if date and content:
+            entries.append({
+                'date': date,
+                'content': content,
+                'text': content,
+                'type': note.get('type', ''),
+                'originator': note.get('originator', ''),
+            })
+    return entries
+
+
+def build_progress_narrative(results: Dict, entries: list, period: str,
+                             patient_name: str, gender: str = None) -> tuple:
+    """
+    (narrative HTML, summary label text or None) for ProgressPanel.
+    Widget-free, so the panel builds it off the GUI thread.
+    """
+    summary = None
+
+    # Generate narrative using narrative_generator module with filtering
+    try:
+        from narrative_generator import generate_narrative as gen_narrative, filter_entries_by_period, get_date_range_info
+
+        if entries:
+            # Generate narrative with period filter
+            plain_text, html_narrative = gen_narrative(entries, period=period)
+
+            # Get date range info for display
+            date_range = get_date_range_info(entries, period=period)
+            # Summary label with date range
+            total = results["total_notes"]
+            events = len(results["tentpole_events"])
+            filtered_count = len(filter_entries_by_period(entries, period))
+            summary = f"• {filtered_count}/{total} notes • {events} events • {date_range}"
+        else:
+            # Fallback to original if no entries
+            narrative_text = generate_narrative(results, patient_name=patient_name, gender=gender)
+            html_narrative = narrative_text.replace("\n", "<br>")
+
+    except Exception as e:
+        print(f"[ProgressPanel] Failed to use narrative_generator, falling back: {e}")
+        import traceback
+        traceback.print_exc()
+        # Fallback to original narrative generator
+        narrative_text = generate_narrative(results, patient_name=patient_name, gender=gender)
+        html_narrative = narrative_text.replace("\n", "<br>")
+        html_narrative = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', html_narrative)
+
+    # Add disclaimer at the top
+    disclaimer = "<i>The following account is a guide - please check the narrative presented against the notes.</i><br><br>"
+    return disclaimer + html_narrative, summary
+
+
 # ============================================================
 # INTERACTIVE TIMELINE - With Tooltips (Risk Level Style)
 # ============================================================
@@ -5360,6 +5559,14 @@ class ProgressPanel(QWidget):
         self.notes = notes
         self.notes_panel = notes_panel
         self.embedded = embedded
+        self.results = None
+        self._narrative_entries = None  # narrative_generator entries, per analysis
+        self._narrative_period = None   # filter the shown narrative was built for
+        self._data_version = None       # chart cache key of the current results
+        self._runner = None             # AnalysisRunner: counts → chart → narrative
+        self._narrative_runner = None   # AnalysisRunner: narrative for a new filter
+        self._zoom_runner = None        # AnalysisRunner: zoom levels missing from the chart cache
+        self._timeline_years = None     # zoom currently selected (None = all)
 
         self._drag_offset = QPoint()
         self._dragging = False
@@ -5754,20 +5961,71 @@ class ProgressPanel(QWidget):
         self._regenerate_narrative()
 
     def _analyze_and_display(self):
-        self.results = analyze_notes_for_progress(self.notes)
-
-        total = self.results["total_notes"]
-        events = len(self.results["tentpole_events"])
-        self.summary_label.setText(f"• {total} notes analyzed • {events} key events")
-
-        # Generate timeline (all data initially)
-        self._update_timeline_zoom(None)
-
-        # Generate narrative with current filter
-        self._regenerate_narrative()
-
-    def _regenerate_narrative(self):
-        """Regenerate narrative based on current filter selection."""
+        """Start (or restart) the analysis: counts, then the chart, then the narrative."""
+        from analysis_runner import AnalysisRunner
+
+        if self._runner is None:
+            self._runner = AnalysisRunner(self)
+            self._runner.stage_ready.connect(self._on_analysis_stage)
+            self._runner.stage_failed.connect(self._on_analysis_failed)
+            self._narrative_runner = AnalysisRunner(self)
+            self._narrative_runner.stage_ready.connect(self._on_analysis_stage)
+            self._narrative_runner.stage_failed.connect(self._on_analysis_failed)
+            self._zoom_runner = AnalysisRunner(self)
+            self._zoom_runner.stage_ready.connect(self._on_analysis_stage)
+            self._zoom_runner.stage_failed.connect(self._on_analysis_failed)
+        self._narrative_runner.cancel()
+        self._zoom_runner.cancel()
+
+        self.results = None
+        self._narrative_entries = None
+        self._narrative_period = None
+        self.summary_label.setText(f"• Analysing {len(self.notes)} notes…")
+        self.timeline_chart.setText("Building timeline…")
+        self.narrative_text.setHtml("")
+
+        notes, theme = self.notes, self._chart_theme()
+        version = self._data_version = new_data_version()
+        period, patient_name, gender = self._narrative_options()
+        self._runner.start([
+            ("counts", lambda done: analyze_notes_for_progress(notes)),
+            ("chart", lambda done: render_progress_chart(done["counts"], None, version, theme)),
+            ("entries", lambda done: narrative_entries(notes)),
+            ("narrative", lambda done: (period,) + build_progress_narrative(
+                done["counts"], done["entries"], period, patient_name, gender)),
+            ("zoom_levels", lambda done: prerender_progress_zoom_levels(done["counts"], version, theme)),
+        ])
+
+    def _on_analysis_stage(self, stage: str, payload):
+        if stage == "counts":
+            self.results = payload
+            total = self.results["total_notes"]
+            events = len(self.results["tentpole_events"])
+            self.summary_label.setText(f"• {total} notes analyzed • {events} key events")
+        elif stage == "chart":
+            self._update_timeline_zoom(None, rendered=payload)
+        elif stage == "zoom":
+            version, years, rendered = payload
+            # Only the zoom still selected is shown
+            if version == self._data_version and years == self._timeline_years:
+                self._update_timeline_zoom(years, rendered=rendered)
+        elif stage == "entries":
+            self._narrative_entries = payload
+        elif stage == "narrative":
+            self._narrative_period, html_narrative, summary = payload
+            self._show_narrative(html_narrative, summary)
+            # The filter may have changed while this narrative was being built
+            if self._narrative_period != (self.narrative_filter.currentData() or '1_year'):
+                self._regenerate_narrative()
+
+    def _on_analysis_failed(self, stage: str, error: str):
+        self.summary_label.setText(f"• Analysis failed ({stage}): {error}")
+
+    def _chart_theme(self) -> str:
+        return "embedded" if self.embedded else "floating"
+
+    def _narrative_options(self) -> tuple:
+        """(period, patient name, gender) for the narrative, read on the GUI thread."""
         # Get current filter period from dropdown
         period = self.narrative_filter.currentData() or '1_year'
 
@@ -5784,53 +6042,23 @@ class ProgressPanel(QWidget):
             gender = "F"
         else:
             gender = None
+        return period, patient_name, gender
 
-        # Generate narrative using narrative_generator module with filtering
-        try:
-            from narrative_generator import generate_narrative as gen_narrative, filter_entries_by_period, get_date_range_info
-
-            # Convert notes to entry format
-            entries = []
-            for note in self.notes:
-                date = note.get('date') or note.get('datetime')
-                content = note.get('content', note.get('text', ''))
-                if date and content:
-                    entries.append({
-                        'date': date,
-                        'content': content,
-                        'text': content,
-                        'type': note.get('type', ''),
-                        'originator': note.get('originator', ''),
-                    })
-
-            if entries:
-                # Generate narrative with period filter
-                plain_text, html_narrative = gen_narrative(entries, period=period)
-
-                # Get date range info for display
-                date_range = get_date_range_info(entries, period=period)
-                # Update summary label with date range
-                total = self.results["total_notes"]
-                events = len(self.results["tentpole_events"])
-                filtered_count = len(filter_entries_by_period(entries, period))
-                self.summary_label.setText(f"• {filtered_count}/{total} notes • {events} events • {date_range}")
-            else:
-                # Fallback to original if no entries
-                narrative_text = generate_narrative(self.results, patient_name=patient_name, gender=gender)
-                html_narrative = narrative_text.replace("\n", "<br>")
+    def _regenerate_narrative(self):
+        """Regenerate narrative based on current filter selection, reusing the analysis."""
+        if self.results is None or self._narrative_period is None:
+            return  # the running analysis ends with a narrative (see _on_analysis_stage)
 
-        except Exception as e:
-            print(f"[ProgressPanel] Failed to use narrative_generator, falling back: {e}")
-            import traceback
-            traceback.print_exc()
-            # Fallback to original narrative generator
-            narrative_text = generate_narrative(self.results, patient_name=patient_name, gender=gender)
-            html_narrative = narrative_text.replace("\n", "<br>")
-            html_narrative = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', html_narrative)
+        period, patient_name, gender = self._narrative_options()
+        results, entries = self.results, self._narrative_entries
+        self._narrative_runner.start([
+            ("narrative", lambda done: (period,) + build_progress_narrative(
+                results, entries, period, patient_name, gender)),
+        ])
 
-        # Add disclaimer at the top
-        disclaimer = "<i>The following account is a guide - please check the narrative presented against the notes.</i><br><br>"
-        html_narrative = disclaimer + html_narrative
+    def _show_narrative(self, html_narrative: str, summary: str = None):
+        if summary:
+            self.summary_label.setText(summary)
 
         # Use dark text for embedded mode, light for floating
         text_color = "#333" if self.embedded else "#DCE6FF"
@@ -5880,41 +6108,37 @@ class ProgressPanel(QWidget):
         # Reuse existing _scroll_to_note logic
         self._scroll_to_note(ref_data)
 
-    def _update_timeline_zoom(self, years):
-        """Update timeline to show specified time range."""
+    def _update_timeline_zoom(self, years, rendered=None):
+        """Update timeline to show specified time range.
+
+        `rendered` is a render_progress_chart result already made for
+        `years` (the analysis renders the initial chart off-thread).
+        """
         # Update button checked states
-        year_map = {0.25: 0, 0.5: 1, 1: 2, 2: 3, 5: 4, None: 5}
-        btn_index = year_map.get(years, 5)
+        btn_index = TIMELINE_ZOOM_YEARS.index(years) if years in TIMELINE_ZOOM_YEARS else 5
         for i, btn in enumerate(self.zoom_buttons):
             btn.setChecked(i == btn_index)
+        self._timeline_years = years
 
-        all_months = self.results["all_months"]
-        if not all_months:
-            return
+        if self.results is None:
+            return  # still analysing
 
-        # Filter data based on years
-        if years is None:
-            filtered_months = all_months
-        else:
-            cutoff = datetime.now() - timedelta(days=years * 365)
-            cutoff_key = cutoff.strftime("%Y-%m")
-            filtered_months = [m for m in all_months if m >= cutoff_key]
-
-        if not filtered_months or len(filtered_months) < 2:
-            self.timeline_chart.setText(f"Insufficient data for timeline")
+        if not self.results["all_months"]:
+            self.timeline_chart.setText("Insufficient data for timeline")
             return
 
-        # Create filtered results with ALL required keys
-        filtered_results = {
-            "all_months": filtered_months,
-            "monthly_data": {m: self.results["monthly_data"][m] for m in filtered_months},
-            "tentpole_events": [e for e in self.results["tentpole_events"] if e["month"] in filtered_months],
-            "monthly_violence": {m: c for m, c in self.results.get("monthly_violence", {}).items() if m in filtered_months},
-            "monthly_verbal": {m: c for m, c in self.results.get("monthly_verbal", {}).items() if m in filtered_months},
-            "monthly_incidents": {m: c for m, c in self.results.get("monthly_incidents", {}).items() if m in filtered_months},
-        }
-
-        chart_bytes, timeline_info = create_progress_timeline_chart(filtered_results)
+        if rendered is None:
+            results, version, theme = self.results, self._data_version, self._chart_theme()
+            rendered = render_progress_chart(results, years, version, theme, cached_only=True)
+            if rendered is None:
+                # Not rendered yet (the zoom_levels stage is still running):
+                # render it off the GUI thread and show it when it arrives
+                self.timeline_chart.setText("Rendering timeline…")
+                self._zoom_runner.start([
+                    ("zoom", lambda done: (version, years, render_progress_chart(results, years, version, theme))),
+                ])
+                return
+        chart_bytes, timeline_info, filtered_results = rendered
         if chart_bytes:
             # Pass monthly_data for incident popup
             self.timeline_chart.set_chart(chart_bytes, timeline_info, filtered_results.get("monthly_data", {}))
@@ -5926,6 +6150,9 @@ class ProgressPanel(QWidget):
         import os
         import re
 
+        if self.results is None:
+            return  # still analysing
+
         default_name = f"Progress_Report_{datetime.now().strftime('%Y%m%d_%H%M')}.docx"
         file_path, _ = QFileDialog.getSaveFileName(
             self, "Export Progress Report", default_name, "Word Document (*.docx)"
@@ -6017,3 +6244,10 @@ class ProgressPanel(QWidget):
 
         except Exception as e:
             QMessageBox.warning(self, "Export Failed", f"Could not export: {e}")
+
+    def closeEvent(self, event):
+        if self._runner is not None:
+            self._runner.cancel()
+            self._narrative_runner.cancel()
+            self._zoom_runner.cancel()
+        super().closeEvent(event)
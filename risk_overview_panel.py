@@ -8,7 +8,7 @@ from __future__ import annotations
 import re
 from datetime import datetime, timedelta
 from collections import defaultdict
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import io
 
 from PySide6.QtWidgets import (
@@ -19,6 +19,8 @@ from PySide6.QtCore import Qt, Signal, QPoint, QRect, QPropertyAnimation, QEasin
 from PySide6.QtGui import QColor, QPixmap, QCursor, QAction
 from PySide6.QtWidgets import QMessageBox
 
+from analysis_runner import CHART_DPI, cached_chart, new_data_version, peek_chart, render_chart
+
 
 def show_styled_message(parent, title: str, message: str, is_warning: bool = False):
     """Show a styled message box that works in dark mode."""
@@ -729,6 +731,101 @@ for cat_name, cat_data in RISK_CATEGORIES.items():
             all_patterns.extend(subcat_data["patterns"])
         cat_data["patterns"] = all_patterns
 
+try:
+    from re import _parser as _sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse
+
+
+def _required_literals(parsed):
+    """
+    Literal strings of which at least one occurs in EVERY match of a
+    parsed regex, or None if no such set can be derived. Used as a
+    cheap `in` prefilter before running the real pattern.
+    """
+    candidates, run = [], []
+
+    def flush():
+        if run:
+            candidates.append({"".join(run)})
+            run.clear()
+
+    for op, av in parsed:
+        name = str(op)
+        if name == "LITERAL":
+            run.append(chr(av))
+            continue
+        flush()
+        lits = None
+        if name == "SUBPATTERN":
+            lits = _required_literals(av[-1])
+        elif name == "ATOMIC_GROUP":
+            lits = _required_literals(av)
+        elif name == "BRANCH":
+            branches = [_required_literals(b) for b in av[1]]
+            if all(branches):
+                lits = set().union(*branches)
+        elif name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT"):
+            lo, _hi, sub = av
+            if lo >= 1:
+                lits = _required_literals(sub)
+        if lits:
+            candidates.append(lits)
+    flush()
+
+    if not candidates:
+        return None
+    # The most selective set: the one whose shortest literal is longest
+    return max(candidates, key=lambda lits: min(map(len, lits)))
+
+
+def _compile_risk_pattern(pattern: str):
+    try:
+        compiled = re.compile(pattern)
+    except re.error as e:
+        print(f"[RISK] Skipping invalid pattern {pattern!r}: {e}")
+        return None
+    lits = _required_literals(_sre_parse.parse(pattern))
+    return compiled, (frozenset(lits) if lits else None)
+
+
+def _union_literals(groups):
+    """Union of literal sets; None if any member can't be prefiltered."""
+    out = set()
+    for lits in groups:
+        if lits is None:
+            return None
+        out |= lits
+    return frozenset(out)
+
+
+# Compiled once at import. Every pattern carries the literals it needs
+# (see _required_literals); subcategories and categories carry the
+# union of their patterns' literals. Per note, analyze_notes_for_risk
+# checks each distinct literal once with `in` and only runs the regexes
+# of patterns whose literals are present — same results, far fewer
+# regex scans (most patterns start with \b and can't use re's own
+# literal-prefix search).
+_COMPILED_RISK_CATEGORIES = []
+for cat_name, cat_data in RISK_CATEGORIES.items():
+    compiled_subcats = []
+    for subcat_name, subcat_data in cat_data.get("subcategories", {}).items():
+        compiled = [c for c in map(_compile_risk_pattern, subcat_data["patterns"]) if c is not None]
+        if compiled:
+            sub_lits = _union_literals(lits for _, lits in compiled)
+            compiled_subcats.append((subcat_name, subcat_data["severity"], sub_lits, compiled))
+    if compiled_subcats:
+        cat_lits = _union_literals(sc[2] for sc in compiled_subcats)
+        _COMPILED_RISK_CATEGORIES.append((cat_name, cat_lits, compiled_subcats))
+
+_RISK_LITERALS = frozenset().union(*(
+    lits
+    for _, _, subcats in _COMPILED_RISK_CATEGORIES
+    for _, _, _, compiled in subcats
+    for _, lits in compiled
+    if lits is not None
+))
+
 # False positive exclusion patterns (checked BEFORE match)
 FALSE_POSITIVE_PATTERNS = [
     r'(was|were|has|had|have)\s+not\s+(been\s+)?(physically\s+)?',
@@ -755,6 +852,63 @@ FALSE_POSITIVE_PATTERNS = [
 ]
 
 
+# Negation context around a match. Each list is compiled into ONE
+# alternation below — "does any of these match" is exactly "does the
+# alternation match", so results are unchanged.
+_NEGATIVE_BEFORE = [
+    r'\b(no|nil|none|denies?|denied|without|lacks?)\s*$',
+    r'\b(no|nil|none|denies?|denied|without|lacks?)\s+(any|all|the|a)?\s*$',
+    r'\b(no\s+evidence|no\s+history|no\s+signs?|no\s+indication)\s+of\s*$',
+    r'\b(has\s+not|did\s+not|does\s+not|hasn\'t|didn\'t|doesn\'t)\s*$',
+    r'\b(not\s+noted|not\s+reported|not\s+observed)\s*$',
+    r'\bdenied\s+(any|all)?\s*(thoughts?\s+of|ideation\s+of|intent\s+to|intention\s+to)?\s*$',
+    # Additional patterns for common clinical negations
+    r'\b(not|never)\s+express(ing|ed)?\s*(any)?\s*$',
+    r'\bno\s+(current|recent|active|new)?\s*(thoughts?|episodes?|ideation|urges?|intent)\s+(of|to)\s*$',
+    r'\b(doesn\'t|does\s+not|don\'t|do\s+not)\s+have\s+(\w+\s+)*$',
+    r'\b(there\s+)?(were|was|are|is)\s+no\s+(episode|evidence|history|indication)s?\s+(of)?\s*$',
+    r'\bno\s+\w+\s+of\s*$',  # "no episode of", "no thoughts of", etc.
+    r'\bwith\s+no\s*$',  # "with no self-harming"
+    # Handle "or" clauses - negation earlier in phrase carries through
+    r'\bor\s+(urges?\s+to|thoughts?\s+of|intent\s+to)?\s*$',
+    # "was not X", "were not X" patterns
+    r'\b(was|were|is|are)\s+not\s*$',
+    # Negation earlier in the broader context (handles "X or Y" constructs)
+    r'\b(no|not|nil|none|denied|denies|without)\b.{0,40}\bor\b',
+    r'\b(doesn\'t|does\s+not|don\'t)\s+have\b',
+]
+
+_NEGATIVE_AFTER = [
+    r'^\s*(nil|none|denied|not\s+noted|not\s+reported)\b',
+    r'^\s*-\s*(nil|no|none|denied)\b',
+    r'^\s*(were|was|are|is)?\s*(not\s+present|not\s+identified|not\s+expressed|absent)\b',
+    r'^\s*(were|was|are|is)?\s*not\s+(noted|reported|observed|evident|identified)\b',
+    r'^\s*\w*\s*(were|was|are|is)?\s*(not\s+present|absent)\b',
+    r'^\s*(thoughts?|ideation)?\s*(were|was|are|is)?\s*(not\s+present|absent|not\s+expressed|denied)\b',
+    # "X was not required/needed" patterns
+    r'^\s*(was|were|is|are)?\s*not\s+(required|needed|necessary|indicated)\b',
+]
+
+# Assessment/documentation language — only excludes with a negative indicator
+_ASSESSMENT_PATTERNS = [
+    r'\brisk\s+(assessment|screen|factor)',
+    r'\b(asked|enquired|assessed)\s+about\b',
+    r'\bqueried\s+(re|regarding|about)\b',
+]
+
+
+def _compile_alternation(patterns: List[str], flags: int = 0):
+    """One regex that matches wherever ANY of `patterns` would."""
+    return re.compile("|".join(f"(?:{p})" for p in patterns), flags)
+
+
+_NEGATIVE_BEFORE_RE = _compile_alternation(_NEGATIVE_BEFORE)
+_NEGATIVE_AFTER_RE = _compile_alternation(_NEGATIVE_AFTER)
+_ASSESSMENT_RE = _compile_alternation(_ASSESSMENT_PATTERNS)
+_ASSESSMENT_NEGATION_RE = re.compile(r'\b(no|nil|denied|denies|negative)\b')
+_FALSE_POSITIVE_RE = _compile_alternation(FALSE_POSITIVE_PATTERNS, re.IGNORECASE)
+
+
 def _has_negative_context(text: str, match_start: int, match_end: int) -> bool:
     """Check if a match has negative context (nil, no, denied, etc.)."""
     # Get context around the match (50 chars before and after)
@@ -762,71 +916,19 @@ def _has_negative_context(text: str, match_start: int, match_end: int) -> bool:
     context_end = min(len(text), match_end + 50)
 
     before_text = text[context_start:match_start].lower()
-    after_text = text[match_end:context_end].lower()
-
-    # Check for negative patterns before the match
-    negative_before = [
-        r'\b(no|nil|none|denies?|denied|without|lacks?)\s*$',
-        r'\b(no|nil|none|denies?|denied|without|lacks?)\s+(any|all|the|a)?\s*$',
-        r'\b(no\s+evidence|no\s+history|no\s+signs?|no\s+indication)\s+of\s*$',
-        r'\b(has\s+not|did\s+not|does\s+not|hasn\'t|didn\'t|doesn\'t)\s*$',
-        r'\b(not\s+noted|not\s+reported|not\s+observed)\s*$',
-        r'\bdenied\s+(any|all)?\s*(thoughts?\s+of|ideation\s+of|intent\s+to|intention\s+to)?\s*$',
-        # Additional patterns for common clinical negations
-        r'\b(not|never)\s+express(ing|ed)?\s*(any)?\s*$',
-        r'\bno\s+(current|recent|active|new)?\s*(thoughts?|episodes?|ideation|urges?|intent)\s+(of|to)\s*$',
-        r'\b(doesn\'t|does\s+not|don\'t|do\s+not)\s+have\s+(\w+\s+)*$',
-        r'\b(there\s+)?(were|was|are|is)\s+no\s+(episode|evidence|history|indication)s?\s+(of)?\s*$',
-        r'\bno\s+\w+\s+of\s*$',  # "no episode of", "no thoughts of", etc.
-        r'\bwith\s+no\s*$',  # "with no self-harming"
-        # Handle "or" clauses - negation earlier in phrase carries through
-        r'\bor\s+(urges?\s+to|thoughts?\s+of|intent\s+to)?\s*$',
-        # "was not X", "were not X" patterns
-        r'\b(was|were|is|are)\s+not\s*$',
-    ]
-
-    for pattern in negative_before:
-        if re.search(pattern, before_text):
-            return True
-
-    # Check if negation appears earlier in the broader context (handles "X or Y" constructs)
-    broader_negation = [
-        r'\b(no|not|nil|none|denied|denies|without)\b.{0,40}\bor\b',
-        r'\b(doesn\'t|does\s+not|don\'t)\s+have\b',
-    ]
-    for pattern in broader_negation:
-        if re.search(pattern, before_text):
-            return True
+    if _NEGATIVE_BEFORE_RE.search(before_text):
+        return True
 
-    # Check for negative patterns after the match
-    negative_after = [
-        r'^\s*(nil|none|denied|not\s+noted|not\s+reported)\b',
-        r'^\s*-\s*(nil|no|none|denied)\b',
-        r'^\s*(were|was|are|is)?\s*(not\s+present|not\s+identified|not\s+expressed|absent)\b',
-        r'^\s*(were|was|are|is)?\s*not\s+(noted|reported|observed|evident|identified)\b',
-        r'^\s*\w*\s*(were|was|are|is)?\s*(not\s+present|absent)\b',
-        r'^\s*(thoughts?|ideation)?\s*(were|was|are|is)?\s*(not\s+present|absent|not\s+expressed|denied)\b',
-        # "X was not required/needed" patterns
-        r'^\s*(was|were|is|are)?\s*not\s+(required|needed|necessary|indicated)\b',
-    ]
-
-    for pattern in negative_after:
-        if re.search(pattern, after_text):
-            return True
+    after_text = text[match_end:context_end].lower()
+    if _NEGATIVE_AFTER_RE.search(after_text):
+        return True
 
     # Check full context for assessment/documentation language
     full_context = text[context_start:context_end].lower()
-    assessment_patterns = [
-        r'\brisk\s+(assessment|screen|factor)',
-        r'\b(asked|enquired|assessed)\s+about\b',
-        r'\bqueried\s+(re|regarding|about)\b',
-    ]
-
-    for pattern in assessment_patterns:
-        if re.search(pattern, full_context):
-            # Only exclude if also has negative indicator
-            if re.search(r'\b(no|nil|denied|denies|negative)\b', full_context):
-                return True
+    if _ASSESSMENT_RE.search(full_context):
+        # Only exclude if also has negative indicator
+        if _ASSESSMENT_NEGATION_RE.search(full_context):
+            return True
 
     return False
 
@@ -852,10 +954,7 @@ def is_false_positive(text: str, match_start: int) -> bool:
     context_start = max(0, match_start - 60)
     context = text[context_start:match_start].lower()
 
-    for fp_pattern in FALSE_POSITIVE_PATTERNS:
-        if re.search(fp_pattern, context, re.IGNORECASE):
-            return True
-    return False
+    return _FALSE_POSITIVE_RE.search(context) is not None
 
 
 def highlight_matches(text: str, patterns: List[str]) -> str:
@@ -929,61 +1028,67 @@ def analyze_notes_for_risk(notes: List[Dict]) -> Dict[str, Any]:
         note_had_incident = False
         matched_in_note = set()  # Track what we've matched to avoid duplicates
 
-        for cat_name, cat_config in RISK_CATEGORIES.items():
-            # Check subcategories first for more specific matching
-            if "subcategories" in cat_config:
-                for subcat_name, subcat_config in cat_config["subcategories"].items():
-                    for pattern in subcat_config["patterns"]:
-                        try:
-                            match = re.search(pattern, text_lower)
-                            if match:
-                                # Skip if same match already found in this note for this category
-                                match_key = (cat_name, match.group())
-                                if match_key in matched_in_note:
-                                    continue
-
-                                if is_false_positive(text, match.start()):
-                                    continue
-
-                                # Check for negative context (nil, no, denied, etc.)
-                                if _has_negative_context(text_lower, match.start(), match.end()):
-                                    continue
-
-                                matched_in_note.add(match_key)
-                                severity = subcat_config["severity"]
-
-                                # Update main category
-                                results["categories"][cat_name]["count"] += 1
-                                results["categories"][cat_name]["incidents"].append({
-                                    "date": date,
-                                    "full_text": text,
-                                    "matched": match.group(),
-                                    "subcategory": subcat_name,
-                                    "severity": severity,
-                                })
-
-                                # Update subcategory
-                                results["categories"][cat_name]["subcategories"][subcat_name]["count"] += 1
-                                results["categories"][cat_name]["subcategories"][subcat_name]["incidents"].append({
-                                    "date": date,
-                                    "full_text": text,
-                                    "matched": match.group(),
-                                    "severity": severity,
-                                })
-
-                                # Update severity counts
-                                results["severity_counts"][severity] += 1
-
-                                results["timeline"].append((date, cat_name, text, subcat_name, severity))
-
-                                if date:
-                                    month_key = date.strftime("%Y-%m")
-                                    results["monthly_counts"][month_key][cat_name] += 1
-
-                                note_had_incident = True
-                                break  # Move to next subcategory after finding a match
-                        except Exception:
-                            pass
+        # Which prefilter literals does this note contain? (one `in` each)
+        present = {lit for lit in _RISK_LITERALS if lit in text_lower}
+
+        for cat_name, cat_lits, compiled_subcats in _COMPILED_RISK_CATEGORIES:
+            if cat_lits is not None and cat_lits.isdisjoint(present):
+                continue
+            for subcat_name, severity, sub_lits, patterns in compiled_subcats:
+                if sub_lits is not None and sub_lits.isdisjoint(present):
+                    continue
+                for pattern, lits in patterns:
+                    if lits is not None and lits.isdisjoint(present):
+                        continue
+                    try:
+                        match = pattern.search(text_lower)
+                        if match:
+                            # Skip if same match already found in this note for this category
+                            match_key = (cat_name, match.group())
+                            if match_key in matched_in_note:
+                                continue
+
+                            if is_false_positive(text, match.start()):
+                                continue
+
+                            # Check for negative context (nil, no, denied, etc.)
+                            if _has_negative_context(text_lower, match.start(), match.end()):
+                                continue
+
+                            matched_in_note.add(match_key)
+
+                            # Update main category
+                            results["categories"][cat_name]["count"] += 1
+                            results["categories"][cat_name]["incidents"].append({
+                                "date": date,
+                                "full_text": text,
+                                "matched": match.group(),
+                                "subcategory": subcat_name,
+                                "severity": severity,
+                            })
+
+                            # Update subcategory
+                            results["categories"][cat_name]["subcategories"][subcat_name]["count"] += 1
+                            results["categories"][cat_name]["subcategories"][subcat_name]["incidents"].append({
+                                "date": date,
+                                "full_text": text,
+                                "matched": match.group(),
+                                "severity": severity,
+                            })
+
+                            # Update severity counts
+                            results["severity_counts"][severity] += 1
+
+                            results["timeline"].append((date, cat_name, text, subcat_name, severity))
+
+                            if date:
+                                month_key = date.strftime("%Y-%m")
+                                results["monthly_counts"][month_key][cat_name] += 1
+
+                            note_had_incident = True
+                            break  # Move to next subcategory after finding a match
+                    except Exception:
+                        pass
 
         if note_had_incident:
             results["notes_with_incidents"] += 1
@@ -1000,9 +1105,8 @@ def create_risk_timeline_visual(results: Dict) -> tuple:
         tuple: (image_bytes, timeline_info) with bar positions for interactivity
     """
     try:
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
+        from charting import pyplot
+        plt = pyplot()
         import matplotlib.patches as mpatches
         from io import BytesIO
 
@@ -1195,9 +1299,8 @@ def create_timeline_chart(monthly_counts: Dict, categories_data: Dict,
                for interactive tooltips
     """
     try:
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
+        from charting import pyplot
+        plt = pyplot()
         import numpy as np
 
         if not monthly_counts:
@@ -1245,7 +1348,7 @@ def create_timeline_chart(monthly_counts: Dict, categories_data: Dict,
 
         # Create figure
         fig_width, fig_height = 12, 4
-        dpi = 100
+        dpi = CHART_DPI
         fig, ax = plt.subplots(figsize=(fig_width, fig_height))
         fig.patch.set_facecolor('#1a1a2e')
         ax.set_facecolor('#1a1a2e')
@@ -1373,9 +1476,8 @@ def create_timeline_chart(monthly_counts: Dict, categories_data: Dict,
 def create_pie_chart_with_legend(categories_data: Dict) -> bytes:
     """Create a pie chart with legend for Word export."""
     try:
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
+        from charting import pyplot
+        plt = pyplot()
 
         # Filter categories with counts > 0
         data = [(name, info["count"], info["color"], info.get("icon", ""))
@@ -1459,7 +1561,7 @@ def export_risk_to_word(results: Dict, output_path: str) -> str:
         summary.add_run(f"Notes with risk indicators: {with_incidents} ({pct:.1f}%)\n")
 
         # Add category chart with legend
-        chart_bytes = create_pie_chart_with_legend(results["categories"])
+        chart_bytes = render_chart(create_pie_chart_with_legend, results["categories"])
         if chart_bytes:
             chart_stream = io.BytesIO(chart_bytes)
             doc.add_heading('Risk Categories Overview', level=1)
@@ -1589,9 +1691,8 @@ def create_pie_chart(categories_data: Dict, embedded: bool = False) -> tuple:
                {category_name: {"count": N, "color": "#xxx", "start_angle": deg, "end_angle": deg, "center": (x,y), "radius": r}, ...}
     """
     try:
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
+        from charting import pyplot
+        plt = pyplot()
         import numpy as np
 
         # Filter categories with counts > 0
@@ -1666,6 +1767,115 @@ def create_pie_chart(categories_data: Dict, embedded: bool = False) -> tuple:
         return None, {}
 
 
+def max_monthly_count(monthly_counts: Dict) -> int:
+    """Largest single category count in any month (shared y-axis scale)."""
+    return max((c for cats in monthly_counts.values() for c in cats.values()), default=0)
+
+
+# Timeline zoom buttons: years shown (None = all)
+TIMELINE_ZOOM_YEARS = (0.25, 0.5, 1, 2, 5, None)
+
+
+def render_risk_timeline(results: Dict, years=None, category: str = None,
+                         version=None, theme: str = "", cached_only: bool = False) -> Optional[tuple]:
+    """
+    Risk incidents timeline for the last `years` (None = all), optionally
+    for one category: (png bytes, timeline info, message). When there is
+    nothing to draw, bytes are None and message says why.
+
+    Images are cached per (version, years, category, theme, DPI); pass
+    version=None to render without caching. With cached_only=True the
+    result is None instead of rendering an image the cache does not have
+    (safe on the GUI thread).
+    """
+    monthly_counts = results["monthly_counts"]
+    if not monthly_counts:
+        return None, {}, "No timeline data available"
+
+    # Filter data based on years
+    if years is None:
+        # Show all data
+        filtered_counts = dict(monthly_counts)
+    else:
+        # Calculate cutoff date
+        cutoff = datetime.now() - timedelta(days=years * 365)
+        cutoff_key = cutoff.strftime("%Y-%m")
+
+        # Filter to only months after cutoff
+        filtered_counts = {
+            month: counts
+            for month, counts in monthly_counts.items()
+            if month >= cutoff_key
+        }
+
+    # Apply category filter if active
+    if category:
+        cat_filtered = {}
+        for month, counts in filtered_counts.items():
+            if category in counts:
+                cat_filtered[month] = {category: counts[category]}
+        filtered_counts = cat_filtered
+
+    if not filtered_counts:
+        if category and years:
+            return None, {}, f"No {category} data in the last {years} year(s)"
+        elif category:
+            return None, {}, f"No {category} data available"
+        return None, {}, f"No data in the last {years} year(s)"
+
+    # Build categories_data: when filtering, only pass the filtered category
+    categories_data = results["categories"]
+    if category:
+        categories_data = {
+            k: v for k, v in categories_data.items()
+            if k == category
+        }
+
+    # Use the category's own colour when a filter is active
+    color_override = None
+    if category:
+        color_override = results["categories"].get(category, {}).get("color")
+
+    # y_max from the full (unfiltered) monthly data so filtered charts
+    # stay proportional to the overall scale
+    args = (filtered_counts, categories_data)
+    kwargs = dict(y_max=max_monthly_count(monthly_counts), color_override=color_override)
+    if version is None:
+        chart_bytes, timeline_info = render_chart(create_timeline_chart, *args, **kwargs)
+    else:
+        key = ("risk_timeline", version, years, category, theme, CHART_DPI)
+        if cached_only:
+            cached = peek_chart(key)
+            if cached is None:
+                return None
+            chart_bytes, timeline_info = cached
+        else:
+            chart_bytes, timeline_info = cached_chart(key, create_timeline_chart, *args, **kwargs)
+    return chart_bytes, timeline_info, "" if chart_bytes else "Unable to generate timeline chart"
+
+
+def render_risk_charts(results: Dict, embedded: bool = False, version=None) -> Dict[str, tuple]:
+    """
+    Every chart image RiskOverviewPanel shows initially, as
+    {"pie", "risk_level"} -> (png bytes, info) and "timeline" ->
+    render_risk_timeline(...). Widget-free, so the panel renders it off
+    the GUI thread.
+    """
+    theme = "embedded" if embedded else "floating"
+    return {
+        "pie": render_chart(create_pie_chart, results["categories"], embedded=embedded),
+        "timeline": render_risk_timeline(results, None, None, version, theme),
+        "risk_level": render_chart(create_risk_timeline_visual, results),
+    }
+
+
+def prerender_risk_zoom_levels(results: Dict, version, embedded: bool = False, category: str = None):
+    """Fill the chart cache with the timeline (optionally one category's) at every zoom level."""
+    theme = "embedded" if embedded else "floating"
+    for years in TIMELINE_ZOOM_YEARS:
+        render_risk_timeline(results, years, category, version, theme)
+
+
 # ============================================================
 # PIE CHART WITH INTERACTIVE LEGEND
 # ============================================================
@@ -2544,6 +2754,10 @@ class RiskOverviewPanel(QWidget):
         self.notes = notes
         self.notes_panel = notes_panel  # Reference to left notes panel for scroll-to
         self.embedded = embedded
+        self.results = None
+        self._runner = None  # AnalysisRunner, created on first analysis
+        self._zoom_runner = None  # AnalysisRunner: timelines missing from the chart cache
+        self._data_version = None  # chart cache key of the current results
 
         self._drag_offset = QPoint()
         self._dragging = False
@@ -2845,10 +3059,58 @@ class RiskOverviewPanel(QWidget):
     # ANALYZE AND DISPLAY
     # --------------------------------------------------------
     def _analyze_and_display(self):
-        self.results = analyze_notes_for_risk(self.notes)  # Store for export
+        """Start (or restart) the analysis; results arrive stage by stage."""
+        from analysis_runner import AnalysisRunner
+        from analysis_cache import get_analysis_cache, get_risk_analysis
+
+        get_analysis_cache()  # created here, on the GUI thread
+        if self._runner is None:
+            self._runner = AnalysisRunner(self)
+            self._runner.stage_ready.connect(self._on_analysis_stage)
+            self._runner.stage_failed.connect(self._on_analysis_failed)
+            self._zoom_runner = AnalysisRunner(self)
+            self._zoom_runner.stage_ready.connect(self._on_analysis_stage)
+            self._zoom_runner.stage_failed.connect(self._on_analysis_failed)
+        self._zoom_runner.cancel()
+
+        self._clear_results()
+        self.summary_label.setText(f"• Analysing {len(self.notes)} notes…")
+
+        notes, embedded = self.notes, self.embedded
+        version = self._data_version = new_data_version()
+        self._runner.start([
+            ("counts", lambda done: get_risk_analysis(notes)),
+            ("charts", lambda done: render_risk_charts(done["counts"], embedded, version)),
+            ("zoom_levels", lambda done: prerender_risk_zoom_levels(done["counts"], version, embedded)),
+        ])
+
+    def _on_analysis_stage(self, stage: str, payload):
+        if stage == "counts":
+            self.results = payload  # Store for export
+            self._show_summary()
+        elif stage == "charts":
+            self._show_charts(payload)
+            self._show_details()
+        elif stage == "timeline":
+            zoom, rendered = payload
+            # Only the zoom and filter still selected are shown
+            if zoom == self._timeline_zoom_key(self.zoom_levels[self.current_zoom_index][1]):
+                self._show_timeline(rendered)
+
+    def _on_analysis_failed(self, stage: str, error: str):
+        self.summary_label.setText(f"• Analysis failed: {error}")
+
+    def _clear_results(self):
+        """Remove the widgets of a previous analysis."""
+        self.results = None
         self.category_sections = {}  # Store references to sections for scroll-to
         self._current_category_filter = None  # Active category filter for timeline chart
+        while self.inner_layout.count():
+            item = self.inner_layout.takeAt(0)
+            if item.widget() is not None:
+                item.widget().deleteLater()
 
+    def _show_summary(self):
         total = self.results["total_notes"]
         with_incidents = self.results["notes_with_incidents"]
         pct = (with_incidents / total * 100) if total > 0 else 0
@@ -2863,10 +3125,12 @@ class RiskOverviewPanel(QWidget):
 
         self.summary_label.setText(summary_text)
 
+    def _show_charts(self, charts: Dict[str, tuple]):
+        """Chart sections, from the images render_risk_charts made off-thread."""
         # =====================================================
         # CHART 1: Risk Overview (pie chart with interactive legend)
         # =====================================================
-        chart_bytes, category_info = create_pie_chart(self.results["categories"], embedded=self.embedded)
+        chart_bytes, category_info = charts["pie"]
         if chart_bytes:
             risk_overview_section = CollapsibleSection("📊 Risk Overview", start_collapsed=True, embedded=self.embedded)
             self.inner_layout.addWidget(risk_overview_section)
@@ -2984,8 +3248,8 @@ class RiskOverviewPanel(QWidget):
         timeline_scroll.setWidget(self.timeline_chart)
         incidents_section.add_widget(timeline_scroll)
 
-        # Generate initial timeline (all data)
-        self._update_timeline_zoom(None)
+        # Initial timeline (all data)
+        self._show_timeline(charts["timeline"])
 
         # =====================================================
         # CHART 3: Risk Level Timeline Visual
@@ -2993,7 +3257,7 @@ class RiskOverviewPanel(QWidget):
         timeline_visual_section = CollapsibleSection("📊 Risk Level Timeline", start_collapsed=True, embedded=self.embedded)
         self.inner_layout.addWidget(timeline_visual_section)
 
-        timeline_visual_bytes, timeline_visual_info = create_risk_timeline_visual(self.results)
+        timeline_visual_bytes, timeline_visual_info = charts["risk_level"]
         if timeline_visual_bytes:
             self.risk_level_timeline = InteractiveRiskLevelTimeline()
             self.risk_level_timeline.set_chart(timeline_visual_bytes, timeline_visual_info, self.results["categories"])
@@ -3014,6 +3278,8 @@ class RiskOverviewPanel(QWidget):
             no_timeline_label.setAlignment(Qt.AlignCenter)
             timeline_visual_section.add_widget(no_timeline_label)
 
+    def _show_details(self):
+        """Severity pills and the per-category incident lists."""
         # Severity summary section
         severity_counts = self.results.get("severity_counts", {"high": 0, "medium": 0, "low": 0})
         if any(severity_counts.values()):
@@ -3337,6 +3603,9 @@ class RiskOverviewPanel(QWidget):
         from PySide6.QtWidgets import QFileDialog, QMessageBox
         import os
 
+        if self.results is None:
+            return  # still analysing
+
         # Get save path
         default_name = f"Risk_Report_{datetime.now().strftime('%Y%m%d_%H%M')}.docx"
         file_path, _ = QFileDialog.getSaveFileName(
@@ -3393,7 +3662,7 @@ class RiskOverviewPanel(QWidget):
         from PySide6.QtWidgets import QFileDialog, QMessageBox
         import os
 
-        if category_name not in self.results["categories"]:
+        if self.results is None or category_name not in self.results["categories"]:
             return
 
         cat_data = self.results["categories"][category_name]
@@ -3641,87 +3910,47 @@ class RiskOverviewPanel(QWidget):
     def _update_timeline_zoom(self, years):
         """Update timeline chart to show only the specified number of years (None = all)."""
         # Update button checked states
-        year_map = {0.25: 0, 0.5: 1, 1: 2, 2: 3, 5: 4, None: 5}
-        btn_index = year_map.get(years, 5)
+        btn_index = TIMELINE_ZOOM_YEARS.index(years) if years in TIMELINE_ZOOM_YEARS else 5
         self.current_zoom_index = btn_index
         for i, btn in enumerate(self.zoom_buttons):
             btn.setChecked(i == btn_index)
 
-        # Get monthly counts
-        monthly_counts = self.results["monthly_counts"]
-
-        if not monthly_counts:
-            self.timeline_chart.setText("No timeline data available")
-            return
-
-        # Filter data based on years
-        if years is None:
-            # Show all data
-            filtered_counts = dict(monthly_counts)
-        else:
-            # Calculate cutoff date
-            cutoff = datetime.now() - timedelta(days=years * 365)
-            cutoff_key = cutoff.strftime("%Y-%m")
-
-            # Filter to only months after cutoff
-            filtered_counts = {
-                month: counts
-                for month, counts in monthly_counts.items()
-                if month >= cutoff_key
-            }
+        if self.results is None:
+            return  # still analysing
 
-        # Apply category filter if active
-        cat_filter = getattr(self, '_current_category_filter', None)
-        if cat_filter:
-            cat_filtered = {}
-            for month, counts in filtered_counts.items():
-                if cat_filter in counts:
-                    cat_filtered[month] = {cat_filter: counts[cat_filter]}
-            filtered_counts = cat_filtered
-
-        if not filtered_counts:
-            if cat_filter and years:
-                self.timeline_chart.setText(
-                    f"No {cat_filter} data in the last {years} year(s)"
-                )
-            elif cat_filter:
-                self.timeline_chart.setText(f"No {cat_filter} data available")
-            else:
-                self.timeline_chart.setText(f"No data in the last {years} year(s)")
+        results, category, version = self.results, self._current_category_filter, self._data_version
+        embedded = self.embedded
+        theme = "embedded" if embedded else "floating"
+        rendered = render_risk_timeline(results, years, category, version, theme, cached_only=True)
+        if rendered is not None:
+            self._show_timeline(rendered)
             return
 
-        # Build categories_data: when filtering, only pass the filtered category
-        categories_data = self.results["categories"]
-        if cat_filter:
-            categories_data = {
-                k: v for k, v in categories_data.items()
-                if k == cat_filter
-            }
-
-        # Compute global y_max from the full (unfiltered) monthly data so
-        # filtered charts stay proportional to the overall scale
-        all_monthly = self.results["monthly_counts"]
-        global_y_max = 0
-        for month_cats in all_monthly.values():
-            for c in month_cats.values():
-                if c > global_y_max:
-                    global_y_max = c
-
-        # Use the category's own colour when a filter is active
-        color_override = None
-        if cat_filter:
-            color_override = self.results["categories"].get(cat_filter, {}).get("color")
-
-        # Generate chart with filtered data (returns tuple with timeline_info)
-        chart_bytes, timeline_info = create_timeline_chart(
-            filtered_counts, categories_data,
-            y_max=global_y_max, color_override=color_override
-        )
+        # Not rendered yet (a filtered view, or the zoom_levels stage is
+        # still running): render it off the GUI thread, then the rest of
+        # this category's zoom levels so the next clicks are cache hits
+        self.timeline_chart.setText("Rendering timeline…")
+        zoom = self._timeline_zoom_key(years)
+        stages = [("timeline", lambda done: (zoom, render_risk_timeline(results, years, category, version, theme)))]
+        if category:
+            stages.append(("category_zoom_levels", lambda done: prerender_risk_zoom_levels(
+                results, version, embedded, category)))
+        self._zoom_runner.start(stages)
+
+    def _timeline_zoom_key(self, years) -> tuple:
+        """Identifies the timeline view that is (or was) selected."""
+        return (self._data_version, years, self._current_category_filter)
+
+    def _show_timeline(self, rendered: tuple):
+        chart_bytes, timeline_info, message = rendered
         if chart_bytes:
             self.timeline_chart.set_chart(chart_bytes, timeline_info, self.results["categories"])
         else:
-            self.timeline_chart.setText("Unable to generate timeline chart")
+            self.timeline_chart.setText(message)
 
     def closeEvent(self, event):
+        if self._runner is not None:
+            self._runner.cancel()
+            self._zoom_runner.cancel()
         self.closed.emit()
         super().closeEvent(event)
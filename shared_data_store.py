@@ -8,9 +8,27 @@ section (Notes, Forms, Reports), it becomes available everywhere.
 """
 
 from __future__ import annotations
-from typing import Dict, List, Any, Optional
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Any, Optional
 from PySide6.QtCore import QObject, Signal
 
+from note_corpus import NoteCorpus, changed_ids, content_key
+
+
+@dataclass(frozen=True)
+class NotesDelta:
+    """What changed in one notes update (IDs are note_corpus.note_id values)."""
+    version: int
+    added: FrozenSet[str] = field(default_factory=frozenset)
+    removed: FrozenSet[str] = field(default_factory=frozenset)
+    changed: FrozenSet[str] = field(default_factory=frozenset)  # same ID, other fields differ
+    reordered: bool = False  # row order or duplicate count changed
+
+    @property
+    def is_empty(self) -> bool:
+        """True only if the old and new notes are identical."""
+        return not (self.added or self.removed or self.changed or self.reordered)
+
 
 class SharedDataStore(QObject):
     """
@@ -21,6 +39,7 @@ class SharedDataStore(QObject):
 
     # Signals emitted when data changes
     notes_changed = Signal(list)           # Emitted when notes are updated
+    notes_delta = Signal(object)           # NotesDelta, emitted right after notes_changed
     patient_info_changed = Signal(dict)    # Emitted when patient demographics change
     extracted_data_changed = Signal(dict)  # Emitted when extracted category data changes
     report_sections_changed = Signal(dict, str)  # Emitted when report sections imported (sections, source_form)
@@ -41,8 +60,10 @@ class SharedDataStore(QObject):
         super().__init__()
         self._initialized = True
 
-        # Core data storage
-        self._notes: List[Dict] = []
+        # Core data storage — notes are held column-wise (see note_corpus)
+        self._corpus: NoteCorpus = NoteCorpus()
+        self._notes_version: int = 0       # bumped on every notes update
+        self._last_delta = NotesDelta(0)
         self._patient_info: Dict[str, Any] = {}
         self._extracted_data: Dict[str, Any] = {}
         self._report_sections: Dict[str, Any] = {}
@@ -59,8 +80,46 @@ class SharedDataStore(QObject):
     # --------------------------------------------------------
     @property
     def notes(self) -> List[Dict]:
-        """Get all imported notes."""
-        return self._notes
+        """Get all imported notes (read-only dict-like NoteRow views)."""
+        return self._corpus.rows()
+
+    @property
+    def corpus(self) -> NoteCorpus:
+        """The columnar note storage behind `notes` (date slices, bodies)."""
+        return self._corpus
+
+    @property
+    def notes_version(self) -> int:
+        """Monotonically increasing counter, bumped on every notes update."""
+        return self._notes_version
+
+    @property
+    def last_delta(self) -> NotesDelta:
+        return self._last_delta
+
+    def _publish_notes(self, old: NoteCorpus, appended: bool = False):
+        """Bump the version and emit notes_changed + notes_delta."""
+        new = self._corpus
+        old_ids, new_ids = set(old.ids), set(new.ids)
+        if appended:
+            # add_notes(): old rows are untouched, new ones follow them
+            tail = new.ids[len(old):]
+            added, removed, changed = frozenset(tail) - old_ids, frozenset(), frozenset()
+            reordered = len(tail) != len(added)
+        else:
+            added, removed = frozenset(new_ids - old_ids), frozenset(old_ids - new_ids)
+            changed = changed_ids(old, new)
+            reordered = ([x for x in old.ids if x in new_ids]
+                         != [x for x in new.ids if x in old_ids])
+
+        self._notes_version += 1
+        self._last_delta = NotesDelta(self._notes_version, added, removed, changed, reordered)
+        print(f"[SharedDataStore] Notes v{self._notes_version}: "
+              f"+{len(added)} / -{len(removed)} / ~{len(changed)}"
+              f"{' (reordered)' if reordered else ''}")
+
+        self.notes_changed.emit(self.notes)
+        self.notes_delta.emit(self._last_delta)
 
     def set_notes(self, notes: List[Dict], source: str = "unknown"):
         """
@@ -74,17 +133,18 @@ class SharedDataStore(QObject):
             notes = []
 
         # Only update if there's actual new data
-        if len(notes) == 0 and len(self._notes) == 0:
+        if len(notes) == 0 and len(self._corpus) == 0:
             return
 
-        old_count = len(self._notes)
-        self._notes = list(notes)
+        old = self._corpus
+        self._corpus = NoteCorpus.from_notes(notes)
         self._last_update_source = source
 
-        print(f"[SharedDataStore] Notes updated from '{source}': {old_count} → {len(self._notes)} notes")
+        print(f"[SharedDataStore] Notes updated from '{source}': {len(old)} → {len(self._corpus)} notes "
+              f"({self._corpus.nbytes / 1e6:.1f} MB)")
 
         # Emit signal to notify all listeners
-        self.notes_changed.emit(self._notes)
+        self._publish_notes(old)
 
     def add_notes(self, new_notes: List[Dict], source: str = "unknown"):
         """
@@ -98,22 +158,24 @@ class SharedDataStore(QObject):
             return
 
         # Simple merge - could add deduplication logic here
-        self._notes.extend(new_notes)
+        old = self._corpus
+        self._corpus = old.extended(new_notes)
         self._last_update_source = source
 
-        print(f"[SharedDataStore] Added {len(new_notes)} notes from '{source}', total: {len(self._notes)}")
-        self.notes_changed.emit(self._notes)
+        print(f"[SharedDataStore] Added {len(new_notes)} notes from '{source}', total: {len(self._corpus)}")
+        self._publish_notes(old, appended=True)
 
     def clear_notes(self):
         """Clear all notes."""
-        self._notes = []
+        old = self._corpus
+        self._corpus = NoteCorpus()
         self._last_update_source = "clear"
         print("[SharedDataStore] Notes cleared")
-        self.notes_changed.emit(self._notes)
+        self._publish_notes(old)
 
     def has_notes(self) -> bool:
         """Check if any notes are loaded."""
-        return len(self._notes) > 0
+        return len(self._corpus) > 0
 
     def set_notes_and_extract(self, notes: List[Dict], source: str = "import"):
         """
@@ -347,7 +409,8 @@ class SharedDataStore(QObject):
     # --------------------------------------------------------
     def clear_all(self):
         """Clear all stored data."""
-        self._notes = []
+        old_notes = self._corpus
+        self._corpus = NoteCorpus()
         self._patient_info = {}
         self._extracted_data = {}
         self._report_sections = {}
@@ -357,7 +420,7 @@ class SharedDataStore(QObject):
 
         print("[SharedDataStore] All data cleared")
 
-        self.notes_changed.emit(self._notes)
+        self._publish_notes(old_notes)
         self.patient_info_changed.emit(self._patient_info)
         self.extracted_data_changed.emit(self._extracted_data)
         self.report_sections_changed.emit(self._report_sections, "")
@@ -366,14 +429,14 @@ class SharedDataStore(QObject):
     def get_summary(self) -> Dict[str, Any]:
         """Get a summary of stored data for debugging."""
         return {
-            "notes_count": len(self._notes),
+            "notes_count": len(self._corpus),
             "patient_info_fields": list(self._patient_info.keys()),
             "extracted_categories": list(self._extracted_data.keys()),
             "last_update_source": self._last_update_source,
         }
 
     def __repr__(self) -> str:
-        return (f"SharedDataStore(notes={len(self._notes)}, "
+        return (f"SharedDataStore(notes={len(self._corpus)}, "
                 f"patient_fields={len(self._patient_info)}, "
                 f"categories={len(self._extracted_data)})")
 
@@ -382,3 +445,17 @@ class SharedDataStore(QObject):
 def get_shared_store() -> SharedDataStore:
     """Get the singleton SharedDataStore instance."""
     return SharedDataStore()
+
+
+def notes_signature(notes) -> tuple:
+    """
+    Identity of a notes list for "already processed?" checks in pages.
+
+    The store's own list is identified by the store version; any other
+    list by the content-derived IDs of its notes (unlike id(notes), this
+    never matches a different list that happens to reuse the address).
+    """
+    store = get_shared_store()
+    if notes is store.notes:
+        return ("store", store.notes_version)
+    return ("ids",) + content_key(notes)
@@ -4093,7 +4093,8 @@ class SocialTribunalReportPage(QWidget):
             return
 
         # Skip if these exact notes were already processed
-        notes_sig = (len(notes), id(notes))
+        from shared_data_store import notes_signature
+        notes_sig = notes_signature(notes)
         if self._notes_processed_id == notes_sig:
             print(f"[Social] Skipping set_notes - notes already processed")
             return
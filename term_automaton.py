@@ -0,0 +1,84 @@
+# ================================================================
+# term_automaton.py — SINGLE-PASS MULTI-TERM MATCHING
+# MyPsychAdmin
+#
+# Several extractors look for a long list of literal terms in every
+# note (HCR-20 item terms, blood test names, …). Testing each term
+# separately costs one scan of the note per term. TermAutomaton
+# compiles all of them into ONE trie-shaped regex instead:
+#
+#   • the regex is scanned with a zero-width lookahead, so every
+#     start position is tried once and matches may overlap
+#   • at each position it returns the LONGEST term starting there;
+#     every shorter term starting at the same place is a prefix of
+#     it, so those are recovered from a precomputed prefix table
+#
+# The result is every occurrence of every term from one scan,
+# identical to what str.find / `term in text` gave per term.
+# Terms are matched literally — callers lowercase both sides.
+# ================================================================
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List
+
+
+def trie_pattern(terms: Iterable[str]) -> str:
+    """Regex source matching any of the terms, longest first at each position."""
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        alts = [re.escape(ch) + build(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        if len(alts) == 1 and "" not in node:
+            return alts[0]
+        body = "(?:" + "|".join(alts) + ")"
+        # Greedy "?" tries the longer terms first
+        return body + "?" if "" in node else body
+
+    return build(trie)
+
+
+class TermAutomaton:
+    """Finds every occurrence of a set of literal terms in a single scan."""
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = sorted({t for t in terms if t})
+        self._prefixes = {
+            term: [t for t in self.terms if term.startswith(t)]
+            for term in self.terms
+        }
+        self._pattern = (
+            re.compile("(?=(" + trie_pattern(self.terms) + "))")
+            if self.terms else None
+        )
+
+    def first_offsets(self, text: str) -> Dict[str, int]:
+        """term -> offset of its first occurrence, for terms present in text."""
+        offsets: Dict[str, int] = {}
+        if self._pattern is None:
+            return offsets
+        for m in self._pattern.finditer(text):
+            pos = m.start()
+            for term in self._prefixes[m.group(1)]:
+                if term not in offsets:
+                    offsets[term] = pos
+        return offsets
+
+    def occurrences(self, text: str) -> Dict[str, List[int]]:
+        """term -> ascending offsets of all its occurrences, for terms present in text."""
+        found: Dict[str, List[int]] = {}
+        if self._pattern is None:
+            return found
+        for m in self._pattern.finditer(text):
+            pos = m.start()
+            for term in self._prefixes[m.group(1)]:
+                found.setdefault(term, []).append(pos)
+        return found
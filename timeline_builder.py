@@ -1,7 +1,14 @@
 from __future__ import annotations
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+import os
 import re
+import threading
+
+from note_corpus import NoteRow, note_id
 
 print(">>> [TIMELINE] Loaded:", __file__)
 
@@ -22,11 +29,116 @@ def is_valid_timeline_date(note: Dict[str, Any]) -> bool:
 
     return True
 
+def window_density(all_dates, unique_dates, days: int) -> List[int]:
+    """
+    For each d in unique_dates, the number of entries of all_dates
+    (sorted) falling in [d, d + days]. Two bisects per date instead
+    of a scan of every note.
+    """
+    window = timedelta(days=days)
+    return [
+        bisect_right(all_dates, d + window) - bisect_left(all_dates, d)
+        for d in unique_dates
+    ]
+
+class NoteDateIndex:
+    """
+    Notes ordered by calendar day, answering "notes dated between A and
+    B" with two bisects instead of a scan of every note. Results keep
+    the original note order. Notes without a datetime are left out.
+    """
+
+    def __init__(self, notes: List[Dict[str, Any]]):
+        self.notes = notes
+        dated = [
+            (n["date"].date(), i)
+            for i, n in enumerate(notes)
+            if isinstance(n.get("date"), datetime)
+        ]
+        dated.sort(key=lambda pair: pair[0])
+        self.days = [d for d, _ in dated]
+        self._order = [i for _, i in dated]
+
+    def between(self, start: date, end: date) -> List[Dict[str, Any]]:
+        """Notes with start <= day <= end, in original order."""
+        lo = bisect_left(self.days, start)
+        hi = bisect_right(self.days, end)
+        return [self.notes[i] for i in sorted(self._order[lo:hi])]
+
+# ============================================================
+# DEBUG TRACE (opt-in, structured)
+# ============================================================
+# The pipelines used to print a per-date table on every call. They now
+# record what they did into a TimelineTrace only when one is passed in
+# (or debug=True, which prints trace.format() at the end). Callers that
+# want to inspect a build get the data, not stdout.
+
+# Set MYPSY_TIMELINE_DEBUG=1 to trace every (uncached) timeline build
+TIMELINE_DEBUG = os.environ.get("MYPSY_TIMELINE_DEBUG", "") == "1"
+
+
+@dataclass
+class TimelineTrace:
+    pipeline: str = ""
+    total_notes: int = 0
+    dated_notes: int = 0
+    first: Optional[date] = None
+    last: Optional[date] = None
+    window_days: Optional[int] = None
+    density: List[Tuple[date, int, int]] = field(default_factory=list)   # (day, notes that day, notes in window)
+    segments: List[Dict[str, Any]] = field(default_factory=list)         # raw segments before refinement
+    events: List[Tuple[str, str]] = field(default_factory=list)          # (stage, message)
+    episodes: List[Dict[str, Any]] = field(default_factory=list)
+
+    def event(self, stage: str, message: str):
+        self.events.append((stage, message))
+
+    def format(self) -> str:
+        """Human-readable report, as the old debug output."""
+        lines = [
+            f"[TIMELINE DEBUG] {self.pipeline.upper()} pipeline",
+            f"[TIMELINE DEBUG] Total notes: {self.total_notes}, dated: {self.dated_notes}",
+            f"[TIMELINE DEBUG] Range: {self.first} to {self.last}",
+        ]
+        if self.density:
+            lines.append(f"[TIMELINE DEBUG] Date        | daily | {self.window_days}-day")
+            for d, daily, density in self.density:
+                lines.append(f"  {d.strftime('%d/%m/%Y')}  | {daily:5d} | {density:5d} | {'#' * min(density, 50)}")
+        for i, seg in enumerate(self.segments):
+            lines.append(f"[TIMELINE DEBUG] Segment {i + 1}: {seg['start']} to {seg['end']}")
+        for stage, message in self.events:
+            lines.append(f"[TIMELINE DEBUG] {stage}: {message}")
+        lines.append("[TIMELINE DEBUG] FINAL EPISODES:")
+        for ep in self.episodes:
+            lines.append(f"  {ep['type'].upper()}: {ep['start']} to {ep['end']}" +
+                         (f" ({ep['label']})" if ep.get('label') else ""))
+        return "\n".join(lines)
+
+
+def _start_trace(trace, debug, pipeline, notes):
+    """The trace to record into (None when not tracing)."""
+    if trace is None and (debug or TIMELINE_DEBUG):
+        trace = TimelineTrace()
+    if trace is not None:
+        trace.pipeline = pipeline
+        trace.total_notes = len(notes)
+    return trace
+
+
+def _finish_trace(trace, debug, episodes):
+    if trace is not None:
+        trace.episodes = [dict(ep) for ep in episodes]
+        if debug or TIMELINE_DEBUG:
+            print(trace.format())
+    return episodes
+
+
 # ============================================================
 # 0. SOURCE DECISION (explicit only)
 # ============================================================
 
-def decide_pipeline(notes):
+def decide_pipeline(notes, trace=None):
+    """The pipeline for notes; the reason is recorded into trace, if any."""
     sources = {
         (n.get("source") or "").strip().lower()
         for n in notes
@@ -34,7 +146,8 @@ def decide_pipeline(notes):
     }
 
     if not sources:
-        print(">>> [TIMELINE] No sources → default = autodetect")
+        if trace is not None:
+            trace.event("pipeline", "no sources → default = autodetect")
         return "autodetect"
 
     if sources == {"rio"}:
@@ -48,11 +161,13 @@ def decide_pipeline(notes):
 
     # Mixed but known note systems → autodetect
     if sources.issubset({"rio", "carenotes", "epjs"}):
-        print(f">>> [TIMELINE] Mixed known sources {sources} → autodetect")
+        if trace is not None:
+            trace.event("pipeline", f"mixed known sources {sources} → autodetect")
         return "autodetect"
 
     # Fallback (should rarely happen)
-    print(f">>> [TIMELINE] Unknown sources {sources} → autodetect")
+    if trace is not None:
+        trace.event("pipeline", f"unknown sources {sources} → autodetect")
     return "autodetect"
 
 
@@ -60,11 +175,11 @@ def decide_pipeline(notes):
 # 1. CARENOTES (15-day density)
 # ============================================================
 
-def build_carenotes_timeline(notes: List[Dict[str, Any]], debug: bool = True):
+def build_carenotes_timeline(notes: List[Dict[str, Any]], debug: bool = False,
+                             trace: Optional[TimelineTrace] = None):
+    trace = _start_trace(trace, debug, "carenotes", notes)
     if not notes:
-        if debug:
-            print(">>> [TIMELINE DEBUG] No notes provided")
-        return []
+        return _finish_trace(trace, debug, [])
 
     ordered_dates = [
         n["date"].date()
@@ -73,9 +188,7 @@ def build_carenotes_timeline(notes: List[Dict[str, Any]], debug: bool = True):
     ]
 
     if not ordered_dates:
-        if debug:
-            print(">>> [TIMELINE DEBUG] No valid dates in notes")
-        return []
+        return _finish_trace(trace, debug, [])
 
     first = min(ordered_dates)            # ← EARLIEST DATE
     last = max(ordered_dates)
@@ -83,86 +196,43 @@ def build_carenotes_timeline(notes: List[Dict[str, Any]], debug: bool = True):
     all_dates = sorted(ordered_dates)
     unique_dates = sorted(set(all_dates))
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] ==========================================")
-        print(f">>> [TIMELINE DEBUG] CARENOTES pipeline (15-day window)")
-        print(f">>> [TIMELINE DEBUG] Total notes: {len(notes)}, dated: {len(all_dates)}, unique dates: {len(unique_dates)}")
-        print(f">>> [TIMELINE DEBUG] Range: {first} to {last}")
-        print(f">>> [TIMELINE DEBUG] ==========================================")
+    counts = window_density(all_dates, unique_dates, 15)
 
-    from collections import Counter
-    date_counts = Counter(all_dates)
-
-    window = timedelta(days=15)
-    counts = []
-
-    for d in unique_dates:
-        w_end = d + window
-        count = sum(1 for dt in all_dates if d <= dt <= w_end)
-        counts.append(count)
-
-    if debug:
-        print(f">>> [TIMELINE DEBUG] 15-day DENSITY SCORING (>=40 = admission start, <10 = admission end)")
-        print(f">>> [TIMELINE DEBUG] Date        | daily | 15-day | status")
-        print(f">>> [TIMELINE DEBUG] ------------|-------|--------|-------")
-        in_seg = False
-        for i, d in enumerate(unique_dates):
-            daily = date_counts[d]
-            density = counts[i]
-            bar = "#" * min(density, 50)
-            if not in_seg and density >= 40:
-                status = ">>> ADMISSION START"
-                in_seg = True
-            elif in_seg and density < 10:
-                status = "<<< ADMISSION END"
-                in_seg = False
-            elif in_seg:
-                status = "    (inpatient)"
-            else:
-                status = ""
-            print(f">>>   {d.strftime('%d/%m/%Y')}  | {daily:5d} | {density:6d} | {bar} {status}")
+    if trace:
+        from collections import Counter
+        date_counts = Counter(all_dates)
+        trace.dated_notes = len(all_dates)
+        trace.first, trace.last = first, last
+        trace.window_days = 15
+        trace.density = [(d, date_counts[d], c) for d, c in zip(unique_dates, counts)]
 
+    # Segmentation: >=40 notes in 15 days = admission start, <10 = end
     segments = []
     inside = False
     seg_start = None
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] ------------------------------------------")
-        print(f">>> [TIMELINE DEBUG] Segmentation process:")
-
     for i, d in enumerate(unique_dates):
         count = counts[i]
 
         if not inside and count >= 40:
             inside = True
             seg_start = d
-            if debug:
-                print(f">>>   {d.strftime('%d/%m/%Y')}: ADMISSION STARTED (count={count} >= 40)")
 
         elif inside and count < 10:
             inside = False
             segments.append({"start": seg_start, "end": unique_dates[i - 1]})
-            if debug:
-                print(f">>>   {d.strftime('%d/%m/%Y')}: ADMISSION ENDED (count={count} < 10)")
-                print(f">>>   -> Segment: {seg_start} to {unique_dates[i - 1]}")
             seg_start = None
 
     if inside and seg_start:
         segments.append({"start": seg_start, "end": last})
-        if debug:
-            print(f">>>   ADMISSION STILL ACTIVE at end -> Segment: {seg_start} to {last}")
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] ------------------------------------------")
-        print(f">>> [TIMELINE DEBUG] Raw segments found: {len(segments)}")
-        for i, seg in enumerate(segments):
-            print(f">>>   Segment {i+1}: {seg['start']} to {seg['end']}")
+    if trace:
+        trace.segments = [dict(s) for s in segments]
 
     if not segments:
-        if debug:
-            print(f">>> [TIMELINE DEBUG] NO ADMISSIONS DETECTED - returning community only")
-            print(f">>> [TIMELINE DEBUG] Max density was: {max(counts) if counts else 0} (need >=40)")
-        return [{"type": "community", "start": first, "end": last}]
+        if trace:
+            trace.event("segmentation", f"no admissions detected (max density {max(counts) if counts else 0}, need >=40)")
+        return _finish_trace(trace, debug, [{"type": "community", "start": first, "end": last}])
 
     episodes = []
 
@@ -198,14 +268,9 @@ def build_carenotes_timeline(notes: List[Dict[str, Any]], debug: bool = True):
         # near the end of notes (within 30 days). If there are months/years
         # of notes after discharge, the patient was clearly discharged.
         if gap_days <= 30:
-            trailing_notes = [
-                n for n in notes
-                if isinstance(n.get("date"), datetime)
-                and n["date"].date() >= trailing_start
-            ]
-
-            if debug:
-                print(f">>> [TIMELINE DEBUG] Trailing notes check: {len(trailing_notes)} notes, {gap_days} days after last segment")
+            # Open upper bound: notes dated after `last` (which only counts
+            # valid timeline dates) are still checked
+            trailing_notes = NoteDateIndex(notes).between(trailing_start, date.max)
 
             inpatient_indicators = [
                 r'\bward\b', r'\bnursing\s+(day|night|observation)', r'\blevel\s+\d',
@@ -219,23 +284,21 @@ def build_carenotes_timeline(notes: List[Dict[str, Any]], debug: bool = True):
                 content = (n.get('content', '') or n.get('text', '')).lower()
                 if any(re.search(p, content, re.IGNORECASE) for p in inpatient_indicators):
                     has_inpatient_markers = True
-                    if debug:
-                        nd = n["date"].date() if isinstance(n.get("date"), datetime) else "?"
-                        print(f">>>   Inpatient marker found on {nd}: {content[:80]}...")
+                    if trace:
+                        trace.event("trailing", f"inpatient marker on {n['date'].date()}: {content[:80]}")
                     break
 
             if has_inpatient_markers:
                 episodes[-1]["end"] = last
-                if debug:
-                    print(f">>>   -> Extended last admission to {last}")
             else:
                 episodes.append({
                     "type": "community",
                     "start": trailing_start,
                     "end": last
                 })
-                if debug:
-                    print(f">>>   -> Added trailing community: {trailing_start} to {last}")
+            if trace:
+                trace.event("trailing", f"{len(trailing_notes)} notes in {gap_days} days after last segment → "
+                                        + ("admission extended" if has_inpatient_markers else "community"))
         else:
             # Large gap — clearly discharged, add community period
             episodes.append({
@@ -243,18 +306,10 @@ def build_carenotes_timeline(notes: List[Dict[str, Any]], debug: bool = True):
                 "start": trailing_start,
                 "end": last
             })
-            if debug:
-                print(f">>> [TIMELINE DEBUG] Trailing gap {gap_days} days — clearly discharged, adding community")
+            if trace:
+                trace.event("trailing", f"gap of {gap_days} days — clearly discharged")
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] ==========================================")
-        print(f">>> [TIMELINE DEBUG] FINAL EPISODES:")
-        for ep in episodes:
-            print(f">>>   {ep['type'].upper()}: {ep['start']} to {ep['end']}" +
-                  (f" ({ep.get('label', '')})" if ep.get('label') else ""))
-        print(f">>> [TIMELINE DEBUG] ==========================================")
-
-    return episodes
+    return _finish_trace(trace, debug, episodes)
 
 
 
@@ -297,11 +352,11 @@ def note_indicates_admission(text: str) -> bool:
     return False
 
 
-def build_rio_timeline(notes: List[Dict[str, Any]], debug: bool = True):
+def build_rio_timeline(notes: List[Dict[str, Any]], debug: bool = False,
+                       trace: Optional[TimelineTrace] = None):
+    trace = _start_trace(trace, debug, "rio", notes)
     if not notes:
-        if debug:
-            print(">>> [TIMELINE DEBUG] No notes provided")
-        return []
+        return _finish_trace(trace, debug, [])
 
     # --------------------------------------------------
     # Preserve note order for timeline bounds
@@ -313,9 +368,7 @@ def build_rio_timeline(notes: List[Dict[str, Any]], debug: bool = True):
     ]
 
     if not ordered_dates:
-        if debug:
-            print(">>> [TIMELINE DEBUG] No valid dates in notes")
-        return []
+        return _finish_trace(trace, debug, [])
 
     first = min(ordered_dates)        # ← EARLIEST DATE
     last = max(ordered_dates)
@@ -323,85 +376,44 @@ def build_rio_timeline(notes: List[Dict[str, Any]], debug: bool = True):
     all_dates = sorted(ordered_dates)
     unique_dates = sorted(set(all_dates))
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] ==========================================")
-        print(f">>> [TIMELINE DEBUG] Total notes: {len(notes)}, dated: {len(all_dates)}, unique dates: {len(unique_dates)}")
-        print(f">>> [TIMELINE DEBUG] Range: {first} to {last}")
-        print(f">>> [TIMELINE DEBUG] ==========================================")
-
     # --- 5-day density ---
-    from collections import Counter
-    date_counts = Counter(all_dates)
+    counts = window_density(all_dates, unique_dates, 5)
 
-    counts = []
-    for d in unique_dates:
-        w_end = d + timedelta(days=5)
-        count = sum(1 for dt in all_dates if d <= dt <= w_end)
-        counts.append(count)
+    if trace:
+        from collections import Counter
+        date_counts = Counter(all_dates)
+        trace.dated_notes = len(all_dates)
+        trace.first, trace.last = first, last
+        trace.window_days = 5
+        trace.density = [(d, date_counts[d], c) for d, c in zip(unique_dates, counts)]
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] 5-day DENSITY SCORING (>30 = admission start, <10 = admission end)")
-        print(f">>> [TIMELINE DEBUG] Date        | daily | 5-day | status")
-        print(f">>> [TIMELINE DEBUG] ------------|-------|-------|-------")
-        in_seg = False
-        for i, d in enumerate(unique_dates):
-            daily = date_counts[d]
-            density = counts[i]
-            bar = "#" * min(density, 50)
-            if not in_seg and density > 30:
-                status = ">>> ADMISSION START"
-                in_seg = True
-            elif in_seg and density < 10:
-                status = "<<< ADMISSION END"
-                in_seg = False
-            elif in_seg:
-                status = "    (inpatient)"
-            else:
-                status = ""
-            print(f">>>   {d.strftime('%d/%m/%Y')}  | {daily:5d} | {density:5d} | {bar} {status}")
-
-    # --- threshold segmentation ---
+    # --- threshold segmentation (>30 = admission start, <10 = end) ---
     segments = []
     in_adm = False
     seg_start = None
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] ------------------------------------------")
-        print(f">>> [TIMELINE DEBUG] Segmentation process:")
-
     for i, d in enumerate(unique_dates):
         count = counts[i]
 
         if not in_adm and count > 30:
             in_adm = True
             seg_start = d
-            if debug:
-                print(f">>>   {d.strftime('%d/%m/%Y')}: ADMISSION STARTED (count={count} > 30)")
 
         elif in_adm and count < 10:
             in_adm = False
             segments.append({"start": seg_start, "end": d})
-            if debug:
-                print(f">>>   {d.strftime('%d/%m/%Y')}: ADMISSION ENDED (count={count} < 10)")
-                print(f">>>   -> Segment: {seg_start} to {d}")
             seg_start = None
 
     if in_adm and seg_start:
         segments.append({"start": seg_start, "end": last})
-        if debug:
-            print(f">>>   ADMISSION STILL ACTIVE at end -> Segment: {seg_start} to {last}")
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] ------------------------------------------")
-        print(f">>> [TIMELINE DEBUG] Raw segments found: {len(segments)}")
-        for i, seg in enumerate(segments):
-            print(f">>>   Segment {i+1}: {seg['start']} to {seg['end']}")
+    if trace:
+        trace.segments = [dict(s) for s in segments]
 
     if not segments:
-        if debug:
-            print(f">>> [TIMELINE DEBUG] NO ADMISSIONS DETECTED - returning community only")
-            print(f">>> [TIMELINE DEBUG] Max density was: {max(counts) if counts else 0} (need >30)")
-        return [{"type": "community", "start": first, "end": last}]
+        if trace:
+            trace.event("segmentation", f"no admissions detected (max density {max(counts) if counts else 0}, need >30)")
+        return _finish_trace(trace, debug, [{"type": "community", "start": first, "end": last}])
 
     # --- merge overlapping segments ---
     segments.sort(key=lambda s: s["start"])
@@ -414,10 +426,8 @@ def build_rio_timeline(notes: List[Dict[str, Any]], debug: bool = True):
         else:
             merged.append(s)
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] After merging: {len(merged)} segments")
-
     # --- refine start date using keyword scanning ---
+    index = NoteDateIndex(notes)
     refined = []
     for seg in merged:
         est = seg["start"]
@@ -425,23 +435,16 @@ def build_rio_timeline(notes: List[Dict[str, Any]], debug: bool = True):
         search_to = est + timedelta(days=10)
         corrected = est
 
-        for n in notes:
+        for n in index.between(search_from, search_to):
             nd = n["date"].date()
-            if search_from <= nd <= search_to:
-                if note_indicates_admission(n.get("content", n.get("text", ""))):
-                    if nd < corrected:
-                        corrected = nd
-                        if debug:
-                            print(f">>>   Keyword refinement: moved start from {est} to {corrected}")
+            if note_indicates_admission(n.get("content", n.get("text", ""))):
+                if nd < corrected:
+                    corrected = nd
 
+        if trace and corrected != est:
+            trace.event("refinement", f"admission start moved from {est} to {corrected}")
         refined.append({"start": corrected, "end": seg["end"]})
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] ------------------------------------------")
-        print(f">>> [TIMELINE DEBUG] Final refined segments:")
-        for i, seg in enumerate(refined):
-            print(f">>>   Admission {i+1}: {seg['start']} to {seg['end']}")
-
     # --- build episodes ---
     episodes = []
 
@@ -476,15 +479,7 @@ def build_rio_timeline(notes: List[Dict[str, Any]], debug: bool = True):
             "end": last
         })
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] ==========================================")
-        print(f">>> [TIMELINE DEBUG] FINAL EPISODES:")
-        for ep in episodes:
-            print(f">>>   {ep['type'].upper()}: {ep['start']} to {ep['end']}" +
-                  (f" ({ep.get('label', '')})" if ep.get('label') else ""))
-        print(f">>> [TIMELINE DEBUG] ==========================================")
-
-    return episodes
+    return _finish_trace(trace, debug, episodes)
 
 
 
@@ -547,15 +542,11 @@ def _note_is_inpatient(note):
     return False
 
 
-def _has_confirmed_community(notes, start_date, end_date):
+def _has_confirmed_community(index, start_date, end_date):
     """Score gap notes for community indicators. >= 5 = confirmed community."""
     score = 0
-    for n in notes:
-        if not isinstance(n.get("date"), datetime):
-            continue
-        day = n["date"].date()
-        if not (start_date < day < end_date):
-            continue
+    one_day = timedelta(days=1)
+    for n in index.between(start_date + one_day, end_date - one_day):
         text = (n.get("text") or n.get("content") or "").lower()
         first_line = text.split("\n")[0].strip() if text else ""
 
@@ -596,10 +587,11 @@ def _merge_non_community_gaps(segments, notes):
     """Merge adjacent segments when gap lacks community evidence."""
     if len(segments) <= 1:
         return segments
+    index = NoteDateIndex(notes)
     merged = [segments[0]]
     for seg in segments[1:]:
         prev_end = merged[-1]["end"]
-        if _has_confirmed_community(notes, prev_end, seg["start"]):
+        if _has_confirmed_community(index, prev_end, seg["start"]):
             merged.append(seg)
         else:
             merged[-1]["end"] = seg["end"]
@@ -641,17 +633,18 @@ def _build_episodes(segments, first, last):
     return episodes
 
 
-def build_epjs_timeline(notes, debug=True):
+def build_epjs_timeline(notes, debug=False, trace: Optional[TimelineTrace] = None):
     """EPJS timeline: detect admissions by 'Inpatient' note type prefix."""
+    trace = _start_trace(trace, debug, "epjs", notes)
     if not notes:
-        return []
+        return _finish_trace(trace, debug, [])
 
     # Filter out notes with obviously bad dates (data entry errors)
     min_valid = datetime(1990, 1, 1)
     ordered = [n for n in notes
                if isinstance(n.get("date"), datetime) and n["date"] >= min_valid]
     if not ordered:
-        return []
+        return _finish_trace(trace, debug, [])
     ordered.sort(key=lambda n: n["date"])
 
     first = min(n["date"].date() for n in ordered)
@@ -666,18 +659,13 @@ def build_epjs_timeline(notes, debug=True):
         if _note_is_inpatient(n):
             inpatient_dates.add(day)
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] ==========================================")
-        print(f">>> [TIMELINE DEBUG] EPJS pipeline (Inpatient prefix detection)")
-        print(f">>> [TIMELINE DEBUG] Total notes: {len(notes)}, dated: {len(ordered)}")
-        print(f">>> [TIMELINE DEBUG] Range: {first} to {last}")
-        print(f">>> [TIMELINE DEBUG] Inpatient dates: {len(inpatient_dates)}, All dates: {len(all_note_dates)}")
-        print(f">>> [TIMELINE DEBUG] ==========================================")
+    if trace:
+        trace.dated_notes = len(ordered)
+        trace.first, trace.last = first, last
+        trace.event("detection", f"{len(inpatient_dates)} inpatient dates of {len(all_note_dates)}")
 
     if not inpatient_dates:
-        if debug:
-            print(f">>> [TIMELINE DEBUG] No inpatient notes found — returning community only")
-        return [{"type": "community", "start": first, "end": last}]
+        return _finish_trace(trace, debug, [{"type": "community", "start": first, "end": last}])
 
     # Build segments with 30-day gap tolerance
     sorted_ip = sorted(inpatient_dates)
@@ -695,16 +683,14 @@ def build_epjs_timeline(notes, debug=True):
             seg_end = d
     segments.append({"start": seg_start, "end": seg_end})
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] Raw inpatient segments (30-day gap tolerance): {len(segments)}")
-        for i, seg in enumerate(segments):
-            print(f">>>   Segment {i+1}: {seg['start']} to {seg['end']}")
+    if trace:
+        trace.segments = [dict(s) for s in segments]
 
     # Merge non-community gaps (transfer detection)
     segments = _merge_non_community_gaps(segments, ordered)
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] After community-gap merging: {len(segments)} segments")
+    if trace:
+        trace.event("merging", f"{len(segments)} segments after community-gap merging")
 
     # Extend discharge-day (7-day lookahead)
     sorted_all = sorted(all_note_dates)
@@ -723,32 +709,28 @@ def build_epjs_timeline(notes, debug=True):
     # Build episodes
     episodes = _build_episodes(segments, first, last)
 
-    if debug:
-        print(f">>> [TIMELINE DEBUG] ==========================================")
-        print(f">>> [TIMELINE DEBUG] FINAL EPISODES:")
-        for ep in episodes:
-            print(f">>>   {ep['type'].upper()}: {ep['start']} to {ep['end']}" +
-                  (f" ({ep.get('label', '')})" if ep.get('label') else ""))
-        print(f">>> [TIMELINE DEBUG] ==========================================")
-
-    return episodes
+    return _finish_trace(trace, debug, episodes)
 
 
 # ============================================================
 # 4. MASTER WRAPPER
 # ============================================================
 
-def build_timeline(notes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    pipeline = decide_pipeline(notes)
-    print(f">>> [TIMELINE] Pipeline selected: {pipeline} (from {len(notes)} notes)")
-
+def _build_pipeline_timeline(notes, pipeline, debug=False, trace=None):
     if pipeline == "carenotes":
-        return build_carenotes_timeline(notes)
+        return build_carenotes_timeline(notes, debug=debug, trace=trace)
 
     if pipeline == "epjs":
-        return build_epjs_timeline(notes)
+        return build_epjs_timeline(notes, debug=debug, trace=trace)
+
+    return build_rio_timeline(notes, debug=debug, trace=trace)
+
 
-    return build_rio_timeline(notes)
+def build_timeline(notes: List[Dict[str, Any]], debug: bool = False,
+                   trace: Optional[TimelineTrace] = None,
+                   notes_key: Optional[Tuple] = None) -> List[Dict[str, Any]]:
+    """Episodes for notes (memoised — see get_timeline)."""
+    return get_timeline(notes, debug=debug, trace=trace, notes_key=notes_key)
 
 
 # ============================================================
@@ -847,6 +829,7 @@ def check_community_for_external_stays(
         print(f">>> [EXTERNAL CHECK] Threshold: {min_notes_threshold} notes minimum")
 
     result = []
+    index = NoteDateIndex(notes)
 
     for ep in episodes:
         # Only check community periods
@@ -855,14 +838,7 @@ def check_community_for_external_stays(
             continue
 
         # Get notes within this community period
-        period_notes = []
-        for n in notes:
-            nd = n.get("date")
-            if not isinstance(nd, datetime):
-                continue
-            nd = nd.date()
-            if ep["start"] <= nd <= ep["end"]:
-                period_notes.append(n)
+        period_notes = index.between(ep["start"], ep["end"])
 
         if not period_notes:
             result.append(ep)
@@ -919,19 +895,120 @@ def check_community_for_external_stays(
 def build_timeline_with_external_check(
     notes: List[Dict[str, Any]],
     check_external: bool = True,
-    debug: bool = False
+    debug: bool = False,
+    notes_key: Optional[Tuple] = None,
 ) -> List[Dict[str, Any]]:
     """
     Build timeline with optional external provider detection.
 
     1. First builds core timeline using density detection
     2. Then optionally checks community periods for external stays
+
+    Memoised like build_timeline (see get_timeline).
+    """
+    return get_timeline(notes, check_external=check_external, debug=debug, notes_key=notes_key)
+
+
+# ============================================================
+# 6. TIMELINE SERVICE (memoised episodes)
+# ============================================================
+# Every page used to re-derive the episodes from the same notes. Builds
+# now go through one cache keyed by the notes, the pipeline and the
+# external check. The notes are identified by, in order of preference:
+#   • a notes_key from a caller that knows the store version its list
+#     was derived from
+#   • the store's notes version, for the shared store's own list
+#   • the note_corpus IDs of the notes (date, source, body) plus the
+#     other fields the pipelines read
+# Each caller gets its own copies of the episode dicts.
+
+MAX_CACHED_TIMELINES = 8
+
+_timeline_cache: "OrderedDict[Tuple, List[Dict[str, Any]]]" = OrderedDict()
+_timeline_lock = threading.Lock()
+
+
+def _note_key(n) -> Tuple:
+    if isinstance(n, NoteRow):
+        # Body-derived fields are covered by the ID; only stored variants differ
+        return (n.note_id, n.get("type"), n.get("raw_type"), n.stored("preview"), n.stored("text"))
+    text = n.get("text")
+    if text is n.get("content"):
+        text = None
+    return (note_id(n), n.get("type"), n.get("raw_type"), n.get("preview"), text)
+
+
+def _notes_fingerprint(notes, notes_key=None) -> Optional[Tuple]:
+    if notes_key is not None:
+        return ("caller", notes_key)
+    try:
+        from shared_data_store import get_shared_store
+    except ImportError:
+        pass
+    else:
+        store = get_shared_store()
+        if notes is store.notes:
+            return ("store", store.notes_version)
+
+    # The whole tuple is the key, so a lookup compares every note — no
+    # hash-only matches
+    fingerprint = ("notes", tuple([_note_key(n) for n in notes]))
+    try:
+        hash(fingerprint)
+    except TypeError:   # unhashable field values: build without caching
+        return None
+    return fingerprint
+
+
+def get_timeline(
+    notes: List[Dict[str, Any]],
+    check_external: bool = False,
+    debug: bool = False,
+    trace: Optional[TimelineTrace] = None,
+    notes_key: Optional[Tuple] = None,
+) -> List[Dict[str, Any]]:
     """
-    # Core timeline (density-based)
-    episodes = build_timeline(notes)
+    Timeline episodes for notes, built once per notes / pipeline /
+    external check. Passing a trace (or debug=True) always rebuilds,
+    recording the build into the trace.
+
+    notes_key, if given, identifies `notes` in the cache instead of their
+    IDs, e.g. ("letter_writer", store version) for a list a caller
+    prepared from the store's notes. It must change whenever they do.
+    """
+    tracing = trace is not None or debug or TIMELINE_DEBUG
+    if tracing and trace is None:
+        trace = TimelineTrace()
+    pipeline = decide_pipeline(notes, trace)
+    fingerprint = _notes_fingerprint(notes, notes_key)
+    key = (fingerprint, pipeline, check_external)
+    cacheable = fingerprint is not None
+
+    if cacheable and not tracing:
+        with _timeline_lock:
+            cached = _timeline_cache.get(key)
+            if cached is not None:
+                _timeline_cache.move_to_end(key)
+                return [dict(ep) for ep in cached]
+
+    if trace is not None:
+        trace.event("pipeline", f"{pipeline} selected (from {len(notes)} notes)")
+    episodes = _build_pipeline_timeline(notes, pipeline, debug=debug, trace=trace)
 
     # Optional: Check for external provider stays
     if check_external and episodes:
         episodes = check_community_for_external_stays(episodes, notes, debug=debug)
 
+    if cacheable:
+        with _timeline_lock:
+            _timeline_cache[key] = [dict(ep) for ep in episodes]
+            _timeline_cache.move_to_end(key)
+            while len(_timeline_cache) > MAX_CACHED_TIMELINES:
+                _timeline_cache.popitem(last=False)
+
     return episodes
+
+
+def clear_timeline_cache():
+    with _timeline_lock:
+        _timeline_cache.clear()
@@ -10849,9 +10849,14 @@ class TribunalRiskHarmPopup(QWidget):
     def set_notes(self, notes: list):
         """Analyze notes for risk incidents and populate the sections."""
         try:
-            from risk_overview_panel import analyze_notes_for_risk
+            from analysis_cache import when_risk_ready
         except ImportError:
-            print("[TribunalRiskHarmPopup] Could not import analyze_notes_for_risk")
+            print("[TribunalRiskHarmPopup] Could not import when_risk_ready")
+            return
+
+        # Risk analysis runs in the background — come back once it is ready
+        results = when_risk_ready(notes, lambda _: self.set_notes(notes), self, "risk_harm")
+        if results is None:
             return
 
         # Clear existing entries and reset section filters
@@ -10868,8 +10873,6 @@ class TribunalRiskHarmPopup(QWidget):
                 if item.widget():
                     item.widget().deleteLater()
 
-        # Analyze notes for risk
-        results = analyze_notes_for_risk(notes)
         categories = results.get("categories", {})
 
         # Extract incidents for each category
@@ -11405,9 +11408,14 @@ class TribunalRiskPropertyPopup(QWidget):
     def set_notes(self, notes: list):
         """Analyze notes for property damage incidents and populate the section."""
         try:
-            from risk_overview_panel import analyze_notes_for_risk
+            from analysis_cache import when_risk_ready
         except ImportError:
-            print("[TribunalRiskPropertyPopup] Could not import analyze_notes_for_risk")
+            print("[TribunalRiskPropertyPopup] Could not import when_risk_ready")
+            return
+
+        # Risk analysis runs in the background — come back once it is ready
+        results = when_risk_ready(notes, lambda _: self.set_notes(notes), self, "risk_property")
+        if results is None:
             return
 
         # Clear existing entries and reset section filters
@@ -11423,8 +11431,6 @@ class TribunalRiskPropertyPopup(QWidget):
             if item.widget():
                 item.widget().deleteLater()
 
-        # Analyze notes for risk
-        results = analyze_notes_for_risk(notes)
         categories = results.get("categories", {})
 
         # Extract property damage incidents
@@ -2697,7 +2697,8 @@ class TribunalReportPage(QWidget):
             return
 
         # Skip if these exact notes were already processed
-        notes_sig = (len(notes), id(notes))
+        from shared_data_store import notes_signature
+        notes_sig = notes_signature(notes)
         if self._notes_processed_id == notes_sig:
             print(f"[Tribunal] Skipping set_notes - notes already processed")
             return